@@ -1,19 +1,96 @@
+import gzip
+import hashlib
+import itertools
+import json
+import re
+import time
+from collections import namedtuple
+from urllib.parse import urlencode
+
 import requests
 
 from activecampaign import exc
+from activecampaign.decode import create_response_decoder
+from activecampaign.messages import create_message_preparer
+from activecampaign.models import Campaign, MailingList, Message, as_sender
+from activecampaign.ratelimit import create_rate_limiter
+from activecampaign.retry import create_retry_policy
+from activecampaign.templates import COMPRESSED_FORM_HEADERS, FORM_HEADERS, RequestTemplate
+from activecampaign.transport import create_transport
 from config import config
 
 
 API_PATH = '/admin/api.php'
+BULK_IMPORT_PATH = '/api/3/import/bulk_import'
+# v3 endpoint retrieving an address, which the v1 API has no action for
+ADDRESS_PATH = '/api/3/addresses/{}'
+
+# Limits the bulk import endpoint places on the contacts and size of a single request
+BULK_IMPORT_MAX_CONTACTS = 250
+BULK_IMPORT_MAX_BYTES = 400000
+
+# gzip level of compressed request bodies; higher levels save little on HTML while taking several times longer
+COMPRESSION_LEVEL = 6
+
+# Number of request templates a client keeps; see `BaseActiveCampaignAPI._contact_template`
+TEMPLATE_CACHE_SIZE = 64
+
+# `result_message` values reporting that the object being created already exists
+DUPLICATE_MESSAGE_PATTERN = re.compile(r'already (exists|in the system)|duplicate', re.IGNORECASE)
+
 
+BulkContactResult = namedtuple('BulkContactResult', ['contact', 'contact_id', 'batch_id', 'error'])
+BulkContactResult.__doc__ = """Outcome of a single contact submitted through `ActiveCampaignAPI.create_contacts_bulk`
 
-class ActiveCampaignAPI:
-    def __init__(self):
-        """Initializes an ActiveCampaignAPI object with necessary basic configurations"""
+:ivar contact: Contact as it was passed in
+:ivar contact_id: Id of the contact if it was created individually; contacts queued by the bulk import endpoint are
+    assigned ids asynchronously, so this is None for them
+:ivar batch_id: Id of the bulk import batch the contact was queued in, or None if it was created individually
+:ivar error: Exception raised while creating the contact, or None if it was queued or created
+"""
+
+
+class BaseActiveCampaignAPI:
+    """Request construction and response handling shared by the synchronous and asynchronous clients"""
+
+    # Transport exceptions raised when a connection could not be established, and when a request may or may not have
+    # reached the server; see `activecampaign.retry.RetryPolicy`
+    CONNECT_ERRORS = ()
+    TRANSPORT_ERRORS = ()
+
+    def __init__(self, rate_limiter=None, retry_policy=None, instrumentation=None, decoder=None,
+                 message_preparer=None):
+        """Initializes an API client with necessary basic configurations
+
+        :param rate_limiter: Rate limiter every request must pass through; when omitted, one is created from the
+            `RATE_*` configuration directives. Pass the same limiter to several clients to share a single rate budget
+        :type rate_limiter: activecampaign.ratelimit.AdaptiveRateLimiter
+        :param retry_policy: Policy deciding whether and when failed requests are retried; when omitted, one is created
+            from the `RETRY_*` configuration directives
+        :type retry_policy: activecampaign.retry.RetryPolicy
+        :param instrumentation: Hooks every request attempt is reported to; when omitted, requests are not traced
+        :type instrumentation: activecampaign.instrumentation.Instrumentation
+        :param decoder: Decoder of response bodies; when omitted, one keeping only the fields the client reads is
+            created from the `RESPONSE_STREAM_THRESHOLD` configuration directive
+        :type decoder: activecampaign.decode.ResponseDecoder
+        :param message_preparer: Preparer of the HTML content of messages; when omitted, one is created from the
+            `MESSAGE_*` configuration directives
+        :type message_preparer: activecampaign.messages.MessagePreparer
+        """
         self.base_url = config['AC_BASE_URL']
         self.request_url = self.base_url + API_PATH
         self.api_key = config['AC_API_KEY']
         self.api_output = config['OUTPUT_FORMAT']
+        self.timeout = (config['CONNECT_TIMEOUT'], config['READ_TIMEOUT'])
+        self.rate_limiter = rate_limiter if rate_limiter is not None else create_rate_limiter()
+        self.retry_policy = retry_policy or create_retry_policy(self.CONNECT_ERRORS, self.TRANSPORT_ERRORS)
+        self.instrumentation = instrumentation
+        self.decoder = decoder or create_response_decoder()
+        self.message_preparer = message_preparer or create_message_preparer()
+        # POST bodies of at least this many bytes are compressed until the server refuses a compressed body
+        self.compression_threshold = config['REQUEST_COMPRESSION_THRESHOLD']
+        self.compression_accepted = True
+        self._templates = {}
 
     @property
     def params(self):
@@ -27,67 +104,426 @@ class ActiveCampaignAPI:
             'api_output': self.api_output
         }
 
-    def create_mailing_list(self, name, sender):
-        """Creates a mailing list
+    def _request_params(self, action):
+        """Returns the query parameters for a request performing the given action
 
-        Corresponds to the ActiveCampaign API's `list_add` action.
+        :param action: API action to be performed
+        :type action: str
 
-        :param name: Name to assign the mailing list
-        :type name: str
-        :param sender: Dictionary containing information about the sender associated with this mailing list; must
-            contain the following keys: 'name', 'address', 'city', 'zip', 'country'
-        :type sender: dict
+        :return: A dictionary containing the action along with parameters common to all requests
+        :rtype: dict
+        """
+        params = {'api_action': action}
+        params.update(self.params)
+        return params
 
-        :return: Returns the id of the created mailing list
-        :rtype: int
+    def _mailing_list_body(self, name, sender=None):
+        """Returns the POST body for a `list_add` request; see `ActiveCampaignAPI.create_mailing_list`
+
+        :rtype: dict
         """
+        if isinstance(name, MailingList):
+            name, sender = name
+
+        sender = as_sender(sender)
+        return {
+            'name': name,
+            'sender_name': sender.name,
+            'sender_addr1': sender.address,
+            'sender_city': sender.city,
+            'sender_zip': sender.zip,
+            'sender_country': sender.country
+        }
+
+    def _address_body(self, sender, mailing_lists):
+        """Returns the POST body for an `address_add` request; see `ActiveCampaignAPI.create_address`
+
+        :rtype: dict
+        """
+        sender = as_sender(sender)
         body = {
+            'company_name': sender.name,
+            'address_1': sender.address,
+            'city': sender.city,
+            'state': sender.state,
+            'zip': sender.zip,
+            'country': sender.country
+        }
+
+        return self._format_mailing_lists(mailing_lists, body, prefix='list')
+
+    def _contact_template(self, action, mailing_lists):
+        """Returns the template of `contact_add` or `contact_sync` requests subscribing contacts to the given lists
+
+        Everything but a contact's email address and names is the same for every contact imported into the same
+        lists, so templates are kept and reused, one for each action and set of mailing lists.
+
+        :param action: `contact_add` or `contact_sync`
+        :type action: str
+        :param mailing_lists: Mailing lists the contacts should be subscribed to
+        :type mailing_lists: list[int]
+
+        :rtype: activecampaign.templates.RequestTemplate
+        """
+        key = (action, tuple(mailing_lists))
+        template = self._templates.get(key)
+        if template is None:
+            constant_fields = self._format_mailing_lists(mailing_lists, {})
+            if action == 'contact_sync':
+                self._format_mailing_lists(mailing_lists, constant_fields, prefix='status', value=1)
+
+            if len(self._templates) >= TEMPLATE_CACHE_SIZE:
+                self._templates.clear()
+
+            template = self._templates[key] = RequestTemplate(
+                action,
+                self.request_url,
+                self._request_params(action),
+                constant_fields
+            )
+
+        return template
+
+    @staticmethod
+    def _contact_fields(email, first_name=None, last_name=None):
+        """Returns the fields of a `contact_add` or `contact_sync` request body that vary from contact to contact; see
+        `ActiveCampaignAPI.create_contact`
+
+        :rtype: list[tuple]
+        """
+        if not isinstance(email, str):
+            email, first_name, last_name = email.email, email.first_name, email.last_name
+
+        fields = [('email', email)]
+
+        if first_name:
+            fields.append(('first_name', first_name))
+
+        if last_name:
+            fields.append(('last_name', last_name))
+
+        return fields
+
+    @staticmethod
+    def _is_requested_contact(response_body, fields, mailing_lists):
+        """Determines whether a contact found by `contact_view_email` is the one a `contact_add` request would have
+        created: it has the request's email address and names, and is on every mailing list the request named
+
+        :param response_body: Decoded `contact_view_email` response body
+        :type response_body: dict
+        :param fields: Fields of the `contact_add` request that vary from contact to contact; see `_contact_fields`
+        :type fields: list[tuple]
+        :param mailing_lists: Mailing lists the request subscribed the contact to
+        :type mailing_lists: list[int]
+
+        :rtype: bool
+        """
+        values = dict(fields)
+        if not response_body.get('id') or (response_body.get('email') or '').lower() != values['email'].lower():
+            return False
+
+        if any((response_body.get(name) or None) != (values.get(name) or None) for name in ('first_name', 'last_name')):
+            return False
+
+        lists = response_body.get('lists') or {}
+        return all(str(list_id) in lists for list_id in mailing_lists)
+
+    def _contact_unsubscribe_body(self, contact_id, email, mailing_lists):
+        """Returns the POST body for a `contact_edit` request unsubscribing a contact; see
+        `ActiveCampaignAPI.unsubscribe_contact`
+
+        :rtype: dict
+        """
+        body = {
+            'id': contact_id,
+            'email': email,
+            # Leave the contact's other details and list memberships as they are
+            'overwrite': 0,
+        }
+
+        self._format_mailing_lists(mailing_lists, body)
+        return self._format_mailing_lists(mailing_lists, body, prefix='status', value=2)
+
+    def _html_message_body(self, mailing_lists, subject=None, message_content=None, from_email=None, from_name=None,
+                           reply_to=None, priority=3):
+        """Returns the POST body for a `message_add` request, with the HTML content prepared by the client's message
+        preparer; see `ActiveCampaignAPI.create_html_message`
+
+        :rtype: dict
+        """
+        if isinstance(mailing_lists, Message):
+            mailing_lists, subject, message_content, from_email, from_name, reply_to, priority = mailing_lists
+
+        body = {
+            'subject': subject,
+            'fromemail': from_email,
+            'fromname': from_name,
+            'reply2': reply_to,
+            'html': self.message_preparer.prepare(message_content),
+            'priority': priority,
+            'format': 'html',
+            'htmlconstructor': 'editor',
+            'charset': 'utf-8',
+            'encoding': 'quoted-printable'
+        }
+
+        return self._format_mailing_lists(mailing_lists, body)
+
+    def _single_campaign_body(self, name, send_date=None, mailing_lists=None, message=None):
+        """Returns the POST body for a `campaign_create` request; see `ActiveCampaignAPI.create_single_campaign`
+
+        :rtype: dict
+        """
+        if isinstance(name, Campaign):
+            name, send_date, mailing_lists, message = name
+
+        body = {
+            'type': 'single',
             'name': name,
-            'sender_name': sender['name'],
-            'sender_addr1': sender['address'],
-            'sender_city': sender['city'],
-            'sender_zip': sender['zip'],
-            'sender_country': sender['country']
+            'sdate': send_date,
+            'status': 1,
+            'public': 1,
+            'tracklinks': 'all',
         }
 
-        response = self._make_post_request('list_add', body)
-        return response['id']
+        self._format_mailing_lists(mailing_lists, body)
+        body['m[{}]'.format(message)] = 100
+        return body
+
+    @staticmethod
+    def _bulk_contact_entry(contact, mailing_lists):
+        """Returns the JSON-encoded representation of a contact within a bulk import request
+
+        :param contact: Contact exposing `email`, `first_name` and `last_name` attributes
+        :type contact: activecampaign.reader.ContactRow
+        :param mailing_lists: Mailing lists the contact should be subscribed to
+        :type mailing_lists: list[int]
+
+        :rtype: bytes
+        """
+        entry = {'email': contact.email}
+
+        if contact.first_name:
+            entry['first_name'] = contact.first_name
+
+        if contact.last_name:
+            entry['last_name'] = contact.last_name
+
+        entry['subscribe'] = [{'listid': list_id} for list_id in mailing_lists]
+        return json.dumps(entry, separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def _bulk_import_chunks(entries):
+        """Groups encoded contacts into request bodies within the bulk import endpoint's count and size limits
+
+        :param entries: Pairs of (contact, encoded contact), as returned by `_bulk_contact_entry`
+        :type entries: collections.abc.Iterable[tuple]
+
+        :return: Returns an iterator over (contacts, request body) pairs
+        :rtype: collections.abc.Iterator[tuple]
+        """
+        prefix, separator, suffix = b'{"contacts":[', b',', b']}'
+        contacts, encoded, size = [], [], len(prefix) + len(suffix)
+
+        for contact, entry in entries:
+            if contacts and (len(contacts) >= BULK_IMPORT_MAX_CONTACTS or size + len(entry) > BULK_IMPORT_MAX_BYTES):
+                yield contacts, prefix + separator.join(encoded) + suffix
+                contacts, encoded, size = [], [], len(prefix) + len(suffix)
+
+            contacts.append(contact)
+            encoded.append(entry)
+            size += len(entry) + len(separator)
+
+        if contacts:
+            yield contacts, prefix + separator.join(encoded) + suffix
+
+    @staticmethod
+    def _check_status(status_code):
+        """Verifies that the ActiveCampaign API neither throttled nor failed to process a request
+
+        :param status_code: HTTP status code of the response
+        :type status_code: int
+
+        :raises exc.ActiveCampaignRateLimitError: if the response status is 429 (Too Many Requests)
+        :raises exc.ActiveCampaignCompressionError: if the response status is 415 (Unsupported Media Type), as it is
+            when the server cannot read a compressed request body
+        :raises exc.ActiveCampaignServerError: if the response status indicates a server-side (5xx) error
+        """
+        if status_code == 429:
+            raise exc.ActiveCampaignRateLimitError('Request rate limit exceeded')
+        elif status_code == 415:
+            raise exc.ActiveCampaignCompressionError('Server does not accept compressed request bodies')
+        elif status_code >= 500:
+            raise exc.ActiveCampaignServerError(status_code)
+
+    @staticmethod
+    def _check_response(response_body):
+        """Verifies that the ActiveCampaign API reported success for a request
+
+        :param response_body: Decoded JSON response body
+        :type response_body: dict
+
+        :return: Returns the response body unchanged
+        :rtype: dict
+
+        :raises exc.ActiveCampaignDuplicateError: if the request failed because the object being created already exists
+        :raises exc.ActiveCampaignResponseError: if the returned JSON data's `result_code` attribute evaluates to a
+            False-y value
+        """
+        if not response_body['result_code']:
+            message = response_body['result_message']
+            if message and DUPLICATE_MESSAGE_PATTERN.search(message):
+                raise exc.ActiveCampaignDuplicateError(message, response_body)
+
+            raise exc.ActiveCampaignResponseError(message)
+        else:
+            return response_body
+
+    def _form_payload(self, body):
+        """Returns the arguments sending a POST body, compressed with gzip if it reaches `compression_threshold` bytes
+        once encoded and the server has not refused compressed bodies
+
+        :param body: POST body
+        :type body: dict
+
+        :return: Returns the body or its encoding as `data`, along with the `headers` describing an encoded body
+        :rtype: dict
+        """
+        if not self.compression_threshold or not self.compression_accepted:
+            return {'data': body}
+
+        encoded = urlencode(body).encode('ascii')
+        if len(encoded) < self.compression_threshold:
+            return {'data': encoded, 'headers': FORM_HEADERS}
+
+        return {'data': gzip.compress(encoded, COMPRESSION_LEVEL), 'headers': COMPRESSED_FORM_HEADERS}
+
+    @staticmethod
+    def _format_mailing_lists(mailing_list_ids, body, prefix='p', value=None):
+        """Formats mailing list attributes for submission to the ActiveCampaign API
+
+        :param mailing_list_ids: Mailing list IDs to be converted to the proper ActiveCampaign submission format
+        :type mailing_list_ids: list[int]
+        :param body: POST body that the formatted IDs should be added to
+        :type body: dict
+        :param prefix: Name of the attribute
+        :type prefix: str
+        :param value: Value to assign the attribute for every mailing list; defaults to the mailing list's ID
+        :type value: object
+
+        :return: Returns the modified POST body, including mailing list IDs
+        :rtype: dict
+        """
+        for list_id in mailing_list_ids:
+            body['{}[{}]'.format(prefix, list_id)] = list_id if value is None else value
+
+        return body
+
+
+class ActiveCampaignAPI(BaseActiveCampaignAPI):
+    CONNECT_ERRORS = (requests.ConnectTimeout,)
+    TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+    # Errors indicating that the bulk import endpoint could not process a request, rather than that it rejected one
+    _UNREACHABLE_ERRORS = (exc.ActiveCampaignRateLimitError, exc.ActiveCampaignServerError, requests.RequestException)
+
+    def __init__(self, session=None, rate_limiter=None, retry_policy=None, instrumentation=None, cache=None,
+                 decoder=None, message_preparer=None, transport=None):
+        """Initializes an ActiveCampaignAPI object with necessary basic configurations
+
+        :param session: HTTP session to submit requests through; when omitted, a keep-alive session sending requests
+            through `transport` is created and closed along with this object
+        :type session: requests.Session
+        :param rate_limiter: Rate limiter every request must pass through; when omitted, one is created from the
+            `RATE_*` configuration directives
+        :type rate_limiter: activecampaign.ratelimit.AdaptiveRateLimiter
+        :param retry_policy: Policy deciding whether and when failed requests are retried; when omitted, one is created
+            from the `RETRY_*` configuration directives
+        :type retry_policy: activecampaign.retry.RetryPolicy
+        :param instrumentation: Hooks every request attempt is reported to; when omitted, requests are not traced
+        :type instrumentation: activecampaign.instrumentation.Instrumentation
+        :param cache: Cache of previously created mailing lists, addresses and messages; when given, creating one
+            identical to a cached object returns the cached object's id instead of creating a duplicate
+        :type cache: activecampaign.cache.ObjectCache
+        :param decoder: Decoder of response bodies; when omitted, one is created from the `RESPONSE_STREAM_THRESHOLD`
+            configuration directive
+        :type decoder: activecampaign.decode.ResponseDecoder
+        :param message_preparer: Preparer of the HTML content of messages; when omitted, one is created from the
+            `MESSAGE_*` configuration directives
+        :type message_preparer: activecampaign.messages.MessagePreparer
+        :param transport: Adapter the created session sends requests through, such as an
+            `activecampaign.transport.RecordingAdapter` or `ReplayAdapter`; when omitted, one is created from the
+            `TRANSPORT_*` and `POOL_*` configuration directives. Ignored when a session is given
+        :type transport: requests.adapters.BaseAdapter
+        """
+        super().__init__(rate_limiter, retry_policy, instrumentation, decoder, message_preparer)
+
+        self.cache = cache
+        # Cached objects are scoped to the account they were created in, identified without keeping the API key itself
+        self.cache_account = '{} {}'.format(self.base_url, hashlib.sha256(self.api_key.encode('utf-8')).hexdigest())
+        self._owns_session = session is None
+        self.session = session if session is not None else self._create_session(transport)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Releases pooled connections held by this object's session
+
+        Sessions passed in by the caller are left open, since they may be shared with other clients.
+        """
+        if self._owns_session:
+            self.session.close()
+
+    def create_mailing_list(self, name, sender=None):
+        """Creates a mailing list
+
+        Corresponds to the ActiveCampaign API's `list_add` action. If the client has an object cache holding a list
+        created with the same name and sender, that list is reused.
+
+        :param name: Name to assign the mailing list, or a `MailingList` carrying both the name and the sender
+        :type name: str | activecampaign.models.MailingList
+        :param sender: Sender associated with this mailing list, or a dictionary containing the following keys: 'name',
+            'address', 'city', 'zip', 'country'
+        :type sender: activecampaign.models.Sender | dict
+
+        :return: Returns the id of the created mailing list
+        :rtype: int
+        """
+        return self._create_cached(
+            'list_add',
+            self._mailing_list_body(name, sender),
+            lambda list_id: self._object_exists('list_view', list_id)
+        )
 
     def create_address(self, sender, mailing_lists):
         """Creates a physical address
 
-        Corresponds to the ActiveCampaign API's `address_add` action.
+        Corresponds to the ActiveCampaign API's `address_add` action. If the client has an object cache holding an
+        identical address created for the same mailing lists, that address is reused.
 
-        :param sender: Dictionary containing information about the sender associated with this mailing list; must
-            contain the following keys: 'name', 'address', 'city', 'zip', 'country'
-        :type sender: dict
+        :param sender: Sender whose address this is, or a dictionary containing the following keys: 'name', 'address',
+            'city', 'state', 'zip', 'country'
+        :type sender: activecampaign.models.Sender | dict
         :param mailing_lists: Mailing lists this contact should be associated with
         :type mailing_lists: list[int]
 
         :return: Returns the id of the created address
         :rtype: int
         """
-        body = {
-            'company_name': sender['name'],
-            'address_1': sender['address'],
-            'city': sender['city'],
-            'state': sender['state'],
-            'zip': sender['zip'],
-            'country': sender['country']
-        }
-
-        body.update(self._format_mailing_lists(mailing_lists, body, prefix='list'))
-
-        response = self._make_post_request('address_add', body)
-        return response['id']
+        return self._create_cached('address_add', self._address_body(sender, mailing_lists), self._address_exists)
 
     def create_contact(self, email, mailing_lists, first_name=None, last_name=None):
         """Creates a contact and associates with one or more mailing lists
 
         Corresponds to the ActiveCampaign API's `contact_add` action.
 
-        :param email: Email address of the contact
-        :type email: str
+        :param email: Email address of the contact, or a contact exposing `email`, `first_name` and `last_name`
+            attributes, such as a `Contact`, in which case the names are taken from it
+        :type email: str | activecampaign.models.Contact
         :param mailing_lists: Mailing lists this contact should be associated with
         :type mailing_lists: list[int]
         :param first_name: First name of the contact (optional)
@@ -98,29 +534,116 @@ class ActiveCampaignAPI:
         :return: Returns the id of the created contact
         :rtype: int
         """
+        template = self._contact_template('contact_add', mailing_lists)
+        fields = self._contact_fields(email, first_name, last_name)
 
-        body = {
-            'email': email,
-        }
+        response = self._make_templated_request(
+            template,
+            fields,
+            verify=lambda error: self._existing_contact(fields, mailing_lists)
+        )
+        return response.get('id')
 
-        if first_name:
-            body['first_name'] = first_name
+    def sync_contact(self, email, mailing_lists, first_name=None, last_name=None):
+        """Creates or updates a contact, subscribing it to one or more mailing lists
 
-        if last_name:
-            body['last_name'] = last_name
+        Corresponds to the ActiveCampaign API's `contact_sync` action. Unlike `create_contact`, this succeeds whether or
+        not the contact already exists, so it can be repeated safely.
 
-        body.update(self._format_mailing_lists(mailing_lists, body))
+        :param email: Email address of the contact, or a contact exposing `email`, `first_name` and `last_name`
+            attributes, such as a `Contact`, in which case the names are taken from it
+        :type email: str | activecampaign.models.Contact
+        :param mailing_lists: Mailing lists the contact should be subscribed to
+        :type mailing_lists: list[int]
+        :param first_name: First name of the contact (optional)
+        :type first_name: str
+        :param last_name: Last name of the contact (optional)
+        :type last_name: str
 
-        response = self._make_post_request('contact_add', body)
-        return response.get('id')
+        :return: Returns the id of the contact
+        :rtype: int
+        """
+        template = self._contact_template('contact_sync', mailing_lists)
 
-    def create_html_message(self, mailing_lists, subject, message_content, from_email, from_name, reply_to, priority=3):
-        """Creates a message comprised of HTML content
+        response = self._make_templated_request(template, self._contact_fields(email, first_name, last_name))
+        return response.get('subscriber_id', response.get('id'))
+
+    def find_listed_contact(self, email, mailing_lists):
+        """Looks up a contact by its email address, such as one an interrupted import may have created already
+
+        Corresponds to the ActiveCampaign API's `contact_view_email` action.
+
+        :param email: Email address of the contact
+        :type email: str
+        :param mailing_lists: Mailing lists the contact must be on
+        :type mailing_lists: list[int]
+
+        :return: Returns the id of the contact if it exists and is on every one of `mailing_lists`, or None otherwise
+        :rtype: int
+        """
+        response_body = self._view_contact(email)
+        if response_body is None:
+            return None
+
+        lists = response_body.get('lists') or {}
+        return response_body.get('id') if all(str(list_id) in lists for list_id in mailing_lists) else None
 
-        Corresponds to the ActiveCampaign API's `message_add` action.
+    def unsubscribe_contact(self, contact_id, email, mailing_lists):
+        """Unsubscribes a contact from one or more mailing lists, leaving its other details unchanged
 
-        :param mailing_lists: Mailing lists this message should be associated with
+        Corresponds to the ActiveCampaign API's `contact_edit` action.
+
+        :param contact_id: Id of the contact
+        :type contact_id: int
+        :param email: Email address of the contact
+        :type email: str
+        :param mailing_lists: Mailing lists the contact should be unsubscribed from
         :type mailing_lists: list[int]
+        """
+        self._make_post_request('contact_edit', self._contact_unsubscribe_body(contact_id, email, mailing_lists))
+
+    def create_contacts_bulk(self, contacts, mailing_lists):
+        """Creates many contacts using as few requests as possible
+
+        Contacts are packed into requests to the bulk import endpoint, each holding as many contacts as its count and
+        size limits allow. Contacts in any request the endpoint rejects are instead created one at a time with
+        `create_contact`, so that one invalid contact does not prevent the rest of its chunk from being imported. If
+        the endpoint cannot be reached, every contact in the affected chunk is reported as failed.
+
+        :param contacts: Contacts exposing `email`, `first_name` and `last_name` attributes
+        :type contacts: collections.abc.Iterable[activecampaign.reader.ContactRow]
+        :param mailing_lists: Mailing lists the contacts should be associated with
+        :type mailing_lists: list[int]
+
+        :return: Returns the outcome of each contact, in the same order as the contacts
+        :rtype: list[BulkContactResult]
+        """
+        entries = ((contact, self._bulk_contact_entry(contact, mailing_lists)) for contact in contacts)
+        results = []
+
+        for chunk, body in self._bulk_import_chunks(entries):
+            try:
+                response = self._make_bulk_import_request(body)
+            except self._UNREACHABLE_ERRORS as error:
+                # The endpoint could not be reached, so creating the chunk's contacts individually would fail as well
+                results.extend(BulkContactResult(contact, None, None, error) for contact in chunk)
+            except exc.ActiveCampaignResponseError:
+                results.extend(self._create_contacts_individually(chunk, mailing_lists))
+            else:
+                results.extend(BulkContactResult(contact, None, response.get('batchId'), None) for contact in chunk)
+
+        return results
+
+    def create_html_message(self, mailing_lists, subject=None, message_content=None, from_email=None, from_name=None,
+                            reply_to=None, priority=3):
+        """Creates a message comprised of HTML content
+
+        Corresponds to the ActiveCampaign API's `message_add` action. If the client has an object cache holding a
+        message created with the same content and settings for the same mailing lists, that message is reused.
+
+        :param mailing_lists: Mailing lists this message should be associated with, or a `Message` carrying all of the
+            message's settings
+        :type mailing_lists: list[int] | activecampaign.models.Message
         :param subject: Subject of the email message
         :type subject: str
         :param message_content: HTML content of the email message
@@ -137,31 +660,29 @@ class ActiveCampaignAPI:
         :return: Returns the id of the created message
         :rtype: int
         """
-        body = {
-            'subject': subject,
-            'fromemail': from_email,
-            'fromname': from_name,
-            'reply2': reply_to,
-            'html': message_content,
-            'priority': priority,
-            'format': 'html',
-            'htmlconstructor': 'editor',
-            'charset': 'utf-8',
-            'encoding': 'quoted-printable'
-        }
-
-        body.update(self._format_mailing_lists(mailing_lists, body))
+        body = self._html_message_body(
+            mailing_lists,
+            subject,
+            message_content,
+            from_email,
+            from_name,
+            reply_to,
+            priority
+        )
 
-        response = self._make_post_request('message_add', body)
-        return response['id']
+        return self._create_cached(
+            'message_add',
+            body,
+            lambda message_id: self._object_exists('message_view', message_id)
+        )
 
-    def create_single_campaign(self, name, send_date, mailing_lists, message):
+    def create_single_campaign(self, name, send_date=None, mailing_lists=None, message=None):
         """Creates a new "single"-type Campaign
 
         Corresponds to the ActiveCampaign API's `campaign_create` action.
 
-        :param name: Name of the campaign
-        :type name: str
+        :param name: Name of the campaign, or a `Campaign` carrying all of the campaign's settings
+        :type name: str | activecampaign.models.Campaign
         :param send_date: Date string (format: YYYY-MM-DD hh:mm:ss) representing the date and time the campaign should
             be sent
         :type send_date: str
@@ -173,23 +694,13 @@ class ActiveCampaignAPI:
         :return: Returns the id of the created campaign
         :rtype: int
         """
-        body = {
-            'type': 'single',
-            'name': name,
-            'sdate': send_date,
-            'status': 1,
-            'public': 1,
-            'tracklinks': 'all',
-        }
-
-        body.update(self._format_mailing_lists(mailing_lists, body))
-        body['m[{}]'.format(message)] = 100
+        body = self._single_campaign_body(name, send_date, mailing_lists, message)
 
         response = self._make_post_request('campaign_create', body)
         return response['id']
 
     def _make_post_request(self, action, body):
-        """Submits a POST request to the ActiveCampaign API
+        """Submits a POST request to the ActiveCampaign API, retrying it according to the retry policy
 
         :param action: API action to be performed
         :type action: str
@@ -199,33 +710,343 @@ class ActiveCampaignAPI:
         :return: Returns the JSON response body for the submitted POST request
         :rtype: dict
 
+        :raises exc.ActiveCampaignRateLimitError: if the request was rejected for exceeding the account's rate limit
+        :raises exc.ActiveCampaignServerError: if the server failed to process the request
         :raises exc.ActiveCampaignResponseError: if the returned JSON data's `result_message` attribute evaluates to a
             False-y value
         """
-        params = {'api_action': action}
-        params.update(self.params)
+        return self._retry(action, body, lambda trace: self._submit_post_request(action, body, trace))
 
-        response = requests.post(self.request_url, params=params, data=body)
-        response_body = response.json()
+    def _make_templated_request(self, template, fields, verify=None):
+        """Submits a POST request made from a template, retrying it according to the retry policy
 
-        if not response_body['result_code']:
-            raise exc.ActiveCampaignResponseError(response_body['result_message'])
-        else:
-            return response_body
+        :param template: Template of the request
+        :type template: activecampaign.templates.RequestTemplate
+        :param fields: Body fields specific to this request
+        :type fields: list[tuple]
+        :param verify: Function confirming that the object a retry was rejected as a duplicate of was created by an
+            earlier attempt; see `activecampaign.retry.RetryPolicy.call`
+        :type verify: callable
 
-    @staticmethod
-    def _format_mailing_lists(mailing_list_ids, body, prefix='p'):
-        """Formats mailing list attributes for submission to the ActiveCampaign API
+        :return: Returns the JSON response body
+        :rtype: dict
 
-        :param mailing_list_ids: Mailing list IDs to be converted to the proper ActiveCampaign submission format
-        :type mailing_list_ids: list[int]
-        :param body: POST body that the formatted IDs should be added to
+        :raises exc.ActiveCampaignRateLimitError: if the request was rejected for exceeding the account's rate limit
+        :raises exc.ActiveCampaignServerError: if the server failed to process the request
+        :raises exc.ActiveCampaignResponseError: if the returned JSON data's `result_code` attribute evaluates to a
+            False-y value
+        """
+        body = template.encode(fields)
+        return self._retry(
+            template.action,
+            body,
+            lambda trace: self._submit_templated_request(template, body, trace),
+            verify
+        )
+
+    def _make_get_request(self, action, params):
+        """Submits a GET request to the ActiveCampaign API, retrying it according to the retry policy
+
+        :param action: API action to be performed
+        :type action: str
+        :param params: Query parameters in addition to those identifying the action and account
+        :type params: dict
+
+        :return: Returns the JSON response body
+        :rtype: dict
+
+        :raises exc.ActiveCampaignResponseError: if the returned JSON data's `result_code` attribute evaluates to a
+            False-y value
+        """
+        return self._retry(action, params, lambda trace: self._submit_get_request(action, params, trace))
+
+    def _submit_get_request(self, action, params, trace=None):
+        """Submits a single GET request to the ActiveCampaign API; see `_make_get_request`
+
+        :rtype: dict
+        """
+        params = dict(self._request_params(action), **params)
+        response = self._send(self.request_url, trace, method='get', params=params)
+        return self._check_response(self._decode(response, trace))
+
+    def _submit_post_request(self, action, body, trace=None):
+        """Submits a single POST request to the ActiveCampaign API; see `_make_post_request`
+
+        :rtype: dict
+        """
+        params = self._request_params(action)
+        payload = self._form_payload(body)
+        if trace is not None and isinstance(payload['data'], bytes):
+            trace.request_bytes = len(payload['data'])
+
+        try:
+            response = self._send(self.request_url, trace, params=params, **payload)
+        except exc.ActiveCampaignCompressionError:
+            # The server cannot read compressed bodies, so stop compressing them and send this one as it is
+            self.compression_accepted = False
+            response = self._send(self.request_url, trace, params=params, data=body)
+
+        return self._check_response(self._decode(response, trace))
+
+    def _submit_templated_request(self, template, body, trace=None):
+        """Submits a single POST request made from a template; see `_make_templated_request`
+
+        :rtype: dict
+        """
+        response = self._send(template.url, trace, data=body, headers=FORM_HEADERS)
+        return self._check_response(self._decode(response, trace))
+
+    def _make_bulk_import_request(self, body):
+        """Submits a request to the bulk import endpoint, retrying it according to the retry policy
+
+        :param body: JSON-encoded request body
+        :type body: bytes
+
+        :return: Returns the JSON response body
+        :rtype: dict
+
+        :raises exc.ActiveCampaignResponseError: if the endpoint rejected the request, or answered it with a body that
+            is not JSON
+        """
+        return self._retry('bulk_import', body, lambda trace: self._submit_bulk_import_request(body, trace))
+
+    def _submit_bulk_import_request(self, body, trace=None):
+        """Submits a single request to the bulk import endpoint; see `_make_bulk_import_request`
+
+        :rtype: dict
+        """
+        response = self._send(
+            self.base_url + BULK_IMPORT_PATH,
+            trace,
+            data=body,
+            headers={'Api-Token': self.api_key, 'Content-Type': 'application/json'}
+        )
+
+        try:
+            response_body = self._decode(response, trace)
+        except ValueError as error:
+            # Proxies in front of the endpoint answer with error pages that are not JSON, such as HTML ones
+            raise exc.ActiveCampaignResponseError(
+                'Unreadable bulk import response (HTTP {})'.format(response.status_code)
+            ) from error
+
+        if not response_body.get('success'):
+            raise exc.ActiveCampaignResponseError(
+                response_body.get('message') or '; '.join(map(str, response_body.get('failureReasons', [])))
+            )
+
+        return response_body
+
+    def _create_cached(self, action, body, exists):
+        """Creates an object, or reuses the object the client's cache records for an identical request to the same
+        account, once it has been confirmed to still exist
+
+        :param action: API action creating the object
+        :type action: str
+        :param body: POST body
         :type body: dict
+        :param exists: Function confirming that a cached object still exists, taking its id and returning a bool
+        :type exists: callable
 
-        :return: Returns the modified POST body, including mailing list IDs
+        :return: Returns the id of the created or cached object
+        :rtype: int
+        """
+        if self.cache is None:
+            return self._make_post_request(action, body)['id']
+
+        cached = self.cache.get(self.cache_account, action, body)
+        if cached is not None:
+            if cached.validated:
+                return cached.object_id
+            elif exists(cached.object_id):
+                self.cache.mark_validated(self.cache_account, action, body)
+                return cached.object_id
+
+            self.cache.discard(self.cache_account, action, body)
+
+        object_id = self._make_post_request(action, body)['id']
+        self.cache.put(self.cache_account, action, body, object_id)
+        return object_id
+
+    def _object_exists(self, view_action, object_id):
+        """Determines whether an object still exists in the account
+
+        :param view_action: API action viewing objects of the object's type
+        :type view_action: str
+        :param object_id: Id of the object
+        :type object_id: int
+
+        :rtype: bool
+
+        :raises exc.ActiveCampaignRateLimitError: if the server could not be asked because of its rate limit
+        :raises exc.ActiveCampaignServerError: if the server failed to process the request
+        """
+        try:
+            self._make_get_request(view_action, {'id': object_id})
+        except (exc.ActiveCampaignRateLimitError, exc.ActiveCampaignServerError):
+            raise
+        except exc.ActiveCampaignResponseError:
+            return False
+
+        return True
+
+    def _address_exists(self, address_id):
+        """Determines whether an address still exists in the account, through the v3 API
+
+        :param address_id: Id of the address
+        :type address_id: int
+
+        :rtype: bool
+
+        :raises exc.ActiveCampaignRateLimitError: if the server could not be asked because of its rate limit
+        :raises exc.ActiveCampaignServerError: if the server failed to process the request
+        """
+        url = self.base_url + ADDRESS_PATH.format(address_id)
+        response = self._retry(
+            'address_view',
+            b'',
+            lambda trace: self._send(url, trace, method='get', headers={'Api-Token': self.api_key})
+        )
+        return response.ok
+
+    def _retry(self, action, body, submit, verify=None):
+        """Submits a request under the retry policy, tracing each attempt if the client is instrumented
+
+        :param action: API action performed by the request
+        :type action: str
+        :param body: Request body, used to measure the request's size
+        :type body: dict | bytes
+        :param submit: Function submitting a single attempt, taking the attempt's `RequestTrace` or None
+        :type submit: callable
+        :param verify: Function confirming that an object a retry was rejected as a duplicate of was created by an
+            earlier attempt; see `activecampaign.retry.RetryPolicy.call`
+        :type verify: callable
+
+        :return: Returns the response body of the first successful attempt
         :rtype: dict
         """
-        for list_id in mailing_list_ids:
-            body['{}[{}]'.format(prefix, list_id)] = list_id
+        if self.instrumentation is None:
+            return self.retry_policy.call(lambda: submit(None), action, verify)
 
-        return body
+        attempts = itertools.count(1)
+
+        def traced():
+            with self.instrumentation.trace(action, next(attempts), body) as trace:
+                return submit(trace)
+
+        return self.retry_policy.call(traced, action, verify)
+
+    def _existing_contact(self, fields, mailing_lists):
+        """Looks up the contact a retried `contact_add` request was rejected as a duplicate of
+
+        :param fields: Fields of the request that vary from contact to contact; see `_contact_fields`
+        :type fields: list[tuple]
+        :param mailing_lists: Mailing lists the request subscribed the contact to
+        :type mailing_lists: list[int]
+
+        :return: Returns the contact's details, including its id, if it is the contact the request would have created,
+            or None if it is not
+        :rtype: dict
+        """
+        response_body = self._view_contact(dict(fields)['email'])
+        if response_body is None:
+            return None
+
+        return response_body if self._is_requested_contact(response_body, fields, mailing_lists) else None
+
+    def _view_contact(self, email):
+        """Looks up the details of a contact by its email address
+
+        :return: Returns the decoded `contact_view_email` response body, or None if there is no such contact
+        :rtype: dict
+
+        :raises exc.ActiveCampaignRateLimitError: if the server could not be asked because of its rate limit
+        :raises exc.ActiveCampaignServerError: if the server failed to process the request
+        """
+        try:
+            return self._make_get_request('contact_view_email', {'email': email})
+        except (exc.ActiveCampaignRateLimitError, exc.ActiveCampaignServerError):
+            raise
+        except exc.ActiveCampaignResponseError:
+            return None
+
+    def _create_contacts_individually(self, contacts, mailing_lists):
+        """Creates contacts one at a time, recording the outcome of each
+
+        :rtype: collections.abc.Iterator[BulkContactResult]
+        """
+        for contact in contacts:
+            try:
+                contact_id = self.create_contact(contact, mailing_lists)
+            except (exc.ActiveCampaignResponseError, requests.RequestException) as error:
+                yield BulkContactResult(contact, None, None, error)
+            else:
+                yield BulkContactResult(contact, contact_id, None, None)
+
+    def _send(self, url, trace=None, method='post', **kwargs):
+        """Submits a request once the rate limiter admits it, reporting its outcome back to the rate limiter
+
+        :param url: URL the request is submitted to
+        :type url: str
+        :param trace: Trace of the attempt to record the request's status, size and timings in, if it is traced
+        :type trace: activecampaign.instrumentation.RequestTrace
+        :param method: HTTP method of the request
+        :type method: str
+        :param kwargs: Additional arguments passed to the `requests.Session` method named by `method`
+
+        :return: Returns the response
+        :rtype: requests.Response
+
+        :raises exc.ActiveCampaignRateLimitError: if the request was rejected for exceeding the account's rate limit
+        :raises exc.ActiveCampaignServerError: if the server failed to process the request
+        """
+        waited = self.rate_limiter.acquire() if self.rate_limiter is not None else 0.0
+
+        started = time.monotonic()
+        response = getattr(self.session, method)(url, timeout=self.timeout, **kwargs)
+        elapsed = time.monotonic() - started
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.record(response.status_code, elapsed)
+
+        if trace is not None:
+            trace.wait = waited
+            trace.transport = elapsed
+            trace.status = response.status_code
+            trace.response_bytes = len(response.content)
+
+        self._check_status(response.status_code)
+        return response
+
+    def _decode(self, response, trace=None):
+        """Decodes a JSON response body with the client's decoder, timing the decoding if the request is traced
+
+        :rtype: dict
+        """
+        if trace is None:
+            return self.decoder.decode(response.content)
+
+        started = time.monotonic()
+        response_body = self.decoder.decode(response.content)
+        trace.decode = time.monotonic() - started
+        return response_body
+
+    @staticmethod
+    def _create_session(transport=None):
+        """Creates an HTTP session whose connections are kept alive between requests
+
+        :param transport: Adapter the session sends requests through; when omitted, one is created by
+            `activecampaign.transport.create_transport`, which pools connections as configured by the `POOL_*`
+            directives
+        :type transport: requests.adapters.BaseAdapter
+
+        :rtype: requests.Session
+        """
+        if transport is None:
+            transport = create_transport()
+
+        session = requests.Session()
+        session.headers['Connection'] = 'keep-alive'
+        session.mount('https://', transport)
+        session.mount('http://', transport)
+        return session
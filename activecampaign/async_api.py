@@ -0,0 +1,307 @@
+import asyncio
+import itertools
+import time
+
+import aiohttp
+
+from activecampaign import exc
+from activecampaign.api import BaseActiveCampaignAPI
+from activecampaign.templates import FORM_HEADERS
+from config import config
+
+
+class AsyncActiveCampaignAPI(BaseActiveCampaignAPI):
+    CONNECT_ERRORS = (aiohttp.ClientConnectorError,)
+    TRANSPORT_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+    def __init__(self, session=None, rate_limiter=None, retry_policy=None, instrumentation=None, decoder=None,
+                 message_preparer=None):
+        """Initializes an AsyncActiveCampaignAPI object with necessary basic configurations
+
+        :param session: HTTP session to submit requests through; when omitted, a pooled keep-alive session is created
+            on first use from the `ASYNC_POOL_MAXSIZE` and `*_TIMEOUT` configuration directives and closed along with
+            this object
+        :type session: aiohttp.ClientSession
+        :param rate_limiter: Rate limiter every request must pass through; when omitted, one is created from the
+            `RATE_*` configuration directives
+        :type rate_limiter: activecampaign.ratelimit.AdaptiveRateLimiter
+        :param retry_policy: Policy deciding whether and when failed requests are retried; when omitted, one is created
+            from the `RETRY_*` configuration directives
+        :type retry_policy: activecampaign.retry.RetryPolicy
+        :param instrumentation: Hooks every request attempt is reported to; when omitted, requests are not traced
+        :type instrumentation: activecampaign.instrumentation.Instrumentation
+        :param decoder: Decoder of response bodies; when omitted, one is created from the `RESPONSE_STREAM_THRESHOLD`
+            configuration directive
+        :type decoder: activecampaign.decode.ResponseDecoder
+        :param message_preparer: Preparer of the HTML content of messages; when omitted, one is created from the
+            `MESSAGE_*` configuration directives
+        :type message_preparer: activecampaign.messages.MessagePreparer
+        """
+        super().__init__(rate_limiter, retry_policy, instrumentation, decoder, message_preparer)
+
+        self._owns_session = session is None
+        self._session = session
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def session(self):
+        """Returns the HTTP session requests are submitted through
+
+        The session is created lazily, since aiohttp sessions must be created while an event loop is running.
+
+        :rtype: aiohttp.ClientSession
+        """
+        if self._session is None:
+            self._session = self._create_session()
+
+        return self._session
+
+    async def close(self):
+        """Releases pooled connections held by this object's session
+
+        Sessions passed in by the caller are left open, since they may be shared with other clients.
+        """
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def create_mailing_list(self, name, sender=None):
+        """Creates a mailing list; see `ActiveCampaignAPI.create_mailing_list`
+
+        :return: Returns the id of the created mailing list
+        :rtype: int
+        """
+        response = await self._make_post_request('list_add', self._mailing_list_body(name, sender))
+        return response['id']
+
+    async def create_address(self, sender, mailing_lists):
+        """Creates a physical address; see `ActiveCampaignAPI.create_address`
+
+        :return: Returns the id of the created address
+        :rtype: int
+        """
+        response = await self._make_post_request('address_add', self._address_body(sender, mailing_lists))
+        return response['id']
+
+    async def create_contact(self, email, mailing_lists, first_name=None, last_name=None):
+        """Creates a contact and associates with one or more mailing lists; see `ActiveCampaignAPI.create_contact`
+
+        :return: Returns the id of the created contact
+        :rtype: int
+        """
+        template = self._contact_template('contact_add', mailing_lists)
+        fields = self._contact_fields(email, first_name, last_name)
+
+        response = await self._make_templated_request(
+            template,
+            fields,
+            verify=lambda error: self._existing_contact(fields, mailing_lists)
+        )
+        return response.get('id')
+
+    async def sync_contact(self, email, mailing_lists, first_name=None, last_name=None):
+        """Creates or updates a contact, subscribing it to one or more mailing lists; see
+        `ActiveCampaignAPI.sync_contact`
+
+        :return: Returns the id of the contact
+        :rtype: int
+        """
+        template = self._contact_template('contact_sync', mailing_lists)
+
+        response = await self._make_templated_request(template, self._contact_fields(email, first_name, last_name))
+        return response.get('subscriber_id', response.get('id'))
+
+    async def unsubscribe_contact(self, contact_id, email, mailing_lists):
+        """Unsubscribes a contact from one or more mailing lists; see `ActiveCampaignAPI.unsubscribe_contact`"""
+        await self._make_post_request('contact_edit', self._contact_unsubscribe_body(contact_id, email, mailing_lists))
+
+    async def create_html_message(self, mailing_lists, subject=None, message_content=None, from_email=None,
+                                  from_name=None, reply_to=None, priority=3):
+        """Creates a message comprised of HTML content; see `ActiveCampaignAPI.create_html_message`
+
+        :return: Returns the id of the created message
+        :rtype: int
+        """
+        body = self._html_message_body(
+            mailing_lists,
+            subject,
+            message_content,
+            from_email,
+            from_name,
+            reply_to,
+            priority
+        )
+
+        response = await self._make_post_request('message_add', body)
+        return response['id']
+
+    async def create_single_campaign(self, name, send_date=None, mailing_lists=None, message=None):
+        """Creates a new "single"-type Campaign; see `ActiveCampaignAPI.create_single_campaign`
+
+        :return: Returns the id of the created campaign
+        :rtype: int
+        """
+        body = self._single_campaign_body(name, send_date, mailing_lists, message)
+
+        response = await self._make_post_request('campaign_create', body)
+        return response['id']
+
+    async def _make_post_request(self, action, body):
+        """Submits a POST request to the ActiveCampaign API, retrying it according to the retry policy
+
+        :param action: API action to be performed
+        :type action: str
+        :param body: POST body
+        :type body: dict
+
+        :return: Returns the JSON response body for the submitted POST request
+        :rtype: dict
+
+        :raises exc.ActiveCampaignRateLimitError: if the request was rejected for exceeding the account's rate limit
+        :raises exc.ActiveCampaignServerError: if the server failed to process the request
+        :raises exc.ActiveCampaignResponseError: if the returned JSON data's `result_code` attribute evaluates to a
+            False-y value
+        """
+        return await self._retry(action, body, lambda trace: self._submit_post_request(action, body, trace))
+
+    async def _make_templated_request(self, template, fields, verify=None):
+        """Submits a POST request made from a template, retrying it according to the retry policy; see
+        `ActiveCampaignAPI._make_templated_request`
+
+        :param verify: Coroutine function confirming that the object a retry was rejected as a duplicate of was
+            created by an earlier attempt
+        :type verify: callable
+
+        :rtype: dict
+        """
+        body = template.encode(fields)
+        return await self._retry(
+            template.action,
+            body,
+            lambda trace: self._send(template.url, trace, data=body, headers=FORM_HEADERS),
+            verify
+        )
+
+    async def _retry(self, action, body, submit, verify=None):
+        """Submits a request under the retry policy, tracing each attempt if the client is instrumented; see
+        `ActiveCampaignAPI._retry`
+
+        :param submit: Function returning a coroutine that submits a single attempt, taking the attempt's
+            `RequestTrace` or None
+        :type submit: callable
+
+        :rtype: dict
+        """
+        if self.instrumentation is None:
+            return await self.retry_policy.call_async(lambda: submit(None), action, verify)
+
+        attempts = itertools.count(1)
+
+        async def traced():
+            with self.instrumentation.trace(action, next(attempts), body) as trace:
+                return await submit(trace)
+
+        return await self.retry_policy.call_async(traced, action, verify)
+
+    async def _existing_contact(self, fields, mailing_lists):
+        """Looks up the contact a retried `contact_add` request was rejected as a duplicate of; see
+        `ActiveCampaignAPI._existing_contact`
+
+        :rtype: dict
+        """
+        params = dict(self._request_params('contact_view_email'), email=dict(fields)['email'])
+        try:
+            response_body = await self._retry(
+                'contact_view_email',
+                params,
+                lambda trace: self._send(self.request_url, trace, method='get', params=params)
+            )
+        except (exc.ActiveCampaignRateLimitError, exc.ActiveCampaignServerError):
+            raise
+        except exc.ActiveCampaignResponseError:
+            return None
+
+        return response_body if self._is_requested_contact(response_body, fields, mailing_lists) else None
+
+    async def _submit_post_request(self, action, body, trace=None):
+        """Submits a single POST request to the ActiveCampaign API; see `_make_post_request`
+
+        :rtype: dict
+        """
+        params = self._request_params(action)
+        payload = self._form_payload(body)
+        if trace is not None and isinstance(payload['data'], bytes):
+            trace.request_bytes = len(payload['data'])
+
+        try:
+            return await self._send(self.request_url, trace, params=params, **payload)
+        except exc.ActiveCampaignCompressionError:
+            # The server cannot read compressed bodies, so stop compressing them and send this one as it is
+            self.compression_accepted = False
+            return await self._send(self.request_url, trace, params=params, data=body)
+
+    async def _send(self, url, trace=None, method='post', **kwargs):
+        """Submits a single request once the rate limiter admits it, checking and decoding its response
+
+        :param url: URL the request is submitted to
+        :type url: str
+        :param trace: Trace of the attempt to record the request's status, size and timings in, if it is traced
+        :type trace: activecampaign.instrumentation.RequestTrace
+        :param method: HTTP method of the request
+        :type method: str
+        :param kwargs: Additional arguments passed to `aiohttp.ClientSession.request`
+
+        :rtype: dict
+        """
+        delay = self.rate_limiter.reserve() if self.rate_limiter is not None else 0.0
+        if delay:
+            await asyncio.sleep(delay)
+
+        started = time.monotonic()
+        async with self.session.request(method.upper(), url, **kwargs) as response:
+            if self.rate_limiter is not None:
+                self.rate_limiter.record(response.status, time.monotonic() - started)
+
+            if trace is None:
+                self._check_status(response.status)
+                response_body = self.decoder.decode(await response.read())
+            else:
+                trace.wait = delay
+                trace.status = response.status
+                trace.transport = time.monotonic() - started
+                self._check_status(response.status)
+                response_body = await self._read_traced(response, started, trace)
+
+        return self._check_response(response_body)
+
+    async def _read_traced(self, response, started, trace):
+        """Reads and decodes a JSON response body, recording its size and timings in the request's trace
+
+        :rtype: dict
+        """
+        content = await response.read()
+        trace.transport = time.monotonic() - started
+        trace.response_bytes = len(content)
+
+        decode_started = time.monotonic()
+        response_body = self.decoder.decode(content)
+        trace.decode = time.monotonic() - decode_started
+        return response_body
+
+    def _create_session(self):
+        """Creates an HTTP session whose connections are pooled and kept alive between requests
+
+        Requests beyond the connection limit wait for a pooled connection rather than a thread, so any number of calls
+        may be in flight on a single event loop.
+
+        :return: Returns a session configured from the `ASYNC_POOL_MAXSIZE` and `*_TIMEOUT` directives
+        :rtype: aiohttp.ClientSession
+        """
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=config['ASYNC_POOL_MAXSIZE'])
+        timeout = aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1])
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
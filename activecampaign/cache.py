@@ -0,0 +1,162 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from config import config
+
+
+CachedObject = namedtuple('CachedObject', ['object_id', 'validated'])
+CachedObject.__doc__ = """Remote object found in an `ObjectCache`
+
+:ivar object_id: Id of the object in the ActiveCampaign account
+:ivar validated: Whether the object was confirmed to still exist recently enough to be used without checking again
+"""
+
+
+class ObjectCache:
+    def __init__(self, path, ttl=None, max_entries=None, validate_after=None, clock=time.time):
+        """Initializes an ObjectCache, a persistent record of the remote objects created from given request bodies
+
+        Entries are keyed by a hash of the account, the API action and the complete request body, so an object is only
+        reused for a request to the same account that would have created an identical one: the same list name and
+        sender, the same address for the same lists, or the same subject and HTML for the same lists. Entries expire
+        `ttl` seconds after they were created, and once more than `max_entries` are held, the least recently used are
+        evicted.
+
+        :param path: Location of the SQLite database holding the cache; created if it does not exist
+        :type path: str
+        :param ttl: Number of seconds an entry may be used for; defaults to the `OBJECT_CACHE_TTL` configuration
+            directive
+        :type ttl: float
+        :param max_entries: Maximum number of entries held; defaults to the `OBJECT_CACHE_MAX_ENTRIES` configuration
+            directive
+        :type max_entries: int
+        :param validate_after: Number of seconds after which an object must be confirmed to still exist before it is
+            reused; defaults to the `OBJECT_CACHE_VALIDATE_AFTER` configuration directive
+        :type validate_after: float
+        :param clock: Function returning the current time in seconds since the epoch
+        :type clock: callable
+        """
+        self.path = path
+        self.ttl = ttl if ttl is not None else config['OBJECT_CACHE_TTL']
+        self.max_entries = max_entries if max_entries is not None else config['OBJECT_CACHE_MAX_ENTRIES']
+        self.validate_after = validate_after if validate_after is not None else config['OBJECT_CACHE_VALIDATE_AFTER']
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS objects ('
+            'key TEXT PRIMARY KEY, action TEXT, object_id INTEGER, created REAL, used REAL, validated REAL'
+            ') WITHOUT ROWID'
+        )
+        self._connection.execute('CREATE INDEX IF NOT EXISTS objects_used ON objects (used)')
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM objects').fetchone()[0]
+
+    def get(self, account, action, body):
+        """Looks up the object created by an earlier, identical request
+
+        :param account: Identifier of the account the object belongs to; see `ActiveCampaignAPI.cache_account`
+        :type account: str
+        :param action: API action that creates the object
+        :type action: str
+        :param body: Request body that would create the object
+        :type body: dict
+
+        :return: Returns the cached object, or None if there is no unexpired entry for the request
+        :rtype: CachedObject
+        """
+        key, now = self.key(account, action, body), self._clock()
+
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                'SELECT object_id, created, validated FROM objects WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            object_id, created, validated = row
+            if now - created > self.ttl:
+                self._connection.execute('DELETE FROM objects WHERE key = ?', (key,))
+                return None
+
+            self._connection.execute('UPDATE objects SET used = ? WHERE key = ?', (now, key))
+
+        return CachedObject(object_id, now - validated <= self.validate_after)
+
+    def put(self, account, action, body, object_id):
+        """Records the object created by a request
+
+        :param account: Identifier of the account the object belongs to; see `ActiveCampaignAPI.cache_account`
+        :type account: str
+        :param action: API action that created the object
+        :type action: str
+        :param body: Request body that created the object
+        :type body: dict
+        :param object_id: Id of the created object
+        :type object_id: int
+        """
+        now = self._clock()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?)',
+                (self.key(account, action, body), action, object_id, now, now, now)
+            )
+            self._connection.execute(
+                'DELETE FROM objects WHERE key IN (SELECT key FROM objects ORDER BY used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def mark_validated(self, account, action, body):
+        """Records that the object created by a request was just confirmed to still exist
+
+        :param account: Identifier of the account the object belongs to; see `ActiveCampaignAPI.cache_account`
+        :type account: str
+        :param action: API action that created the object
+        :type action: str
+        :param body: Request body that created the object
+        :type body: dict
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                'UPDATE objects SET validated = ? WHERE key = ?', (self._clock(), self.key(account, action, body))
+            )
+
+    def discard(self, account, action, body):
+        """Forgets the object created by a request, such as after it was found to have been deleted
+
+        :param account: Identifier of the account the object belongs to; see `ActiveCampaignAPI.cache_account`
+        :type account: str
+        :param action: API action that created the object
+        :type action: str
+        :param body: Request body that created the object
+        :type body: dict
+        """
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM objects WHERE key = ?', (self.key(account, action, body),))
+
+    def close(self):
+        """Closes the database"""
+        self._connection.close()
+
+    @staticmethod
+    def key(account, action, body):
+        """Returns the content hash identifying the object a request to an account creates
+
+        :rtype: str
+        """
+        content = json.dumps([account, action, body], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
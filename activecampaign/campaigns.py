@@ -0,0 +1,263 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+from activecampaign.models import Campaign, MailingList, Message, as_sender
+from activecampaign.scheduler import Step, StepScheduler
+from config import config
+
+
+# Steps taken for every campaign, each keyed by (campaign name, step)
+LIST = 'list'
+ADDRESS = 'address'
+CONTACTS = 'contacts'
+MESSAGE = 'message'
+CAMPAIGN = 'campaign'
+
+# Keys every campaign of a manifest must define, besides a sender, which may instead be defined for all campaigns
+MANIFEST_KEYS = ('name', 'send_date', 'subject', 'html', 'contacts')
+
+
+CampaignPlan = namedtuple('CampaignPlan', ['name', 'send_date', 'subject', 'html', 'contacts', 'sender'])
+CampaignPlan.__doc__ = """A campaign described by a manifest, to be created along with its mailing list
+
+:ivar name: Name of the campaign
+:ivar send_date: Date string (format: YYYY-MM-DD hh:mm:ss) of when the campaign should be sent
+:ivar subject: Subject of the campaign's message
+:ivar html: Location of the file holding the HTML content of the message
+:ivar contacts: Location of the CSV file holding the contacts the campaign is sent to
+:ivar sender: Sender of the campaign
+"""
+
+
+def load_manifest(path):
+    """Reads the campaigns described by a YAML or JSON manifest
+
+    The manifest holds a `campaigns` list, each defining the keys in `MANIFEST_KEYS` and a `sender` with the same keys
+    as `activecampaign.models.Sender`. A top-level `sender` applies to every campaign that does not define its own.
+    Locations of HTML and CSV files are relative to the manifest.
+
+    :param path: Location of the manifest; files whose name ends in .json are read as JSON, any other as YAML
+    :type path: str
+
+    :rtype: list[CampaignPlan]
+
+    :raises ValueError: if a campaign lacks a key, or two campaigns have the same name
+    """
+    with open(path) as f:
+        if path.endswith('.json'):
+            manifest = json.load(f)
+        else:
+            # As for configuration files, YAML is only imported when it is needed
+            import yaml
+            manifest = yaml.safe_load(f)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    plans = []
+
+    for number, campaign in enumerate(manifest.get('campaigns', []), 1):
+        sender = campaign.get('sender', manifest.get('sender'))
+        missing = [key for key in MANIFEST_KEYS if key not in campaign] + (['sender'] if sender is None else [])
+        if missing:
+            raise ValueError('Campaign {} of the manifest has no {}'.format(number, ', '.join(missing)))
+
+        plans.append(CampaignPlan(
+            name=campaign['name'],
+            send_date=str(campaign['send_date']),
+            subject=campaign['subject'],
+            html=os.path.join(directory, campaign['html']),
+            contacts=os.path.join(directory, campaign['contacts']),
+            sender=as_sender(sender)
+        ))
+
+    names = [plan.name for plan in plans]
+    if len(set(names)) < len(names):
+        raise ValueError('Campaign names in the manifest must be unique')
+
+    return plans
+
+
+def rejects_path(directory, plan):
+    """Returns the location of the CSV side file a campaign's rejected contact rows are written to
+
+    The file is named after the campaign, with characters unsafe in file names replaced, followed by a short hash of the
+    exact name, so that campaigns whose names only differ in those characters do not share a file.
+
+    :param directory: Directory holding the side files of every campaign
+    :type directory: str
+    :param plan: Campaign whose side file is located
+    :type plan: CampaignPlan
+
+    :rtype: str
+    """
+    digest = hashlib.sha1(plan.name.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(directory, '{}-{}.rejects.csv'.format(re.sub(r'[^\w.-]+', '_', plan.name), digest))
+
+
+def campaign_steps(api, plan, workers=1, rejects_directory=None):
+    """Returns the steps creating a campaign and its mailing list
+
+    The mailing list is created first; its address, contacts and message are then created independently of each
+    other, and the campaign once all of them exist.
+
+    :param api: Client used to make every request; it must be safe to share between threads
+    :type api: activecampaign.api.ActiveCampaignAPI
+    :param plan: Campaign to create
+    :type plan: CampaignPlan
+    :param workers: Number of contacts created concurrently while importing the campaign's contacts
+    :type workers: int
+    :param rejects_directory: Directory the contact rows rejected before submission are written to, in a CSV side file
+        named by `rejects_path`; when omitted, rejected rows are only counted in the contacts step's report
+    :type rejects_directory: str
+
+    :return: Returns the steps, keyed by the campaign's name and one of `LIST`, `ADDRESS`, `CONTACTS`, `MESSAGE` and
+        `CAMPAIGN`; the contacts step's value is an `activecampaign.sharding.ImportReport`
+    :rtype: list[activecampaign.scheduler.Step]
+    """
+    from activecampaign.pipeline import RejectWriter
+    from activecampaign.sharding import import_contacts
+
+    sender = plan.sender
+
+    def import_plan_contacts(mailing_list_id):
+        if rejects_directory is None:
+            return import_contacts(api, plan.contacts, [mailing_list_id], workers)
+
+        with open(rejects_path(rejects_directory, plan), 'w', newline='') as rejects:
+            return import_contacts(api, plan.contacts, [mailing_list_id], workers, reject=RejectWriter(rejects))
+
+    def create_message(mailing_list_id):
+        with open(plan.html) as f:
+            html = f.read()
+
+        return api.create_html_message(
+            Message([mailing_list_id], plan.subject, html, sender.email, sender.name, sender.email)
+        )
+
+    def key(step):
+        return plan.name, step
+
+    return [
+        Step(
+            key(LIST),
+            lambda: api.create_mailing_list(MailingList('{} - Mailing List'.format(plan.name), sender))
+        ),
+        Step(key(ADDRESS), lambda mailing_list_id: api.create_address(sender, [mailing_list_id]), [key(LIST)]),
+        Step(key(CONTACTS), import_plan_contacts, [key(LIST)]),
+        Step(key(MESSAGE), create_message, [key(LIST)]),
+        Step(
+            key(CAMPAIGN),
+            lambda mailing_list_id, address_id, report, message_id: api.create_single_campaign(
+                Campaign(plan.name, plan.send_date, [mailing_list_id], message_id)
+            ),
+            [key(LIST), key(ADDRESS), key(CONTACTS), key(MESSAGE)]
+        ),
+    ]
+
+
+def run_campaigns(api, plans, workers=1, contact_workers=1, rejects_directory=None):
+    """Creates every campaign of a manifest, running the independent steps of all campaigns concurrently
+
+    All steps share the client, and with it a single rate budget.
+
+    :param api: Client used to make every request; it must be safe to share between threads
+    :type api: activecampaign.api.ActiveCampaignAPI
+    :param plans: Campaigns to create
+    :type plans: list[CampaignPlan]
+    :param workers: Number of steps run concurrently, across all campaigns
+    :type workers: int
+    :param contact_workers: Number of contacts created concurrently by each contact import step
+    :type contact_workers: int
+    :param rejects_directory: Directory each campaign's rejected contact rows are written to; see `campaign_steps`
+    :type rejects_directory: str
+
+    :return: Returns an iterator over the outcome of each step, in the order they finish
+    :rtype: collections.abc.Iterator[activecampaign.scheduler.StepResult]
+    """
+    steps = [step for plan in plans for step in campaign_steps(api, plan, contact_workers, rejects_directory)]
+    return StepScheduler(workers).run(steps)
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Create every campaign described by a manifest')
+
+    parser.add_argument('manifest', help='YAML or JSON file describing the campaigns to create')
+    parser.add_argument(
+        '-w',
+        '--workers',
+        help='Number of steps run concurrently across all campaigns (default: 4)',
+        type=int,
+        default=4
+    )
+    parser.add_argument(
+        '-cw',
+        '--contact-workers',
+        help='Number of contacts each contact import creates concurrently (default: 1)',
+        type=int,
+        default=1
+    )
+
+    parser.add_argument(
+        '-r',
+        '--rejects',
+        help='Directory in which each campaign\'s contact rows rejected before submission are written to '
+             '<campaign>-<hash>.rejects.csv'
+    )
+
+    args = parser.parse_args()
+    if args.workers < 1 or args.contact_workers < 1:
+        parser.error('--workers and --contact-workers must be at least 1')
+    elif args.rejects and not os.path.isdir(args.rejects):
+        parser.error('rejects directory {} does not exist'.format(args.rejects))
+
+    return args
+
+
+def main(args):
+    from activecampaign.api import ActiveCampaignAPI
+
+    plans = load_manifest(args.manifest)
+    plans_by_name = {plan.name: plan for plan in plans}
+    failed = set()
+
+    # Keep a pooled connection available for every contact import worker of every step
+    config['POOL_MAXSIZE'] = max(config['POOL_MAXSIZE'], args.workers * args.contact_workers)
+
+    with ActiveCampaignAPI() as api:
+        for result in run_campaigns(api, plans, args.workers, args.contact_workers, args.rejects):
+            name, step = result.key
+            if result.error is not None:
+                failed.add(name)
+                print('[{}] {} failed: {}'.format(name, step, result.error), file=sys.stderr)
+            elif step == CONTACTS:
+                report = result.value
+                print('[{}] {} of {} contact(s) imported in {:.2f}s'.format(
+                    name,
+                    report.imported,
+                    report.rows,
+                    result.elapsed
+                ))
+                for number, email, error in report.failures:
+                    print(
+                        '[{}] Row {} ({}) could not be imported: {}'.format(name, number, email, error),
+                        file=sys.stderr
+                    )
+                if report.rejects:
+                    print('[{}] {} row(s) rejected{}'.format(
+                        name,
+                        report.rejects,
+                        '; see {}'.format(rejects_path(args.rejects, plans_by_name[name])) if args.rejects else ''
+                    ), file=sys.stderr)
+            elif step == CAMPAIGN:
+                print('[{}] Campaign scheduled for delivery on {}'.format(name, plans_by_name[name].send_date))
+
+    print('{} of {} campaign(s) created successfully'.format(len(plans) - len(failed), len(plans)))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(get_args()))
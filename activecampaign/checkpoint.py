@@ -0,0 +1,163 @@
+import json
+import os
+from collections import namedtuple
+
+
+CheckpointState = namedtuple('CheckpointState', ['metadata', 'offset', 'next_row', 'created', 'failed'])
+CheckpointState.__doc__ = """Progress of an import, as recorded in its checkpoint
+
+:ivar metadata: Dictionary of values recorded when the import was started
+:ivar offset: Byte offset in the CSV file at which the first unprocessed row starts
+:ivar next_row: Number of the first unprocessed row
+:ivar created: Number of contacts created so far
+:ivar failed: Number of rows that failed so far
+"""
+
+
+class ImportCheckpoint:
+    def __init__(self, path, sync_interval=100):
+        """Initializes an ImportCheckpoint recording the progress of a contact import in an append-only journal
+
+        The journal starts with a JSON header holding the import's metadata, followed by one compact JSON array per
+        processed row: `[row, end_offset, email, contact_id, error]`. Results must be recorded in row order, so the
+        last entry always marks the point an interrupted import can resume from. A partially written final entry, left
+        behind by a crash, is ignored.
+
+        :param path: Location of the journal
+        :type path: str
+        :param sync_interval: Number of entries recorded between flushes of the journal to disk
+        :type sync_interval: int
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self._file = None
+        self._unsynced = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def exists(self):
+        """Determines whether a journal has already been written
+
+        :rtype: bool
+        """
+        return os.path.exists(self.path)
+
+    def start(self, **metadata):
+        """Creates a new journal for an import
+
+        :param metadata: JSON-serializable values needed to resume the import, such as the mailing lists contacts are
+            being added to
+
+        :raises FileExistsError: if a journal already exists at the checkpoint's path
+        """
+        self._file = open(self.path, 'x')
+        self._file.write(json.dumps(metadata) + '\n')
+        self.sync()
+
+    def load(self):
+        """Reads an existing journal and opens it for recording further progress
+
+        :return: Returns the progress recorded in the journal
+        :rtype: CheckpointState
+        """
+        metadata, offset, next_row, created, failed = {}, 0, 1, 0, 0
+        valid_size = 0
+
+        with open(self.path, 'rb') as f:
+            for number, line in enumerate(f):
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    break
+
+                if not line.endswith(b'\n'):
+                    break
+
+                valid_size += len(line)
+                if number == 0:
+                    metadata = entry
+                    continue
+
+                row, offset, _, contact_id, error = entry
+                next_row = row + 1
+                if error is None:
+                    created += 1
+                else:
+                    failed += 1
+
+        self._file = open(self.path, 'a')
+        # Drop any entry that was only partially written before the previous run stopped
+        self._file.truncate(valid_size)
+        return CheckpointState(metadata, offset, next_row, created, failed)
+
+    def record(self, result):
+        """Appends the outcome of a row to the journal
+
+        :param result: Outcome of the row
+        :type result: activecampaign.importer.ImportResult
+        """
+        error = None if result.error is None else str(result.error)
+        entry = [result.row, result.offset, result.email, result.contact_id, error]
+        self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+        self._unsynced += 1
+        if self._unsynced >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Flushes recorded entries to disk"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        """Flushes recorded entries to disk and closes the journal"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def failed_rows(self):
+        """Reads the rows recorded as failed
+
+        :return: Returns an iterator over (row, email, error message) tuples
+        :rtype: collections.abc.Iterator[tuple]
+        """
+        for row, _, email, _, error in self._entries():
+            if error is not None:
+                yield row, email, error
+
+    def created_contacts(self):
+        """Reads the contacts recorded as created
+
+        :return: Returns an iterator over (email, contact id) tuples
+        :rtype: collections.abc.Iterator[tuple]
+        """
+        for _, _, email, contact_id, error in self._entries():
+            if error is None:
+                yield email, contact_id
+
+    def emails(self):
+        """Reads the email addresses of all processed rows
+
+        :rtype: collections.abc.Iterator[str]
+        """
+        for _, _, email, _, _ in self._entries():
+            yield email
+
+    def _entries(self):
+        """Reads the complete row entries in the journal
+
+        :rtype: collections.abc.Iterator[list]
+        """
+        with open(self.path) as f:
+            next(f, None)
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+
+                yield json.loads(line)
@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from activecampaign.models import Contact
+from config import config
+
+
+class _PendingContact:
+    """A contact waiting to be sent, with every mailing list it was added to so far"""
+
+    __slots__ = ('email', 'first_name', 'last_name', 'mailing_lists', 'futures')
+
+    def __init__(self, email):
+        self.email = email
+        self.first_name = None
+        self.last_name = None
+        # Dictionary keys keep the lists in the order they were first added, without repeats
+        self.mailing_lists = {}
+        self.futures = []
+
+
+class ContactCoalescer:
+    def __init__(self, api, sync=False, max_contacts=None, max_delay=None, workers=1):
+        """Initializes a ContactCoalescer that briefly holds contacts being added to mailing lists, so that every list a
+        contact is added to is subscribed in a single request
+
+        Pending contacts are sent once `max_contacts` distinct contacts are waiting and another one is added, so that
+        the last of them can still be added to further lists. They are also sent once the oldest of them has waited
+        `max_delay` seconds, and when `flush` or `close` is called. A contact added again after it was sent is sent in a
+        request of its own; pass `sync=True` when that can happen, as `contact_add` rejects existing contacts.
+
+        :param api: Client used to send contacts; it must be safe to share between threads
+        :type api: activecampaign.api.ActiveCampaignAPI
+        :param sync: Whether contacts are sent through `contact_sync`, which also updates existing contacts, rather
+            than `contact_add`
+        :type sync: bool
+        :param max_contacts: Number of distinct contacts held pending at most; when omitted, the
+            `COALESCE_MAX_CONTACTS` configuration directive is used
+        :type max_contacts: int
+        :param max_delay: Seconds a contact may wait before being sent; when omitted, the `COALESCE_MAX_DELAY`
+            configuration directive is used
+        :type max_delay: float
+        :param workers: Number of contacts that may be sent concurrently
+        :type workers: int
+        """
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+
+        self.api = api
+        self.sync = sync
+        self.max_contacts = max_contacts or config['COALESCE_MAX_CONTACTS']
+        self.max_delay = config['COALESCE_MAX_DELAY'] if max_delay is None else max_delay
+        # Number of (contact, mailing lists) additions received, and of requests made for them
+        self.additions = 0
+        self.requests = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, email, mailing_lists, first_name=None, last_name=None):
+        """Adds a contact to mailing lists, merging the lists with those of any pending addition of the same contact
+
+        :param email: Email address of the contact, compared without regard to case; a `activecampaign.models.Contact`
+            or any row with `email`, `first_name` and `last_name` attributes is accepted in its place
+        :type email: str | activecampaign.models.Contact
+        :param mailing_lists: Mailing lists the contact should be subscribed to
+        :type mailing_lists: list[int]
+        :param first_name: First name of the contact; replaces the name given by an earlier pending addition
+        :type first_name: str
+        :param last_name: Last name of the contact; replaces the name given by an earlier pending addition
+        :type last_name: str
+
+        :return: Returns a future resolving to the id of the contact, or to the error raised while sending it
+        :rtype: concurrent.futures.Future
+        """
+        if not isinstance(email, str):
+            email, first_name, last_name = email.email, email.first_name, email.last_name
+
+        future = Future()
+
+        with self._lock:
+            pending = self._pending.get(email.lower())
+            if pending is None:
+                if len(self._pending) >= self.max_contacts:
+                    self._send_pending()
+                pending = self._pending[email.lower()] = _PendingContact(email)
+
+            pending.first_name = first_name if first_name is not None else pending.first_name
+            pending.last_name = last_name if last_name is not None else pending.last_name
+            pending.mailing_lists.update(dict.fromkeys(mailing_lists))
+            pending.futures.append(future)
+            self.additions += 1
+
+            if self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        return future
+
+    def flush(self):
+        """Sends every pending contact, without waiting for the requests to complete"""
+        with self._lock:
+            self._send_pending()
+
+    def close(self):
+        """Sends every pending contact and waits for all requests to complete"""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _send_pending(self):
+        """Hands every pending contact to the worker threads; the lock must be held"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, {}
+        self.requests += len(pending)
+        for contact in pending.values():
+            self._executor.submit(self._send, contact)
+
+    def _send(self, pending):
+        """Sends a single contact with all of its mailing lists, resolving the futures of every addition merged into it
+
+        :param pending: Contact to send
+        :type pending: _PendingContact
+        """
+        submit = self.api.sync_contact if self.sync else self.api.create_contact
+
+        try:
+            contact_id = submit(
+                Contact(pending.email, pending.first_name, pending.last_name),
+                list(pending.mailing_lists)
+            )
+        except Exception as error:
+            for future in pending.futures:
+                future.set_exception(error)
+        else:
+            for future in pending.futures:
+                future.set_result(contact_id)
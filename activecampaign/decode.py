@@ -0,0 +1,127 @@
+import io
+
+from config import config
+
+# The fastest JSON parser available is used; all of them raise a ValueError for malformed documents
+try:
+    from orjson import loads
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    try:
+        from ujson import loads
+        JSON_BACKEND = 'ujson'
+    except ImportError:
+        from json import loads
+        JSON_BACKEND = 'json'
+
+# Incremental parser for large response bodies; optional, as bodies can always be decoded whole instead
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# Fields of response bodies the clients read: the outcome of every v1 API request, the id of the object it created or
+# changed, the details of a contact looked up to confirm a retried creation, and the outcome and batch id of bulk import
+# requests
+RESPONSE_FIELDS = frozenset([
+    'result_code',
+    'result_message',
+    'id',
+    'subscriber_id',
+    'email',
+    'first_name',
+    'last_name',
+    'lists',
+    'success',
+    'message',
+    'failureReasons',
+    'batchId',
+])
+
+
+class ResponseDecoder:
+    def __init__(self, fields=RESPONSE_FIELDS, stream_threshold=None):
+        """Initializes a ResponseDecoder, which turns JSON response bodies into the dictionaries the clients return
+
+        Only the top-level fields named in `fields` are kept, so responses carrying large payloads the clients never
+        read do not keep them alive for as long as the response body is held, for instance by a duplicate error.
+        Bodies larger than `stream_threshold` bytes are parsed incrementally when the optional ijson package is
+        installed, so that the payloads are never built as Python objects in the first place.
+
+        :param fields: Names of the top-level fields to keep; when None, the whole body is kept
+        :type fields: collections.abc.Set[str]
+        :param stream_threshold: Size in bytes above which a body is parsed incrementally; when None, bodies are always
+            decoded whole
+        :type stream_threshold: int
+        """
+        self.fields = fields
+        self.stream_threshold = stream_threshold
+
+    def decode(self, content):
+        """Decodes a JSON response body
+
+        :param content: Response body
+        :type content: bytes
+
+        :return: Returns the decoded body, limited to the decoder's fields if it is a JSON object
+        :rtype: dict
+
+        :raises ValueError: if the body is not valid JSON
+        """
+        if self.fields is None:
+            return loads(content)
+
+        if ijson is not None and self.stream_threshold is not None and len(content) > self.stream_threshold:
+            return self._decode_incrementally(content)
+
+        document = loads(content)
+        if not isinstance(document, dict):
+            return document
+
+        return {key: value for key, value in document.items() if key in self.fields}
+
+    def _decode_incrementally(self, content):
+        """Parses a JSON response body event by event, building only the values of the decoder's fields
+
+        :rtype: dict
+        """
+        events = ijson.basic_parse(io.BytesIO(content), use_float=True)
+        document, depth, builder, key = {}, 0, None, None
+
+        try:
+            first_event = next(events, (None, None))[0]
+            if first_event != 'start_map':
+                # Anything but an object holds no fields, so decode it as it is
+                return loads(content)
+
+            depth = 1
+            for event, value in events:
+                if event == 'map_key' and depth == 1:
+                    key = value
+                    builder = ijson.common.ObjectBuilder() if key in self.fields else None
+                    continue
+
+                if builder is not None:
+                    builder.event(event, value)
+
+                if event in ('start_map', 'start_array'):
+                    depth += 1
+                elif event in ('end_map', 'end_array'):
+                    depth -= 1
+
+                if builder is not None and depth == 1:
+                    document[key] = builder.value
+                    builder = None
+        except ijson.JSONError as error:
+            raise ValueError('Invalid JSON response body: {}'.format(error)) from error
+
+        return document
+
+
+def create_response_decoder():
+    """Creates a response decoder from the `RESPONSE_STREAM_THRESHOLD` configuration directive
+
+    :rtype: ResponseDecoder
+    """
+    return ResponseDecoder(RESPONSE_FIELDS, config['RESPONSE_STREAM_THRESHOLD'] or None)
@@ -0,0 +1,191 @@
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+
+from config import config
+
+
+class BloomFilter:
+    def __init__(self, capacity, false_positive_rate=0.01):
+        """Initializes a BloomFilter, a compact set that may report false positives but never false negatives
+
+        :param capacity: Number of keys the filter is sized for; more may be added at the cost of a higher false
+            positive rate
+        :type capacity: int
+        :param false_positive_rate: Probability of a false positive once `capacity` keys have been added
+        :type false_positive_rate: float
+        """
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key):
+        """Adds a key to the filter
+
+        :param key: Key to add
+        :type key: str
+        """
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def _positions(self, key):
+        """Derives the bit positions of a key by double hashing a single digest
+
+        :rtype: collections.abc.Iterator[int]
+        """
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+
+class DiskEmailSet:
+    def __init__(self, path=None, batch_size=10000):
+        """Initializes a DiskEmailSet, an exact set of email addresses stored in an SQLite database
+
+        :param path: Location of the database; when omitted, a temporary file is used and deleted on close
+        :type path: str
+        :param batch_size: Number of additions committed together
+        :type batch_size: int
+        """
+        if path is None:
+            descriptor, path = tempfile.mkstemp(suffix='.sqlite3', prefix='emails-')
+            os.close(descriptor)
+            self._temporary = True
+        else:
+            self._temporary = False
+
+        self.path = path
+        self.batch_size = batch_size
+        self._uncommitted = 0
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA journal_mode = OFF')
+        self._connection.execute('PRAGMA synchronous = OFF')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS emails (email TEXT PRIMARY KEY) WITHOUT ROWID')
+
+    def add(self, email):
+        """Adds an email address to the set
+
+        :param email: Email address to add
+        :type email: str
+        """
+        self._connection.execute('INSERT OR IGNORE INTO emails VALUES (?)', (email,))
+        self._uncommitted += 1
+        if self._uncommitted >= self.batch_size:
+            self._connection.commit()
+            self._uncommitted = 0
+
+    def __contains__(self, email):
+        return self._connection.execute('SELECT 1 FROM emails WHERE email = ?', (email,)).fetchone() is not None
+
+    def close(self):
+        """Closes the database, deleting it if it was temporary"""
+        self._connection.close()
+        if self._temporary:
+            os.remove(self.path)
+
+
+class EmailIndex:
+    def __init__(self, exact_limit=None, expected_emails=None, path=None):
+        """Initializes an EmailIndex recording which normalized email addresses have been seen
+
+        Addresses are held in an in-memory set until `exact_limit` of them have been seen. Beyond that, the index
+        moves them to a disk-backed set fronted by a Bloom filter: an address the filter has never seen is known to be
+        new without touching the disk, and only the filter's rare positives are confirmed against the disk. Lookups
+        therefore stay exact while memory use stays bounded by the size of the filter.
+
+        :param exact_limit: Number of addresses held in memory before switching to the disk-backed set; defaults to the
+            `DEDUP_EXACT_LIMIT` configuration directive
+        :type exact_limit: int
+        :param expected_emails: Number of addresses the Bloom filter is sized for; defaults to the
+            `DEDUP_EXPECTED_EMAILS` configuration directive
+        :type expected_emails: int
+        :param path: Location of the disk-backed set's database; when omitted, a temporary file is used
+        :type path: str
+        """
+        self.exact_limit = exact_limit if exact_limit is not None else config['DEDUP_EXACT_LIMIT']
+        self.expected_emails = expected_emails if expected_emails is not None else config['DEDUP_EXPECTED_EMAILS']
+        self.path = path
+        self.duplicates = 0
+        self._count = 0
+        self._exact = set()
+        self._filter = None
+        self._disk = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, email):
+        key = self._normalize(email)
+        if self._exact is not None:
+            return key in self._exact
+        else:
+            return key in self._filter and key in self._disk
+
+    @property
+    def spilled(self):
+        """Returns whether the index has switched to its disk-backed set
+
+        :rtype: bool
+        """
+        return self._exact is None
+
+    def add(self, email):
+        """Records an email address, reporting whether it had been seen before
+
+        :param email: Email address to record
+        :type email: str
+
+        :return: Returns True if the address is new, or False if it is a duplicate
+        :rtype: bool
+        """
+        if email in self:
+            self.duplicates += 1
+            return False
+
+        key = self._normalize(email)
+        if self._exact is not None:
+            self._exact.add(key)
+            if len(self._exact) > self.exact_limit:
+                self._spill()
+        else:
+            self._filter.add(key)
+            self._disk.add(key)
+
+        self._count += 1
+        return True
+
+    def close(self):
+        """Releases the disk-backed set, if the index switched to one"""
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def _spill(self):
+        """Moves the addresses held in memory to the Bloom filter and disk-backed set"""
+        self._filter = BloomFilter(max(self.expected_emails, len(self._exact) * 2))
+        self._disk = DiskEmailSet(self.path)
+        for key in self._exact:
+            self._filter.add(key)
+            self._disk.add(key)
+
+        self._exact = None
+
+    @staticmethod
+    def _normalize(email):
+        """Returns the form of an email address used for comparison
+
+        :rtype: str
+        """
+        return email.strip().lower()
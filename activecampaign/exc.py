@@ -1,2 +1,33 @@
 class ActiveCampaignResponseError(Exception):
     pass
+
+
+class ActiveCampaignRateLimitError(ActiveCampaignResponseError):
+    pass
+
+
+class ActiveCampaignCompressionError(ActiveCampaignResponseError):
+    pass
+
+
+class ActiveCampaignServerError(ActiveCampaignResponseError):
+    def __init__(self, status_code=None):
+        super().__init__('Server responded with HTTP {}'.format(status_code))
+        self.status_code = status_code
+
+
+class ActiveCampaignDuplicateError(ActiveCampaignResponseError):
+    def __init__(self, message=None, response_body=None):
+        super().__init__(message)
+        self.response_body = response_body
+
+
+class ActiveCampaignReplayError(Exception):
+    pass
+
+
+class ActiveCampaignDependencyError(Exception):
+    def __init__(self, dependency=None, error=None):
+        super().__init__('Skipped because {} failed: {}'.format(dependency, error))
+        self.dependency = dependency
+        self.error = error
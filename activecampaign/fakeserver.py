@@ -0,0 +1,516 @@
+"""A self-contained stand-in for the ActiveCampaign API, for exercising clients without network access
+
+Run `python -m activecampaign.fakeserver --help` for its options, or start it from Python with `FakeActiveCampaign`.
+"""
+import argparse
+import gzip
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qsl, urlsplit
+
+from activecampaign.api import API_PATH, BULK_IMPORT_PATH
+from activecampaign.ratelimit import TokenBucket
+
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+LIST_FIELD_PATTERN = re.compile(r'^(?:p|list)\[(\d+)\]$')
+ADDRESS_PATH_PATTERN = re.compile(r'^/api/3/addresses/(\d+)$')
+
+
+def parse_latency(spec):
+    """Parses a latency distribution specification into a function returning simulated latencies
+
+    Supported specifications, with all values in seconds, are `constant:<seconds>`, `uniform:<low>,<high>`,
+    `normal:<mean>,<stddev>`, `lognormal:<median>,<sigma>` and `exponential:<mean>`. Negative samples are treated as
+    no latency.
+
+    :param spec: Latency distribution specification, e.g. 'lognormal:0.05,0.5'
+    :type spec: str
+
+    :return: Returns a function taking a random number generator and returning a latency in seconds
+    :rtype: callable
+
+    :raises ValueError: if the specification is not recognized
+    """
+    name, _, values = spec.partition(':')
+    try:
+        values = [float(value) for value in values.split(',')] if values else []
+    except ValueError:
+        raise ValueError('invalid latency distribution: {}'.format(spec))
+
+    distributions = {
+        ('constant', 1): lambda rng: values[0],
+        ('uniform', 2): lambda rng: rng.uniform(values[0], values[1]),
+        ('normal', 2): lambda rng: rng.gauss(values[0], values[1]),
+        ('lognormal', 2): lambda rng: values[0] * rng.lognormvariate(0, values[1]),
+        ('exponential', 1): lambda rng: rng.expovariate(1 / values[0]) if values[0] else 0.0,
+    }
+
+    distribution = distributions.get((name, len(values)))
+    if distribution is None:
+        raise ValueError('invalid latency distribution: {}'.format(spec))
+
+    return lambda rng: max(0.0, distribution(rng))
+
+
+class FakeActiveCampaign:
+    ACTIONS = frozenset([
+        'list_add', 'list_view', 'address_add', 'contact_add', 'contact_sync', 'contact_edit', 'contact_view_email',
+        'message_add', 'message_view', 'campaign_create'
+    ])
+
+    def __init__(self, api_key='fakekey', latency='constant:0', error_rate=0.0, rate_limit=None, burst=None, seed=None,
+                 accept_compression=True):
+        """Initializes a FakeActiveCampaign server implementing the API actions used by `ActiveCampaignAPI`
+
+        The server answers the v1 actions in `ACTIONS` at `/admin/api.php`, and the v3 bulk import and address
+        endpoints, keeping created objects in memory. Responses mirror the API's `result_code`/`result_message`
+        conventions, including duplicate-contact and authorization errors. Each request is delayed by a latency drawn
+        from a configurable distribution, fails with HTTP 500 at a configurable rate, and is throttled with HTTP 429
+        once its API key exceeds a configurable rate. Request bodies compressed with gzip are read, or refused with HTTP
+        415.
+
+        :param api_key: API key requests must present
+        :type api_key: str
+        :param latency: Distribution of simulated server latency; see `parse_latency`
+        :type latency: str
+        :param error_rate: Fraction of requests answered with HTTP 500
+        :type error_rate: float
+        :param rate_limit: Requests per second admitted for each API key; None disables throttling
+        :type rate_limit: float
+        :param burst: Requests admitted back-to-back for each API key; defaults to `rate_limit`, rounded up
+        :type burst: int
+        :param seed: Seed for the random number generator driving latency and errors, for repeatable runs
+        :type seed: int
+        :param accept_compression: Whether request bodies compressed with gzip are read rather than refused
+        :type accept_compression: bool
+        """
+        self.api_key = api_key
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst or (max(1, math.ceil(rate_limit)) if rate_limit else None)
+        self.accept_compression = accept_compression
+
+        self.lists = {}
+        self.addresses = {}
+        self.contacts = {}
+        # Email address of each contact, keyed by its id as it appears in requests, so contacts can be found by id
+        self.contact_emails = {}
+        self.messages = {}
+        self.campaigns = {}
+        # Status of each contact on each mailing list, keyed by (list id, email): 1 subscribed, 2 unsubscribed
+        self.subscriptions = {}
+        self.requests = Counter()
+        # Bytes of request bodies received for each action, as sent over the wire
+        self.request_bytes = Counter()
+
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def base_url(self):
+        """Returns the URL clients should use as `AC_BASE_URL`
+
+        :rtype: str
+        """
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def start(self, host='127.0.0.1', port=0):
+        """Starts serving requests on a background thread
+
+        :param host: Address to listen on
+        :type host: str
+        :param port: Port to listen on; 0 picks a free port
+        :type port: int
+
+        :return: Returns the server's base URL
+        :rtype: str
+        """
+        self._server = _ThreadingHTTPServer((host, port), _RequestHandler)
+        self._server.app = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """Stops serving requests and closes the listening socket"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def handle(self, path, query, headers, body, method='POST'):
+        """Produces the response to a single request
+
+        :param path: Path the request was sent to
+        :type path: str
+        :param query: Query string parameters
+        :type query: dict
+        :param headers: Request headers
+        :type headers: email.message.Message
+        :param body: Raw request body
+        :type body: bytes
+        :param method: HTTP method of the request; the parameters of GET requests are read from the query string
+        :type method: str
+
+        :return: Returns the HTTP status and the JSON-serializable response body
+        :rtype: tuple
+        """
+        api_key = query.get('api_key') if path == API_PATH else headers.get('Api-Token')
+        address = ADDRESS_PATH_PATTERN.match(path)
+        if path == API_PATH:
+            action = query.get('api_action')
+        else:
+            action = 'address_view' if address else 'bulk_import'
+
+        with self._lock:
+            self.requests[action] += 1
+            self.request_bytes[action] += len(body)
+            delay = self.latency(self._random)
+            failed = self._random.random() < self.error_rate
+
+        time.sleep(delay)
+
+        if not self._admit(api_key):
+            return 429, {'message': 'Too Many Requests'}
+        elif failed:
+            return 500, {'message': 'Internal Server Error'}
+
+        if headers.get('Content-Encoding') == 'gzip':
+            if not self.accept_compression:
+                return 415, {'message': 'Unsupported Media Type'}
+            body = gzip.decompress(body)
+
+        if path == BULK_IMPORT_PATH:
+            return self._bulk_import(api_key, body)
+        elif address and method == 'GET':
+            return self._address_view(api_key, int(address.group(1)))
+        elif path != API_PATH:
+            return 404, {'message': 'Not Found'}
+        elif api_key != self.api_key:
+            return 200, self._result(0, 'You are not authorized to access this file')
+
+        handler = getattr(self, '_' + action, None) if action in self.ACTIONS else None
+        if handler is None:
+            return 200, self._result(0, 'Unknown api_action: {}'.format(action))
+
+        form = dict(parse_qsl(body.decode('utf-8'))) if method == 'POST' else query
+        with self._lock:
+            return 200, handler(form)
+
+    def _admit(self, api_key):
+        """Determines whether a request made with the given API key is within its rate limit
+
+        :rtype: bool
+        """
+        if not self.rate_limit:
+            return True
+
+        with self._lock:
+            bucket = self._buckets.get(api_key)
+            if bucket is None:
+                bucket = self._buckets[api_key] = TokenBucket(self.rate_limit, self.burst)
+
+        return bucket.try_acquire()
+
+    def _list_add(self, form):
+        if not form.get('name'):
+            return self._result(0, 'List name is required')
+
+        list_id = next(self._ids)
+        self.lists[list_id] = form
+        return self._result(1, 'List added', id=list_id)
+
+    def _list_view(self, form):
+        return self._view(self.lists, form)
+
+    def _address_add(self, form):
+        missing = [field for field in ('company_name', 'address_1', 'country') if not form.get(field)]
+        if missing:
+            return self._result(0, 'Missing required field: {}'.format(missing[0]))
+
+        unknown = self._unknown_lists(form)
+        if unknown:
+            return self._result(0, 'List {} does not exist'.format(unknown[0]))
+
+        address_id = next(self._ids)
+        self.addresses[address_id] = form
+        return self._result(1, 'Address added', id=address_id)
+
+    def _contact_add(self, form):
+        email = form.get('email', '').strip().lower()
+        if not EMAIL_PATTERN.match(email):
+            return self._result(0, 'Contact Email Address is not valid.')
+        elif email in self.contacts:
+            return self._result(0, 'Contact Email Address is already in the system.')
+
+        unknown = self._unknown_lists(form)
+        if unknown:
+            return self._result(0, 'List {} does not exist'.format(unknown[0]))
+
+        contact_id = next(self._ids)
+        self.contacts[email] = dict(form, id=contact_id)
+        self.contact_emails[str(contact_id)] = email
+        self._subscribe(email, form)
+        return self._result(1, 'Contact added', id=contact_id, subscriber_id=contact_id)
+
+    def _contact_sync(self, form):
+        email = form.get('email', '').strip().lower()
+        if not EMAIL_PATTERN.match(email):
+            return self._result(0, 'Contact Email Address is not valid.')
+
+        unknown = self._unknown_lists(form)
+        if unknown:
+            return self._result(0, 'List {} does not exist'.format(unknown[0]))
+
+        existing = self.contacts.get(email)
+        contact_id = existing['id'] if existing else next(self._ids)
+        self.contacts[email] = dict(existing or {}, **form, id=contact_id)
+        self.contact_emails[str(contact_id)] = email
+        self._subscribe(email, form)
+        return self._result(1, 'Contact updated' if existing else 'Contact added', subscriber_id=contact_id)
+
+    def _contact_edit(self, form):
+        email = self.contact_emails.get(form.get('id'))
+        if email is None:
+            return self._result(0, 'Contact not found')
+
+        unknown = self._unknown_lists(form)
+        if unknown:
+            return self._result(0, 'List {} does not exist'.format(unknown[0]))
+
+        fields = {key: value for key, value in form.items() if not LIST_FIELD_PATTERN.match(key)}
+        self.contacts[email].update(fields, id=self.contacts[email]['id'])
+        self._subscribe(email, form)
+        return self._result(1, 'Contact updated', subscriber_id=self.contacts[email]['id'])
+
+    def _contact_view_email(self, form):
+        email = form.get('email', '').strip().lower()
+        contact = self.contacts.get(email)
+        if contact is None:
+            return self._result(0, 'Failed: Nothing is returned')
+
+        lists = {
+            str(list_id): {'listid': list_id, 'status': self.subscriptions[list_id, email]}
+            for list_id in self.lists if (list_id, email) in self.subscriptions
+        }
+        return self._result(
+            1,
+            'Success: Something is returned',
+            id=contact['id'],
+            email=email,
+            first_name=contact.get('first_name', ''),
+            last_name=contact.get('last_name', ''),
+            lists=lists
+        )
+
+    def _message_add(self, form):
+        if not form.get('subject') or not form.get('html'):
+            return self._result(0, 'Message subject and content are required')
+
+        message_id = next(self._ids)
+        self.messages[message_id] = form
+        return self._result(1, 'Message added', id=message_id)
+
+    def _message_view(self, form):
+        return self._view(self.messages, form)
+
+    def _campaign_create(self, form):
+        messages = [int(key[2:-1]) for key in form if key.startswith('m[')]
+        if not messages or any(message_id not in self.messages for message_id in messages):
+            return self._result(0, 'Campaign message does not exist')
+
+        unknown = self._unknown_lists(form)
+        if unknown:
+            return self._result(0, 'List {} does not exist'.format(unknown[0]))
+
+        campaign_id = next(self._ids)
+        self.campaigns[campaign_id] = form
+        return self._result(1, 'Campaign created', id=campaign_id)
+
+    def _view(self, objects, form):
+        """Produces the response to a view action for one of the collections of objects
+
+        :rtype: dict
+        """
+        try:
+            object_id = int(form.get('id', ''))
+        except ValueError:
+            object_id = None
+
+        if object_id not in objects:
+            return self._result(0, 'Failed: Nothing is returned')
+
+        return self._result(1, 'Success: Something is returned', id=object_id, **objects[object_id])
+
+    def _address_view(self, api_key, address_id):
+        """Answers a request to the v3 endpoint retrieving an address
+
+        :rtype: tuple
+        """
+        if api_key != self.api_key:
+            return 403, {'message': 'No Result found for Subscriber with id 0'}
+
+        with self._lock:
+            address = self.addresses.get(address_id)
+        if address is None:
+            return 404, {'message': 'No Result found for Address with id {}'.format(address_id)}
+
+        return 200, {'address': dict(address, id=str(address_id))}
+
+    def _bulk_import(self, api_key, body):
+        """Produces the response to a v3 bulk import request
+
+        :rtype: tuple
+        """
+        if api_key != self.api_key:
+            return 403, {'message': 'No Result found for Subscriber with id 0'}
+
+        try:
+            contacts = json.loads(body.decode('utf-8'))['contacts']
+        except (ValueError, KeyError):
+            return 400, {'success': 0, 'message': 'Invalid request body'}
+
+        failures = [
+            'contact {}: invalid email address'.format(index)
+            for index, contact in enumerate(contacts) if not EMAIL_PATTERN.match(contact.get('email', ''))
+        ]
+        if failures:
+            return 400, {'success': 0, 'failureReasons': failures}
+
+        with self._lock:
+            for contact in contacts:
+                email = contact['email'].strip().lower()
+                contact_id = self.contacts[email]['id'] if email in self.contacts else next(self._ids)
+                self.contacts[email] = dict(contact, id=contact_id)
+                self.contact_emails[str(contact_id)] = email
+                for subscription in contact.get('subscribe', []):
+                    self.subscriptions[int(subscription['listid']), email] = 1
+
+        return 200, {'success': 1, 'queued_contacts': len(contacts), 'batchId': str(uuid.uuid4())}
+
+    def _subscribe(self, email, form):
+        """Sets a contact's status on the mailing lists referenced by a request, subscribing it unless told otherwise"""
+        for match in map(LIST_FIELD_PATTERN.match, form):
+            if match:
+                list_id = int(match.group(1))
+                self.subscriptions[list_id, email] = int(form.get('status[{}]'.format(list_id), 1))
+
+    def _unknown_lists(self, form):
+        """Returns the ids of mailing lists referenced by a request that do not exist
+
+        :rtype: list[int]
+        """
+        list_ids = (int(match.group(1)) for match in map(LIST_FIELD_PATTERN.match, form) if match)
+        return [list_id for list_id in list_ids if list_id not in self.lists]
+
+    @staticmethod
+    def _result(code, message, **values):
+        return dict(values, result_code=code, result_message=message, result_output='json')
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    # Speak HTTP/1.1 so clients can keep connections alive between requests, as they would against the real API
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, Nagle's algorithm holds the body back for the client's
+    # delayed acknowledgement and adds tens of milliseconds to every response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.do_POST(method='GET')
+
+    def do_POST(self, method='POST'):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        status, response_body = self.server.app.handle(
+            url.path, dict(parse_qsl(url.query)), self.headers, body, method
+        )
+
+        content = json.dumps(response_body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the ActiveCampaign API')
+
+    parser.add_argument('--host', help='Address to listen on (default: 127.0.0.1)', default='127.0.0.1')
+    parser.add_argument('--port', help='Port to listen on (default: 8080)', type=int, default=8080)
+    parser.add_argument('--api-key', help='API key requests must present (default: fakekey)', default='fakekey')
+
+    parser.add_argument(
+        '--latency',
+        help='Simulated latency distribution, e.g. constant:0.05, uniform:0.01,0.1, normal:0.05,0.01, '
+             'lognormal:0.05,0.5 or exponential:0.05 (default: constant:0)',
+        default='constant:0'
+    )
+
+    parser.add_argument('--error-rate', help='Fraction of requests failing with HTTP 500', type=float, default=0.0)
+    parser.add_argument('--rate-limit', help='Requests per second admitted per API key', type=float)
+    parser.add_argument('--burst', help='Requests admitted back-to-back per API key', type=int)
+    parser.add_argument('--seed', help='Random seed, for repeatable latency and errors', type=int)
+    parser.add_argument(
+        '--refuse-compression',
+        help='Answer request bodies compressed with gzip with HTTP 415',
+        action='store_true'
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args()
+
+    server = FakeActiveCampaign(
+        api_key=args.api_key,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        seed=args.seed,
+        accept_compression=not args.refuse_compression
+    )
+
+    server.start(args.host, args.port)
+    print('Serving fake ActiveCampaign API at {} (AC_API_KEY={})'.format(server.base_url, args.api_key))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
@@ -0,0 +1,252 @@
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import requests
+
+from activecampaign import exc
+from activecampaign.api import BULK_IMPORT_MAX_CONTACTS
+from activecampaign.membership import REMOVE
+
+
+ImportResult = namedtuple('ImportResult', ['row', 'email', 'contact_id', 'error', 'offset'])
+ImportResult.__doc__ = """Outcome of importing a single contact row
+
+:ivar row: Number of the row in its CSV file
+:ivar email: Email address of the contact
+:ivar contact_id: Id of the created contact, or None if creation failed
+:ivar error: Exception raised while creating the contact, or None if creation succeeded
+:ivar offset: Byte offset in the CSV file at which the following row starts
+"""
+
+SyncResult = namedtuple('SyncResult', ['action', 'email', 'contact_id', 'error'])
+SyncResult.__doc__ = """Outcome of a single change made to a mailing list by `ContactSynchronizer`
+
+:ivar action: Kind of change; see `activecampaign.membership.MembershipChange`
+:ivar email: Email address of the contact
+:ivar contact_id: Id of the contact, or None if it is not known
+:ivar error: Exception raised while making the change, or None if it succeeded
+"""
+
+
+class ContactImporter:
+    def __init__(self, api, mailing_lists, workers=1, max_pending=None, recover_duplicates=False):
+        """Initializes a ContactImporter that creates contacts through a bounded pool of worker threads
+
+        :param api: Client used to create contacts; it must be safe to share between threads
+        :type api: activecampaign.api.ActiveCampaignAPI
+        :param mailing_lists: Mailing lists every imported contact should be associated with
+        :type mailing_lists: list[int]
+        :param workers: Number of contacts that may be created concurrently
+        :type workers: int
+        :param max_pending: Maximum number of rows read ahead of the oldest unreported result; defaults to four times
+            the number of workers
+        :type max_pending: int
+        :param recover_duplicates: Whether a row rejected as a duplicate is reported as created when its contact is
+            found on every one of `mailing_lists`, as it is when a resumed import repeats rows that an interrupted run
+            created after its last checkpoint
+        :type recover_duplicates: bool
+        """
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+
+        self.api = api
+        self.mailing_lists = mailing_lists
+        self.workers = workers
+        self.max_pending = max_pending or workers * 4
+        self.recover_duplicates = recover_duplicates
+
+    def run(self, rows):
+        """Creates a contact for each row, yielding results in the same order as the rows
+
+        Rows are consumed lazily, so at most `max_pending` rows are held in memory at any time regardless of how many
+        are supplied.
+
+        :param rows: Contacts to create
+        :type rows: collections.abc.Iterable[activecampaign.reader.ContactRow]
+
+        :return: Returns an iterator over the result of each row
+        :rtype: collections.abc.Iterator[ImportResult]
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+
+            for row in rows:
+                pending.append((row, executor.submit(self._submit, row)))
+                if len(pending) >= self.max_pending:
+                    yield self._result(*pending.popleft())
+
+            while pending:
+                yield self._result(*pending.popleft())
+
+    def _submit(self, row):
+        """Creates the contact described by a single row
+
+        :param row: Contact to create
+        :type row: activecampaign.reader.ContactRow
+
+        :return: Returns the id of the created contact
+        :rtype: int
+        """
+        try:
+            return self.api.create_contact(
+                row.email,
+                self.mailing_lists,
+                first_name=row.first_name,
+                last_name=row.last_name
+            )
+        except exc.ActiveCampaignDuplicateError:
+            if not self.recover_duplicates:
+                raise
+
+            contact_id = self.api.find_listed_contact(row.email, self.mailing_lists)
+            if contact_id is None:
+                raise
+
+            return contact_id
+
+    @staticmethod
+    def _result(row, future):
+        """Waits for a submitted row to complete and converts its outcome to an ImportResult
+
+        :param row: Contact that was submitted
+        :type row: activecampaign.reader.ContactRow
+        :param future: Future tracking creation of the row's contact
+        :type future: concurrent.futures.Future
+
+        :return: Returns the outcome of the row
+        :rtype: ImportResult
+        """
+        try:
+            return ImportResult(row.number, row.email, future.result(), None, row.end_offset)
+        except (exc.ActiveCampaignResponseError, requests.RequestException) as error:
+            return ImportResult(row.number, row.email, None, error, row.end_offset)
+
+
+class BulkContactImporter:
+    def __init__(self, api, mailing_lists, chunk_size=BULK_IMPORT_MAX_CONTACTS, recover_duplicates=False):
+        """Initializes a BulkContactImporter that creates contacts through the bulk import endpoint
+
+        :param api: Client used to create contacts
+        :type api: activecampaign.api.ActiveCampaignAPI
+        :param mailing_lists: Mailing lists every imported contact should be associated with
+        :type mailing_lists: list[int]
+        :param chunk_size: Number of rows read and submitted at a time; chunks larger than the endpoint accepts are
+            split into several requests
+        :type chunk_size: int
+        :param recover_duplicates: Whether a row rejected as a duplicate is reported as created when its contact is
+            found on every one of `mailing_lists`; see `ContactImporter`
+        :type recover_duplicates: bool
+        """
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be at least 1')
+
+        self.api = api
+        self.mailing_lists = mailing_lists
+        self.chunk_size = chunk_size
+        self.recover_duplicates = recover_duplicates
+
+    def run(self, rows):
+        """Creates a contact for each row, yielding results in the same order as the rows
+
+        Contacts queued by the bulk import endpoint are reported as succeeding without a contact id, since the endpoint
+        assigns ids asynchronously.
+
+        :param rows: Contacts to create
+        :type rows: collections.abc.Iterable[activecampaign.reader.ContactRow]
+
+        :return: Returns an iterator over the result of each row
+        :rtype: collections.abc.Iterator[ImportResult]
+        """
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+
+            for result in self.api.create_contacts_bulk(chunk, self.mailing_lists):
+                row, contact_id, error = result.contact, result.contact_id, result.error
+                if self.recover_duplicates and isinstance(error, exc.ActiveCampaignDuplicateError):
+                    contact_id = self.api.find_listed_contact(row.email, self.mailing_lists)
+                    error = error if contact_id is None else None
+
+                yield ImportResult(row.number, row.email, contact_id, error, row.end_offset)
+
+
+class ContactSynchronizer(ContactImporter):
+    def __init__(self, api, index, mailing_list, workers=1, max_pending=None):
+        """Initializes a ContactSynchronizer that brings a mailing list in line with a list of contacts, submitting only
+        the differences from what a membership index records
+
+        Contacts not yet on the list are subscribed to it and members whose name changed are updated, both through the
+        `contact_sync` action, while members missing from the contacts are unsubscribed. Each change that succeeds is
+        recorded in the index, so the next run starts from the list's new state.
+
+        :param api: Client used to make changes; it must be safe to share between threads
+        :type api: activecampaign.api.ActiveCampaignAPI
+        :param index: Index recording the mailing list's members
+        :type index: activecampaign.membership.MembershipIndex
+        :param mailing_list: Mailing list to synchronize
+        :type mailing_list: int
+        :param workers: Number of changes that may be made concurrently
+        :type workers: int
+        :param max_pending: Maximum number of changes held ahead of the oldest unreported result; defaults to four times
+            the number of workers
+        :type max_pending: int
+        """
+        super().__init__(api, [mailing_list], workers, max_pending)
+
+        self.index = index
+        self.mailing_list = mailing_list
+
+    def run(self, rows):
+        """Makes the changes needed for the mailing list to hold exactly the given contacts
+
+        Additions and updates are reported in the same order as the rows, followed by removals.
+
+        :param rows: Contacts that should be on the list; they must not repeat an email address
+        :type rows: collections.abc.Iterable[activecampaign.reader.ContactRow]
+
+        :return: Returns an iterator over the result of each change
+        :rtype: collections.abc.Iterator[SyncResult]
+        """
+        return super().run(self.index.diff(self.mailing_list, rows))
+
+    def _submit(self, change):
+        """Makes a single change to the mailing list
+
+        :param change: Change to make
+        :type change: activecampaign.membership.MembershipChange
+
+        :return: Returns the id of the contact
+        :rtype: int
+        """
+        if change.action == REMOVE:
+            self.api.unsubscribe_contact(change.contact_id, change.email, self.mailing_lists)
+            return change.contact_id
+
+        row = change.row
+        return self.api.sync_contact(row.email, self.mailing_lists, row.first_name, row.last_name)
+
+    def _result(self, change, future):
+        """Waits for a submitted change to complete, recording it in the index if it succeeded
+
+        :param change: Change that was submitted
+        :type change: activecampaign.membership.MembershipChange
+        :param future: Future tracking the change
+        :type future: concurrent.futures.Future
+
+        :return: Returns the outcome of the change
+        :rtype: SyncResult
+        """
+        try:
+            contact_id = future.result()
+        except (exc.ActiveCampaignResponseError, requests.RequestException) as error:
+            return SyncResult(change.action, change.email, change.contact_id, error)
+
+        if change.action == REMOVE:
+            self.index.remove(self.mailing_list, change.email)
+        else:
+            self.index.record(self.mailing_list, change.email, contact_id, change.row.first_name, change.row.last_name)
+
+        return SyncResult(change.action, change.email, contact_id, None)
@@ -0,0 +1,273 @@
+import bisect
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+
+# Upper bounds, in seconds, of the buckets request timings are counted in
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Phases of a request that are timed separately: waiting for the rate limiter, sending the request and receiving the
+# response (including any connection setup, which the HTTP clients do not report separately), and decoding the JSON body
+PHASES = ('wait', 'transport', 'decode')
+
+
+class RequestTrace:
+    __slots__ = ('action', 'attempt', 'request_bytes', 'status', 'response_bytes', 'elapsed', 'error') + PHASES
+
+    def __init__(self, action, attempt, request_bytes):
+        """Initializes a RequestTrace describing a single attempt at an API request
+
+        Hooks receive the trace before the request is submitted, with only `action`, `attempt` and `request_bytes`
+        set, and again once it has completed or failed.
+
+        :ivar action: API action performed by the request
+        :ivar attempt: Number of the attempt; 1 for the first submission, higher for retries
+        :ivar request_bytes: Size of the encoded request body
+        :ivar status: HTTP status code of the response, or None if no response was received
+        :ivar response_bytes: Size of the response body, or None if no response was received
+        :ivar elapsed: Number of seconds the attempt took in total
+        :ivar error: Exception the attempt failed with, or None if it succeeded
+        :ivar wait: Number of seconds spent waiting for the rate limiter
+        :ivar transport: Number of seconds spent sending the request and receiving the response
+        :ivar decode: Number of seconds spent decoding the response body
+        """
+        self.action = action
+        self.attempt = attempt
+        self.request_bytes = request_bytes
+        self.status = None
+        self.response_bytes = None
+        self.elapsed = None
+        self.error = None
+        self.wait = 0.0
+        self.transport = None
+        self.decode = None
+
+
+class Instrumentation:
+    def __init__(self, before_hooks=(), after_hooks=()):
+        """Initializes an Instrumentation object that reports every request attempt made by a client to hooks
+
+        Clients only trace requests when they are given an Instrumentation object, so uninstrumented clients pay no
+        cost beyond a single attribute check per request.
+
+        :param before_hooks: Functions called with a `RequestTrace` before each attempt is submitted
+        :type before_hooks: collections.abc.Iterable[callable]
+        :param after_hooks: Functions called with a `RequestTrace` once each attempt has completed or failed, such as
+            a `MetricsCollector`
+        :type after_hooks: collections.abc.Iterable[callable]
+        """
+        self.before_hooks = list(before_hooks)
+        self.after_hooks = list(after_hooks)
+
+    @contextmanager
+    def trace(self, action, attempt, body):
+        """Traces a single request attempt, reporting it to the hooks
+
+        :param action: API action performed by the request
+        :type action: str
+        :param attempt: Number of the attempt
+        :type attempt: int
+        :param body: Request body, as a dictionary of form fields or encoded bytes
+        :type body: dict | bytes
+
+        :return: Returns a context manager yielding the `RequestTrace` for the client to fill in
+        """
+        trace = RequestTrace(action, attempt, len(body) if isinstance(body, bytes) else len(urlencode(body)))
+        for hook in self.before_hooks:
+            hook(trace)
+
+        started = time.perf_counter()
+        try:
+            yield trace
+        except Exception as error:
+            trace.error = error
+            raise
+        finally:
+            trace.elapsed = time.perf_counter() - started
+            for hook in self.after_hooks:
+                hook(trace)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initializes a Histogram counting observations in cumulative buckets, as Prometheus does
+
+        :param buckets: Sorted upper bounds of the buckets
+        :type buckets: tuple[float]
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Returns the number of observations at or below each bucket's upper bound
+
+        :return: Returns a list of (upper bound, count) pairs, ending with an unbounded bucket holding every observation
+        :rtype: list[tuple]
+        """
+        total, result = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': [['+Inf' if bound == float('inf') else bound, count] for bound, count in self.cumulative()],
+        }
+
+
+class MetricsCollector:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initializes a MetricsCollector, an after-hook aggregating request traces into per-action metrics
+
+        :param buckets: Upper bounds, in seconds, of the buckets request timings are counted in
+        :type buckets: tuple[float]
+        """
+        self.buckets = buckets
+        self.requests = Counter()
+        self.retries = Counter()
+        self.errors = Counter()
+        self.request_bytes = Counter()
+        self.response_bytes = Counter()
+        self.durations = defaultdict(lambda: Histogram(self.buckets))
+        self.phases = defaultdict(lambda: Histogram(self.buckets))
+        self._lock = threading.Lock()
+
+    def __call__(self, trace):
+        """Records a completed request attempt
+
+        :param trace: Completed attempt
+        :type trace: RequestTrace
+        """
+        with self._lock:
+            self.requests[trace.action, trace.status] += 1
+            self.retries[trace.action] += trace.attempt > 1
+            self.request_bytes[trace.action] += trace.request_bytes
+            self.response_bytes[trace.action] += trace.response_bytes or 0
+            self.durations[trace.action].observe(trace.elapsed)
+
+            if trace.error is not None:
+                self.errors[trace.action, type(trace.error).__name__] += 1
+
+            for phase in PHASES:
+                value = getattr(trace, phase)
+                if value is not None:
+                    self.phases[trace.action, phase].observe(value)
+
+    def as_dict(self):
+        """Returns a snapshot of the metrics, grouped by action
+
+        :rtype: dict
+        """
+        with self._lock:
+            actions = defaultdict(lambda: {
+                'requests': {},
+                'retries': 0,
+                'errors': {},
+                'request_bytes': 0,
+                'response_bytes': 0,
+                'duration': None,
+                'phases': {},
+            })
+
+            for (action, status), count in self.requests.items():
+                actions[action]['requests'][str(status)] = count
+            for (action, error), count in self.errors.items():
+                actions[action]['errors'][error] = count
+            for action, histogram in self.durations.items():
+                actions[action].update(
+                    retries=self.retries[action],
+                    request_bytes=self.request_bytes[action],
+                    response_bytes=self.response_bytes[action],
+                    duration=histogram.as_dict()
+                )
+            for (action, phase), histogram in self.phases.items():
+                actions[action]['phases'][phase] = histogram.as_dict()
+
+            return dict(actions)
+
+    def to_json(self):
+        """Exports the metrics as a JSON document
+
+        :rtype: str
+        """
+        return json.dumps(self.as_dict(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix='activecampaign'):
+        """Exports the metrics in the Prometheus text exposition format
+
+        :param prefix: Prefix of every metric name
+        :type prefix: str
+
+        :rtype: str
+        """
+        lines = []
+
+        def family(name, kind, description, samples):
+            lines.append('# HELP {}_{} {}'.format(prefix, name, description))
+            lines.append('# TYPE {}_{} {}'.format(prefix, name, kind))
+            for suffix, labels, value in samples:
+                label_text = ','.join('{}="{}"'.format(key, _escape(label)) for key, label in labels)
+                lines.append('{}_{}{}{{{}}} {}'.format(prefix, name, suffix, label_text, _format_number(value)))
+
+        def histogram_samples(histograms, label_names):
+            for key, histogram in sorted(histograms.items()):
+                labels = list(zip(label_names, key if isinstance(key, tuple) else (key,)))
+                for bound, count in histogram.cumulative():
+                    yield '_bucket', labels + [('le', _format_number(bound))], count
+                yield '_sum', labels, histogram.sum
+                yield '_count', labels, histogram.count
+
+        with self._lock:
+            family('requests_total', 'counter', 'Request attempts by action and HTTP status', [
+                ('', [('action', action), ('status', status or 'none')], count)
+                for (action, status), count in sorted(self.requests.items(), key=lambda item: str(item[0]))
+            ])
+            family('retries_total', 'counter', 'Request attempts that retried an earlier failure', [
+                ('', [('action', action)], count) for action, count in sorted(self.retries.items())
+            ])
+            family('errors_total', 'counter', 'Request attempts that failed, by exception type', [
+                ('', [('action', action), ('error', error)], count)
+                for (action, error), count in sorted(self.errors.items())
+            ])
+            family('request_bytes_total', 'counter', 'Bytes of request bodies sent', [
+                ('', [('action', action)], count) for action, count in sorted(self.request_bytes.items())
+            ])
+            family('response_bytes_total', 'counter', 'Bytes of response bodies received', [
+                ('', [('action', action)], count) for action, count in sorted(self.response_bytes.items())
+            ])
+            family(
+                'request_duration_seconds', 'histogram', 'Time taken by request attempts',
+                histogram_samples(self.durations, ('action',))
+            )
+            family(
+                'request_phase_seconds', 'histogram', 'Time taken by each phase of request attempts',
+                histogram_samples(self.phases, ('action', 'phase'))
+            )
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(value) if isinstance(value, float) else str(value)
@@ -0,0 +1,172 @@
+import sqlite3
+from collections import namedtuple
+
+
+ADD = 'add'
+UPDATE = 'update'
+REMOVE = 'remove'
+
+
+MembershipChange = namedtuple('MembershipChange', ['action', 'email', 'contact_id', 'row'])
+MembershipChange.__doc__ = """Difference between a mailing list's recorded members and a new list of contacts
+
+:ivar action: `ADD` for a contact not yet on the list, `UPDATE` for a member whose name changed, or `REMOVE` for a
+    member no longer in the contacts
+:ivar email: Normalized email address of the contact
+:ivar contact_id: Id of the contact, if it is known
+:ivar row: Contact as it was read, or None for a removal
+"""
+
+
+class MembershipIndex:
+    def __init__(self, path, batch_size=1000):
+        """Initializes a MembershipIndex, a persistent record of the contacts on each mailing list
+
+        The index records each contact's id and name, and the mailing lists it was last synced to. It is only a record
+        of the changes made through it; contacts changed by other means are picked up again by the next sync, which
+        sends them as additions or updates.
+
+        :param path: Location of the SQLite database holding the index; created if it does not exist
+        :type path: str
+        :param batch_size: Number of changes committed together
+        :type batch_size: int
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._uncommitted = 0
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS contacts (
+                email TEXT PRIMARY KEY, contact_id INTEGER, first_name TEXT, last_name TEXT
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS memberships (
+                list_id INTEGER, email TEXT, PRIMARY KEY (list_id, email)
+            ) WITHOUT ROWID;
+        ''')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def members(self, list_id):
+        """Returns the number of contacts recorded on a mailing list
+
+        :rtype: int
+        """
+        return self._connection.execute(
+            'SELECT COUNT(*) FROM memberships WHERE list_id = ?', (list_id,)
+        ).fetchone()[0]
+
+    def contact(self, email):
+        """Looks up a recorded contact
+
+        :param email: Email address of the contact
+        :type email: str
+
+        :return: Returns the contact's (contact id, first name, last name), or None if it is not recorded
+        :rtype: tuple
+        """
+        return self._connection.execute(
+            'SELECT contact_id, first_name, last_name FROM contacts WHERE email = ?', (self._normalize(email),)
+        ).fetchone()
+
+    def record(self, list_id, email, contact_id, first_name=None, last_name=None):
+        """Records that a contact is on a mailing list, with the given id and name
+
+        :param list_id: Id of the mailing list
+        :type list_id: int
+        :param email: Email address of the contact
+        :type email: str
+        :param contact_id: Id of the contact
+        :type contact_id: int
+        :param first_name: First name of the contact
+        :type first_name: str
+        :param last_name: Last name of the contact
+        :type last_name: str
+        """
+        email = self._normalize(email)
+        self._connection.execute(
+            'INSERT OR REPLACE INTO contacts VALUES (?, ?, ?, ?)',
+            (email, contact_id, first_name or None, last_name or None)
+        )
+        self._connection.execute('INSERT OR IGNORE INTO memberships VALUES (?, ?)', (list_id, email))
+        self._changed()
+
+    def remove(self, list_id, email):
+        """Records that a contact is no longer on a mailing list
+
+        :param list_id: Id of the mailing list
+        :type list_id: int
+        :param email: Email address of the contact
+        :type email: str
+        """
+        self._connection.execute(
+            'DELETE FROM memberships WHERE list_id = ? AND email = ?', (list_id, self._normalize(email))
+        )
+        self._changed()
+
+    def diff(self, list_id, rows):
+        """Compares a mailing list's recorded members with a new list of contacts
+
+        Additions and updates are yielded as the rows are read; removals are yielded once all rows have been read. Only
+        the email addresses of the rows are held, in a temporary table, so memory use does not grow with the number of
+        rows. Rows must not repeat an email address.
+
+        :param list_id: Id of the mailing list
+        :type list_id: int
+        :param rows: Contacts that should be on the list
+        :type rows: collections.abc.Iterable[activecampaign.reader.ContactRow]
+
+        :return: Returns an iterator over the changes needed to bring the list in line with the rows
+        :rtype: collections.abc.Iterator[MembershipChange]
+        """
+        self._connection.execute('DROP TABLE IF EXISTS temp.current')
+        self._connection.execute('CREATE TEMP TABLE current (email TEXT PRIMARY KEY) WITHOUT ROWID')
+
+        for row in rows:
+            email = self._normalize(row.email)
+            self._connection.execute('INSERT OR IGNORE INTO temp.current VALUES (?)', (email,))
+
+            recorded = self._connection.execute(
+                'SELECT contact_id, first_name, last_name, '
+                'EXISTS (SELECT 1 FROM memberships WHERE list_id = ? AND email = contacts.email) '
+                'FROM contacts WHERE email = ?',
+                (list_id, email)
+            ).fetchone()
+
+            if recorded is None or not recorded[3]:
+                yield MembershipChange(ADD, email, recorded[0] if recorded else None, row)
+            elif recorded[1:3] != (row.first_name or None, row.last_name or None):
+                yield MembershipChange(UPDATE, email, recorded[0], row)
+
+        # Removals scale with the size of the change, so they can be collected before any is acted upon
+        removals = self._connection.execute(
+            'SELECT email, contact_id FROM memberships JOIN contacts USING (email) '
+            'WHERE list_id = ? AND email NOT IN (SELECT email FROM temp.current)',
+            (list_id,)
+        ).fetchall()
+        self._connection.execute('DROP TABLE temp.current')
+
+        for email, contact_id in removals:
+            yield MembershipChange(REMOVE, email, contact_id, None)
+
+    def close(self):
+        """Commits recorded changes and closes the database"""
+        self._connection.commit()
+        self._connection.close()
+
+    def _changed(self):
+        self._uncommitted += 1
+        if self._uncommitted >= self.batch_size:
+            self._connection.commit()
+            self._uncommitted = 0
+
+    @staticmethod
+    def _normalize(email):
+        """Returns the form of an email address used for comparison
+
+        :rtype: str
+        """
+        return email.strip().lower()
@@ -0,0 +1,108 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from config import config
+
+
+# Elements whose content is whitespace-sensitive, or is not HTML, and is sent exactly as written
+_PRESERVED_PATTERN = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.IGNORECASE | re.DOTALL)
+
+# Comments, except the conditional comments email clients such as Outlook act on
+_COMMENT_PATTERN = re.compile(r'<!--(?!\[|<!).*?-->', re.DOTALL)
+
+# Runs of ASCII whitespace only, as non-breaking and other Unicode spaces are rendered as written
+_LINE_BREAK_RUN_PATTERN = re.compile(r'[ \t\f\v\n]*\n[ \t\f\v\n]*')
+_SPACE_RUN_PATTERN = re.compile(r'[ \t\f\v]{2,}|[\t\f\v]')
+
+
+def minify_html(html):
+    """Removes whitespace and comments that do not affect how an HTML message is rendered
+
+    Line endings are normalized, comments other than conditional comments are removed, indentation and any other run
+    of whitespace containing a line break becomes a single line break, and other runs of whitespace become a single
+    space. Line breaks are kept so that no line grows longer than mail transfer agents accept. The content of `pre`,
+    `textarea`, `script` and `style` elements is left untouched.
+
+    :param html: HTML content of the message
+    :type html: str
+
+    :rtype: str
+    """
+    html = html.lstrip('\ufeff').replace('\r\n', '\n').replace('\r', '\n')
+    parts = _PRESERVED_PATTERN.split(html)
+
+    # Splitting on a pattern with two groups yields the text before each match, the match and its element name
+    for index in range(0, len(parts), 3):
+        part = _COMMENT_PATTERN.sub('', parts[index])
+        part = _LINE_BREAK_RUN_PATTERN.sub('\n', part)
+        parts[index] = _SPACE_RUN_PATTERN.sub(' ', part)
+
+    return ''.join(part for index, part in enumerate(parts) if index % 3 != 2).strip()
+
+
+class MessagePreparer:
+    def __init__(self, minify=False, max_entries=64):
+        """Initializes a MessagePreparer, which prepares the HTML content of messages before they are sent, remembering
+        the outcome for each distinct content so that a template sent many times is only processed once
+
+        :param minify: Whether content is minified; see `minify_html`. By default content is sent unchanged
+        :type minify: bool
+        :param max_entries: Number of prepared contents kept, the least recently used being discarded first
+        :type max_entries: int
+        """
+        self.minify = minify
+        self.max_entries = max_entries
+        self._prepared = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._prepared)
+
+    def prepare(self, html):
+        """Returns the content to send for a message's HTML content
+
+        :param html: HTML content of the message
+        :type html: str
+
+        :rtype: str
+        """
+        if not self.minify or not html:
+            return html
+
+        # Entries are keyed by a digest so that the original content of large templates need not be kept
+        digest = self.digest(html)
+        with self._lock:
+            prepared = self._prepared.get(digest)
+            if prepared is not None:
+                self._prepared.move_to_end(digest)
+                return prepared
+
+        prepared = minify_html(html)
+
+        with self._lock:
+            self._prepared[digest] = prepared
+            while len(self._prepared) > self.max_entries:
+                self._prepared.popitem(last=False)
+
+        return prepared
+
+    @staticmethod
+    def digest(html):
+        """Returns the content hash identifying a message's HTML content
+
+        :param html: HTML content of the message
+        :type html: str
+
+        :rtype: str
+        """
+        return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+def create_message_preparer():
+    """Creates a message preparer from the `MESSAGE_MINIFY` and `MESSAGE_CACHE_SIZE` configuration directives
+
+    :rtype: MessagePreparer
+    """
+    return MessagePreparer(config['MESSAGE_MINIFY'], config['MESSAGE_CACHE_SIZE'])
@@ -0,0 +1,74 @@
+from collections import namedtuple
+
+
+# Models are tuples, so holding many of them costs no per-instance dictionary; each mirrors the arguments of the client
+# method that accepts it in place of those arguments
+
+Contact = namedtuple('Contact', ['email', 'first_name', 'last_name'])
+Contact.__new__.__defaults__ = (None, None)
+Contact.__doc__ = """A contact, accepted in place of the email address by `ActiveCampaignAPI.create_contact` and
+`ActiveCampaignAPI.sync_contact`
+
+:ivar email: Email address of the contact
+:ivar first_name: First name of the contact, or None
+:ivar last_name: Last name of the contact, or None
+"""
+
+Sender = namedtuple('Sender', ['name', 'email', 'address', 'city', 'state', 'zip', 'country'])
+Sender.__doc__ = """The sender of a campaign, accepted wherever a sender dictionary is
+
+:ivar name: Name of the sender
+:ivar email: Email address of the sender
+:ivar address: Physical street address of the sender
+:ivar city: City of the sender
+:ivar state: State of the sender
+:ivar zip: Zip code of the sender
+:ivar country: Country of the sender
+"""
+
+MailingList = namedtuple('MailingList', ['name', 'sender'])
+MailingList.__doc__ = """A mailing list, accepted in place of the name by `ActiveCampaignAPI.create_mailing_list`
+
+:ivar name: Name of the mailing list
+:ivar sender: Sender associated with the mailing list, as a `Sender` or a dictionary
+"""
+
+Message = namedtuple(
+    'Message',
+    ['mailing_lists', 'subject', 'html', 'from_email', 'from_name', 'reply_to', 'priority']
+)
+Message.__new__.__defaults__ = (3,)
+Message.__doc__ = """An HTML message, accepted in place of the mailing lists by `ActiveCampaignAPI.create_html_message`
+
+:ivar mailing_lists: Ids of the mailing lists the message is associated with
+:ivar subject: Subject of the message
+:ivar html: HTML content of the message
+:ivar from_email: Email address used in the `from` section of the message
+:ivar from_name: Name used in the `from` section of the message
+:ivar reply_to: Email address used in the `reply-to` section of the message
+:ivar priority: Priority of the message, 1=high, 5=low
+"""
+
+Campaign = namedtuple('Campaign', ['name', 'send_date', 'mailing_lists', 'message'])
+Campaign.__doc__ = """A "single"-type campaign, accepted in place of the name by
+`ActiveCampaignAPI.create_single_campaign`
+
+:ivar name: Name of the campaign
+:ivar send_date: Date string (format: YYYY-MM-DD hh:mm:ss) of when the campaign should be sent
+:ivar mailing_lists: Ids of the mailing lists the campaign is directed to
+:ivar message: Id of the message sent by the campaign
+"""
+
+
+def as_sender(sender):
+    """Returns a sender given either as a `Sender` or as a dictionary with the same keys
+
+    :param sender: Sender, or dictionary describing it; keys it lacks are taken to be None
+    :type sender: Sender | dict
+
+    :rtype: Sender
+    """
+    if isinstance(sender, Sender):
+        return sender
+
+    return Sender(*map(sender.get, Sender._fields))
@@ -0,0 +1,168 @@
+import csv
+import os
+import re
+
+from activecampaign.dedup import EmailIndex
+
+
+EMAIL_PATTERN = re.compile(
+    r"^[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@[A-Za-z0-9]([A-Za-z0-9-]*[A-Za-z0-9])?(\.[A-Za-z0-9]([A-Za-z0-9-]*[A-Za-z0-9])?)+$"
+)
+MAX_EMAIL_LENGTH = 254
+MAX_LOCAL_PART_LENGTH = 64
+MAX_NAME_LENGTH = 255
+
+
+class RejectWriter:
+    def __init__(self, stream):
+        """Initializes a RejectWriter that records rows rejected by the pipeline in a CSV side file
+
+        A header row is written first, unless the file already has content, so that a resumed import can append to the
+        side file of the run it continues.
+
+        :param stream: File the rejected rows are written to, opened in text mode with `newline=''`
+        :type stream: io.TextIOBase
+        """
+        self.count = 0
+        self._writer = csv.writer(stream)
+        if not stream.tell():
+            self._writer.writerow(['row', 'email', 'first_name', 'last_name', 'reason'])
+
+    def __call__(self, row, reason):
+        """Records a rejected row
+
+        :param row: Rejected contact
+        :type row: activecampaign.reader.ContactRow
+        :param reason: Description of why the row was rejected
+        :type reason: str
+        """
+        self.count += 1
+        self._writer.writerow([row.number, row.email, row.first_name, row.last_name, reason])
+
+
+def trim_rejects(path, next_row):
+    """Removes the rows a resumed import is about to process again from the rejects side file of the run it continues
+
+    Rows read after the last checkpointed row may have been rejected before the interruption; they are read and
+    rejected again on resume, so their earlier entries are dropped rather than duplicated. The file is rewritten through
+    a temporary file, so it is left intact if trimming is interrupted.
+
+    :param path: Location of the rejects side file; nothing is done if it does not exist
+    :type path: str
+    :param next_row: Number of the first row the resumed import processes
+    :type next_row: int
+    """
+    if not os.path.exists(path):
+        return
+
+    temporary = path + '.tmp'
+    with open(path, newline='') as source, open(temporary, 'w', newline='') as target:
+        reader = csv.reader(source)
+        writer = csv.writer(target)
+        header = next(reader, None)
+        if header is not None:
+            writer.writerow(header)
+        for record in reader:
+            if int(record[0]) < next_row:
+                writer.writerow(record)
+
+    os.replace(temporary, path)
+
+
+def normalize(rows):
+    """Strips surrounding whitespace from contacts' fields and lower-cases their email addresses
+
+    :param rows: Contacts to normalize
+    :type rows: collections.abc.Iterable[activecampaign.reader.ContactRow]
+
+    :rtype: collections.abc.Iterator[activecampaign.reader.ContactRow]
+    """
+    for row in rows:
+        yield row._replace(
+            email=row.email.strip().lower() if row.email else row.email,
+            first_name=row.first_name.strip() or None if row.first_name else None,
+            last_name=row.last_name.strip() or None if row.last_name else None
+        )
+
+
+def validate(rows, reject):
+    """Passes on contacts whose fields would be accepted by the ActiveCampaign API, rejecting the rest
+
+    :param rows: Normalized contacts to validate
+    :type rows: collections.abc.Iterable[activecampaign.reader.ContactRow]
+    :param reject: Function called with each rejected row and the reason it was rejected
+    :type reject: callable
+
+    :rtype: collections.abc.Iterator[activecampaign.reader.ContactRow]
+    """
+    for row in rows:
+        reason = _invalid_reason(row)
+        if reason:
+            reject(row, reason)
+        else:
+            yield row
+
+
+def dedupe(rows, reject, seen=None):
+    """Passes on the first contact for each email address, rejecting later contacts with the same address
+
+    :param rows: Normalized contacts to deduplicate
+    :type rows: collections.abc.Iterable[activecampaign.reader.ContactRow]
+    :param reject: Function called with each rejected row and the reason it was rejected
+    :type reject: callable
+    :param seen: Index of email addresses already submitted, e.g. by an interrupted run of the import; its `duplicates`
+        attribute counts the rows removed
+    :type seen: activecampaign.dedup.EmailIndex
+
+    :rtype: collections.abc.Iterator[activecampaign.reader.ContactRow]
+    """
+    seen = EmailIndex() if seen is None else seen
+
+    for row in rows:
+        if seen.add(row.email):
+            yield row
+        else:
+            reject(row, 'duplicate email address')
+
+
+def prepare_contacts(rows, reject, seen=None):
+    """Chains the normalize, validate and dedupe stages, so that only contacts worth submitting reach the API
+
+    Every stage is a generator, so rows are processed one at a time and memory use does not depend on the size of the
+    input; the deduplication index moves to disk once it grows large.
+
+    :param rows: Contacts parsed from a CSV file; see `activecampaign.reader.read_contacts`
+    :type rows: collections.abc.Iterable[activecampaign.reader.ContactRow]
+    :param reject: Function called with each rejected row and the reason it was rejected
+    :type reject: callable
+    :param seen: Index of email addresses already submitted
+    :type seen: activecampaign.dedup.EmailIndex
+
+    :rtype: collections.abc.Iterator[activecampaign.reader.ContactRow]
+    """
+    return dedupe(validate(normalize(rows), reject), reject, seen)
+
+
+def _invalid_reason(row):
+    """Determines why a contact would be rejected by the ActiveCampaign API
+
+    :param row: Normalized contact to check
+    :type row: activecampaign.reader.ContactRow
+
+    :return: Returns a description of the problem, or None if the contact is valid
+    :rtype: str
+    """
+    if not row.email:
+        return 'missing email address'
+    elif len(row.email) > MAX_EMAIL_LENGTH:
+        return 'email address longer than {} characters'.format(MAX_EMAIL_LENGTH)
+    elif not EMAIL_PATTERN.match(row.email) or len(row.email.rsplit('@', 1)[0]) > MAX_LOCAL_PART_LENGTH:
+        return 'invalid email address'
+
+    for field in ('first_name', 'last_name'):
+        value = getattr(row, field)
+        if value and len(value) > MAX_NAME_LENGTH:
+            return '{} longer than {} characters'.format(field, MAX_NAME_LENGTH)
+
+    return None
@@ -0,0 +1,216 @@
+import math
+import multiprocessing
+import threading
+import time
+
+from config import config
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, clock=time.monotonic):
+        """Initializes a TokenBucket that admits requests at a sustained rate, allowing short bursts
+
+        The bucket is safe to share between threads. Callers reserve a token before each request and wait for however
+        long the reservation takes to become available, so concurrent callers are admitted in the order they arrived
+        rather than contending for tokens as they appear.
+
+        :param rate: Number of requests admitted per second
+        :type rate: float
+        :param burst: Maximum number of requests that may be admitted back-to-back after a period of inactivity
+        :type burst: int
+        :param clock: Function returning the current time in seconds
+        :type clock: callable
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError('rate must be positive and burst must be at least 1')
+
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token from the bucket
+
+        :return: Returns the number of seconds the caller must wait before submitting its request
+        :rtype: float
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def try_acquire(self):
+        """Takes a token from the bucket only if one is available immediately
+
+        :return: Returns True if a token was taken, or False if the bucket is empty
+        :rtype: bool
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
+
+    def acquire(self):
+        """Takes a token from the bucket, blocking the calling thread until the token is available
+
+        :return: Returns the number of seconds the caller was blocked for
+        :rtype: float
+        """
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+        return delay
+
+    def _refill(self):
+        """Adds the tokens accrued since the bucket was last updated; the caller must hold the lock"""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    def __init__(self, rate, burst, min_rate, slow_response_threshold, decrease_factor=0.5, cooldown=1.0,
+                 clock=time.monotonic):
+        """Initializes an AdaptiveRateLimiter that slows down when the server signals it is overloaded
+
+        The rate is multiplied by `decrease_factor` whenever a request is throttled (HTTP 429) or takes longer than
+        `slow_response_threshold`, and recovers additively with each healthy response until it is back at the
+        configured rate.
+
+        :param rate: Maximum number of requests admitted per second
+        :type rate: float
+        :param burst: Maximum number of requests that may be admitted back-to-back after a period of inactivity
+        :type burst: int
+        :param min_rate: Rate below which the limiter never tightens
+        :type min_rate: float
+        :param slow_response_threshold: Response time, in seconds, above which a response counts as slow
+        :type slow_response_threshold: float
+        :param decrease_factor: Factor the rate is multiplied by when the server signals it is overloaded
+        :type decrease_factor: float
+        :param cooldown: Minimum number of seconds between two decreases, so that a burst of throttled responses to
+            requests already in flight only tightens the rate once
+        :type cooldown: float
+        :param clock: Function returning the current time in seconds
+        :type clock: callable
+        """
+        super().__init__(rate, burst, clock=clock)
+
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.slow_response_threshold = slow_response_threshold
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._decreased = None
+
+    def record(self, status_code, elapsed):
+        """Adjusts the rate according to the outcome of a request
+
+        :param status_code: HTTP status code of the response
+        :type status_code: int
+        :param elapsed: Number of seconds the request took
+        :type elapsed: float
+        """
+        with self._lock:
+            self._refill()
+            if status_code == 429 or elapsed > self.slow_response_threshold:
+                self._decrease()
+            else:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+    def _decrease(self):
+        """Tightens the rate unless it was tightened within the cooldown period; the caller must hold the lock"""
+        now = self._clock()
+        if self._decreased is not None and now - self._decreased < self.cooldown:
+            return
+
+        self._decreased = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        # Discard any saved-up burst so the lower rate takes effect immediately
+        self._tokens = min(self._tokens, 0.0)
+
+
+class _SharedValue:
+    """Attribute of a `SharedRateLimiter` stored in its shared memory at the given index"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __get__(self, instance, owner):
+        return self if instance is None else instance._state[self.index]
+
+    def __set__(self, instance, value):
+        instance._state[self.index] = value
+
+
+class SharedRateLimiter(AdaptiveRateLimiter):
+    rate = _SharedValue(0)
+    _tokens = _SharedValue(1)
+    _updated = _SharedValue(2)
+    _decreased_at = _SharedValue(3)
+
+    def __init__(self, rate, burst, min_rate, slow_response_threshold, decrease_factor=0.5, cooldown=1.0,
+                 context=None):
+        """Initializes a SharedRateLimiter, an AdaptiveRateLimiter whose state is held in shared memory so that
+        several processes draw on a single rate budget
+
+        The limiter must be handed to other processes as they are started, for instance as an argument of a
+        `concurrent.futures.ProcessPoolExecutor` initializer. Its clock is `time.monotonic`, which every process on a
+        machine shares.
+
+        :param rate: Maximum number of requests admitted per second, across all processes
+        :type rate: float
+        :param burst: Maximum number of requests that may be admitted back-to-back after a period of inactivity
+        :type burst: int
+        :param min_rate: Rate below which the limiter never tightens
+        :type min_rate: float
+        :param slow_response_threshold: Response time, in seconds, above which a response counts as slow
+        :type slow_response_threshold: float
+        :param decrease_factor: Factor the rate is multiplied by when the server signals it is overloaded
+        :type decrease_factor: float
+        :param cooldown: Minimum number of seconds between two decreases
+        :type cooldown: float
+        :param context: Multiprocessing context the processes sharing the limiter are started from
+        :type context: multiprocessing.context.BaseContext
+        """
+        context = context or multiprocessing.get_context()
+        self._state = context.RawArray('d', 4)
+
+        super().__init__(rate, burst, min_rate, slow_response_threshold, decrease_factor, cooldown)
+
+        self._lock = context.Lock()
+
+    @property
+    def _decreased(self):
+        decreased = self._decreased_at
+        return None if math.isnan(decreased) else decreased
+
+    @_decreased.setter
+    def _decreased(self, value):
+        self._decreased_at = math.nan if value is None else value
+
+
+def create_rate_limiter(context=None):
+    """Creates a rate limiter from the `RATE_*` configuration directives
+
+    :param context: Multiprocessing context of worker processes the limiter should be shared with; when given, a
+        `SharedRateLimiter` is created
+    :type context: multiprocessing.context.BaseContext
+
+    :return: Returns an adaptive rate limiter, or None if `RATE_LIMIT` is 0 (disabled)
+    :rtype: AdaptiveRateLimiter
+    """
+    if not config['RATE_LIMIT']:
+        return None
+
+    args = (config['RATE_LIMIT'], config['RATE_BURST'], config['RATE_LIMIT_MIN'], config['SLOW_RESPONSE_THRESHOLD'])
+    if context is not None:
+        return SharedRateLimiter(*args, context=context)
+
+    return AdaptiveRateLimiter(*args)
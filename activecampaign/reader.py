@@ -0,0 +1,219 @@
+import csv
+import io
+import mmap
+import sys
+from collections import namedtuple
+
+
+# Size of the blocks of rows split at a time from a memory-mapped file
+PARSE_BLOCK_SIZE = 1 << 20
+
+# Columns read from each row; any other column is never decoded
+CONTACT_COLUMNS = ('email', 'first_name', 'last_name')
+
+
+ContactRow = namedtuple('ContactRow', ['number', 'end_offset', 'email', 'first_name', 'last_name'])
+ContactRow.__doc__ = """A contact read from a CSV file
+
+:ivar number: 1-based position of the row among the file's data rows
+:ivar end_offset: Byte offset in the file at which the following row starts
+:ivar email: Email address of the contact
+:ivar first_name: First name of the contact, or None if the file has no 'first_name' column
+:ivar last_name: Last name of the contact, or None if the file has no 'last_name' column
+"""
+
+
+def read_contacts(stream, offset=0, start=1, encoding='utf-8-sig', end=None):
+    """Reads contacts from a CSV file, tracking the byte offset at which each row ends
+
+    The file's first line must be a header naming its columns, which must include 'email'. Reading can resume from the
+    `end_offset` of any previously read row without re-reading the rows before it. Files that can be memory-mapped are
+    read through a `ContactFile`; other streams, such as in-memory buffers, are read line by line.
+
+    :param stream: CSV file opened in binary mode; it must be seekable
+    :type stream: io.BufferedIOBase
+    :param offset: Byte offset at which to start reading rows; offsets within the header are ignored
+    :type offset: int
+    :param start: Number to assign the first row read
+    :type start: int
+    :param encoding: Text encoding of the file
+    :type encoding: str
+    :param end: Byte offset at which to stop reading rows; it must fall on a row boundary, such as those found by
+        `activecampaign.sharding.find_shards`. Defaults to the end of the file
+    :type end: int
+
+    :return: Returns an iterator over the contacts in the file
+    :rtype: collections.abc.Iterator[ContactRow]
+
+    :raises ValueError: if the file's header has no 'email' column
+    """
+    buffer = _map_file(stream)
+    if buffer is not None:
+        return ContactFile(buffer, encoding).rows(offset, start, end)
+
+    stream.seek(0)
+    fieldnames = next(csv.reader([stream.readline().decode(encoding)]), [])
+    if 'email' not in fieldnames:
+        raise ValueError('CSV file has no email column')
+
+    return _read_rows(stream, fieldnames, max(offset, stream.tell()), start, encoding, end)
+
+
+def _read_rows(stream, fieldnames, position, number, encoding, end=None):
+    """Reads contacts from a CSV file whose header has already been read; see `read_contacts`
+
+    :rtype: collections.abc.Iterator[ContactRow]
+    """
+    stream.seek(position)
+
+    def lines():
+        nonlocal position
+        # The csv module only pulls the lines it needs to complete each row, so `position` always marks the end of the
+        # most recently parsed row, even when quoted values span several lines
+        for line in iter(stream.readline, b''):
+            if end is not None and position >= end:
+                return
+
+            position += len(line)
+            yield line.decode(encoding)
+
+    for values in csv.reader(lines()):
+        if not values:
+            continue
+
+        row = dict(zip(fieldnames, values))
+        yield ContactRow(number, position, row.get('email'), row.get('first_name'), row.get('last_name'))
+        number += 1
+
+
+def _map_file(stream):
+    """Maps a file into memory for reading
+
+    :param stream: File opened in binary mode
+    :type stream: io.BufferedIOBase
+
+    :return: Returns the mapped file, or None if the stream has no underlying file, or one that cannot be mapped, such
+        as an empty file or a pipe
+    :rtype: mmap.mmap
+    """
+    try:
+        return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+class ContactFile:
+    def __init__(self, buffer, encoding='utf-8-sig'):
+        """Initializes a ContactFile, a CSV file of contacts parsed in place from its bytes, typically a memory-mapped
+        file, so that rows are read without first being copied into lines and decoded whole
+
+        Rows are split in blocks, and only the email, first name and last name values of each are decoded. Rows that
+        contain quotes, which may hold commas or span several lines, are parsed by the csv module instead.
+
+        :param buffer: Contents of the file, whose first line is a header naming its columns
+        :type buffer: mmap.mmap | bytes
+        :param encoding: Text encoding of the file, which must encode commas, quotes and line breaks as ASCII does
+        :type encoding: str
+
+        :raises ValueError: if the file's header has no 'email' column
+        """
+        header_end = buffer.find(b'\n') + 1 or len(buffer)
+        fieldnames = next(csv.reader([buffer[:header_end].decode(encoding)]), [])
+        if 'email' not in fieldnames:
+            raise ValueError('CSV file has no email column')
+
+        # As with csv.DictReader, a repeated column name refers to its last occurrence
+        positions = {name: index for index, name in enumerate(fieldnames)}
+        self.buffer = buffer
+        self.header_end = header_end
+        # A byte order mark can only appear at the start of the file, before the header
+        self.encoding = 'utf-8' if encoding == 'utf-8-sig' else encoding
+        # Missing columns are given a position past the end of any row
+        self._columns = [positions.get(name, sys.maxsize) for name in CONTACT_COLUMNS]
+        self._maxsplit = max(positions[name] for name in CONTACT_COLUMNS if name in positions) + 1
+
+    def rows(self, offset=0, start=1, end=None):
+        """Reads the contacts in a byte range of the file; see `read_contacts`
+
+        :param offset: Byte offset at which to start reading rows; offsets within the header are ignored
+        :type offset: int
+        :param start: Number to assign the first row read
+        :type start: int
+        :param end: Byte offset at which to stop reading rows; defaults to the end of the file
+        :type end: int
+
+        :rtype: collections.abc.Iterator[ContactRow]
+        """
+        buffer, encoding, maxsplit = self.buffer, self.encoding, self._maxsplit
+        email, first_name, last_name = self._columns
+        position = max(offset, self.header_end)
+        end = len(buffer) if end is None else min(end, len(buffer))
+        number = start
+
+        while position < end:
+            limit = min(position + PARSE_BLOCK_SIZE, end)
+            quote = buffer.find(b'"', position, limit)
+            cut = buffer.rfind(b'\n', position, limit if quote == -1 else quote)
+
+            if cut == -1:
+                # The row starting at `position` holds a quote, or is longer than a block
+                row_end = self._row_end(position, end)
+                values = next(csv.reader(io.StringIO(buffer[position:row_end].decode(encoding), newline='')), [])
+                position = row_end
+                if values:
+                    count = len(values)
+                    yield ContactRow(
+                        number,
+                        position,
+                        *(values[index] if index < count else None for index in self._columns)
+                    )
+                    number += 1
+                continue
+
+            for line in buffer[position:cut].split(b'\n'):
+                position += len(line) + 1
+                if line.endswith(b'\r'):
+                    line = line[:-1]
+                if not line:
+                    continue
+
+                # Only the splits up to the last column read are made, and only the values read are decoded
+                values = line.split(b',', maxsplit)
+                count = len(values)
+                yield ContactRow(
+                    number,
+                    position,
+                    values[email].decode(encoding) if email < count else None,
+                    values[first_name].decode(encoding) if first_name < count else None,
+                    values[last_name].decode(encoding) if last_name < count else None
+                )
+                number += 1
+
+    def row_at(self, offset, number=1):
+        """Reads the contact in the row starting at a byte offset, such as the `end_offset` of the row before it
+
+        :param offset: Byte offset at which the row starts
+        :type offset: int
+        :param number: Number to assign the row
+        :type number: int
+
+        :return: Returns the contact, or None if there are no more rows from `offset`
+        :rtype: ContactRow
+        """
+        return next(self.rows(offset, number), None)
+
+    def _row_end(self, position, end):
+        """Finds the byte offset at which the row starting at `position` ends, following quoted line breaks
+
+        :rtype: int
+        """
+        quotes = 0
+        while position < end:
+            line_break = self.buffer.find(b'\n', position, end)
+            line_end = end if line_break == -1 else line_break + 1
+            quotes += self.buffer[position:line_end].count(b'"')
+            position = line_end
+            if quotes % 2 == 0:
+                break
+
+        return position
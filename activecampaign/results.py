@@ -0,0 +1,339 @@
+import abc
+import csv
+import json
+import os
+import sqlite3
+from collections import Counter, namedtuple
+
+from config import config
+
+
+RESULT_FIELDS = ('row', 'email', 'contact_id', 'error_type', 'error')
+
+ResultSummary = namedtuple('ResultSummary', ['created', 'failed', 'errors'])
+ResultSummary.__doc__ = """Totals of the results written to a result sink
+
+:ivar created: Number of contacts created
+:ivar failed: Number of rows that could not be imported
+:ivar errors: Counter of failures by the name of the exception raised
+"""
+
+
+class ResultSink(abc.ABC):
+    def __init__(self, path, sync_interval=None, append=True):
+        """Initializes a ResultSink, which streams the outcome of each imported row to a file as it arrives
+
+        Only counts of the results are kept in memory, so memory use does not grow with the size of an import. Results
+        are buffered and flushed to disk together every `sync_interval` results, and when the sink is closed. When
+        appending, the results already in the file are counted too, so that the totals cover the whole import.
+
+        :param path: Location of the file results are written to
+        :type path: str
+        :param sync_interval: Number of results written between flushes of the file to disk; defaults to the
+            `RESULT_SYNC_INTERVAL` configuration directive
+        :type sync_interval: int
+        :param append: Whether results are added to those already in the file, as when resuming an import, rather than
+            replacing them
+        :type append: bool
+        """
+        self.path = path
+        self.sync_interval = sync_interval or config['RESULT_SYNC_INTERVAL']
+        self.append = append
+        self.created = 0
+        self.failed = 0
+        self.errors = Counter()
+        self._unsynced = 0
+        if append and path is not None and os.path.exists(path):
+            for record in self._read(path):
+                self._count(record)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @classmethod
+    def trim(cls, path, next_row):
+        """Removes the results of the rows a resumed import is about to process again from the file of the run it
+        continues
+
+        Rows processed after the last checkpointed row may have been written before the interruption; they are
+        processed and written again on resume, so their earlier results are dropped rather than duplicated.
+
+        :param path: Location of the file results are written to; nothing is done if it does not exist
+        :type path: str
+        :param next_row: Number of the first row the resumed import processes
+        :type next_row: int
+        """
+        raise NotImplementedError
+
+    @property
+    def summary(self):
+        """Totals of the results in the file, including those it held already when appending
+
+        :rtype: ResultSummary
+        """
+        return ResultSummary(self.created, self.failed, Counter(self.errors))
+
+    def write(self, result):
+        """Writes the outcome of a row
+
+        :param result: Outcome of the row
+        :type result: activecampaign.importer.ImportResult
+        """
+        if result.error is None:
+            record = (result.row, result.email, result.contact_id, None, None)
+        else:
+            record = (result.row, result.email, result.contact_id, type(result.error).__name__, str(result.error))
+
+        self._count(record)
+        self._write(record)
+
+        self._unsynced += 1
+        if self._unsynced >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Flushes written results to disk; sinks that write results straight to their destination need not"""
+        self._unsynced = 0
+
+    def close(self):
+        """Flushes written results to disk and closes the file"""
+        self.sync()
+
+    def _count(self, record):
+        """Adds a result to the totals
+
+        :param record: Values of the result, in the order of `RESULT_FIELDS`
+        :type record: tuple
+        """
+        error_type = record[3]
+        if error_type:
+            self.failed += 1
+            self.errors[error_type] += 1
+        else:
+            self.created += 1
+
+    @classmethod
+    def _read(cls, path):
+        """Reads the results already in a file; sinks that cannot read their destination report none
+
+        :param path: Location of the file
+        :type path: str
+
+        :return: Returns the values of each result, in the order of `RESULT_FIELDS`
+        :rtype: collections.abc.Iterator[tuple]
+        """
+        return iter(())
+
+    @abc.abstractmethod
+    def _write(self, record):
+        """Buffers a result for writing
+
+        :param record: Values of the result, in the order of `RESULT_FIELDS`
+        :type record: tuple
+        """
+
+
+class _FileResultSink(ResultSink):
+    def __init__(self, path, sync_interval=None, append=True):
+        super().__init__(path, sync_interval, append)
+        self._file = open(path, 'a' if append else 'w', newline='')
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        super().sync()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    @classmethod
+    def trim(cls, path, next_row):
+        if not os.path.exists(path):
+            return
+
+        # The file is rewritten through a temporary file, so it is left intact if trimming is interrupted
+        temporary = path + '.tmp'
+        with cls(temporary, append=False) as target:
+            for record in cls._read(path):
+                if record[0] < next_row:
+                    target._write(record)
+
+        os.replace(temporary, path)
+
+
+class CSVResultSink(_FileResultSink):
+    def __init__(self, path, sync_interval=None, append=True):
+        """Initializes a CSVResultSink, which writes one row per result to a CSV file with the columns in
+        `RESULT_FIELDS`; a header row is written first, unless the file already has content
+
+        :param path: Location of the file results are written to
+        :type path: str
+        :param sync_interval: Number of results written between flushes of the file to disk
+        :type sync_interval: int
+        :param append: Whether results are added to those already in the file
+        :type append: bool
+        """
+        super().__init__(path, sync_interval, append)
+        self._writer = csv.writer(self._file)
+        if not self._file.tell():
+            self._writer.writerow(RESULT_FIELDS)
+
+    @classmethod
+    def _read(cls, path):
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row, email, contact_id, error_type, error in reader:
+                yield int(row), email, int(contact_id) if contact_id else None, error_type or None, error or None
+
+    def _write(self, record):
+        self._writer.writerow(record)
+
+
+class JSONLResultSink(_FileResultSink):
+    """Writes one JSON object per line and result, keyed by `RESULT_FIELDS`"""
+
+    @classmethod
+    def _read(cls, path):
+        with open(path) as f:
+            for line in f:
+                # A line cut short by an interruption holds no result
+                if line.endswith('\n'):
+                    entry = json.loads(line)
+                    yield tuple(entry[field] for field in RESULT_FIELDS)
+
+    def _write(self, record):
+        self._file.write(json.dumps(dict(zip(RESULT_FIELDS, record)), separators=(',', ':')) + '\n')
+
+
+class SQLiteResultSink(ResultSink):
+    def __init__(self, path, sync_interval=None, append=True):
+        """Initializes a SQLiteResultSink, which inserts one row per result into the `results` table of a SQLite
+        database, with the columns in `RESULT_FIELDS`
+
+        Results are inserted together in a single transaction every `sync_interval` results.
+
+        :param path: Location of the database results are written to; created if it does not exist
+        :type path: str
+        :param sync_interval: Number of results written between commits
+        :type sync_interval: int
+        :param append: Whether results are added to those already in the database
+        :type append: bool
+        """
+        super().__init__(path, sync_interval, append)
+        self._pending = []
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS results (
+                row INTEGER, email TEXT, contact_id INTEGER, error_type TEXT, error TEXT
+            );
+        ''')
+        if not append:
+            with self._connection:
+                self._connection.execute('DELETE FROM results')
+
+    def sync(self):
+        with self._connection:
+            self._connection.executemany('INSERT INTO results VALUES (?, ?, ?, ?, ?)', self._pending)
+        self._pending = []
+        super().sync()
+
+    def close(self):
+        if self._connection is not None:
+            self.sync()
+            self._connection.close()
+            self._connection = None
+
+    @classmethod
+    def trim(cls, path, next_row):
+        if not os.path.exists(path):
+            return
+
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                if cls._has_results(connection):
+                    connection.execute('DELETE FROM results WHERE row >= ?', (next_row,))
+        finally:
+            connection.close()
+
+    @classmethod
+    def _read(cls, path):
+        connection = sqlite3.connect(path)
+        try:
+            if cls._has_results(connection):
+                yield from connection.execute('SELECT * FROM results ORDER BY rowid')
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _has_results(connection):
+        return connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'results'"
+        ).fetchone() is not None
+
+    def _write(self, record):
+        self._pending.append(record)
+
+
+# Result sink class for each recognized file extension
+SINK_FORMATS = {
+    '.csv': CSVResultSink,
+    '.jsonl': JSONLResultSink,
+    '.ndjson': JSONLResultSink,
+    '.db': SQLiteResultSink,
+    '.sqlite': SQLiteResultSink,
+    '.sqlite3': SQLiteResultSink,
+}
+
+
+def create_result_sink(path, sync_interval=None, append=True):
+    """Creates the result sink for a file, chosen by its extension: `.csv` for CSV, `.jsonl` or `.ndjson` for JSON
+    lines, and `.db`, `.sqlite` or `.sqlite3` for SQLite
+
+    :param path: Location of the file results are written to
+    :type path: str
+    :param sync_interval: Number of results written between flushes of the file to disk; defaults to the
+        `RESULT_SYNC_INTERVAL` configuration directive
+    :type sync_interval: int
+    :param append: Whether results are added to those already in the file
+    :type append: bool
+
+    :raises ValueError: if the file's extension is not recognized
+
+    :rtype: ResultSink
+    """
+    return _sink_class(path)(path, sync_interval, append)
+
+
+def trim_results(path, next_row):
+    """Removes the results of the rows a resumed import is about to process again from the file of the run it
+    continues, in the format chosen by the file's extension as by `create_result_sink`; see `ResultSink.trim`
+
+    :param path: Location of the file results are written to; nothing is done if it does not exist
+    :type path: str
+    :param next_row: Number of the first row the resumed import processes
+    :type next_row: int
+
+    :raises ValueError: if the file's extension is not recognized
+    """
+    _sink_class(path).trim(path, next_row)
+
+
+def _sink_class(path):
+    """Returns the result sink class for a file, chosen by its extension
+
+    :raises ValueError: if the file's extension is not recognized
+
+    :rtype: type
+    """
+    sink_class = SINK_FORMATS.get(os.path.splitext(path)[1].lower())
+    if sink_class is None:
+        raise ValueError('Cannot tell the format of results file {}; use .csv, .jsonl or .db'.format(path))
+
+    return sink_class
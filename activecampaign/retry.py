@@ -0,0 +1,296 @@
+import random
+import threading
+import time
+from collections import Counter
+
+from activecampaign import exc
+from config import config
+
+
+# Actions that can be repeated after a request may have reached the server: a repeated `contact_add` whose first
+# attempt succeeded is rejected as a duplicate, which is recognized as success rather than creating a second contact,
+# repeating a bulk import, `contact_sync` or `contact_edit` sets the same values again, and views do not change anything
+RETRY_SAFE_ACTIONS = frozenset([
+    'contact_add', 'contact_sync', 'contact_edit', 'bulk_import', 'list_view', 'message_view', 'contact_view_email',
+    'address_view'
+])
+
+
+class RetryStats:
+    def __init__(self):
+        """Initializes a thread-safe set of counters describing the requests made under a retry policy
+
+        :ivar attempts: Number of requests submitted, including retries
+        :ivar retries: Number of requests that were retries of a failed request
+        :ivar wasted: Number of round-trips that did not produce a usable response
+        :ivar recovered: Number of retried requests found to have succeeded on an earlier attempt
+        :ivar exhausted: Number of requests abandoned after exhausting their attempts or time budget
+        :ivar wasted_by_action: Number of wasted round-trips for each API action
+        """
+        self.attempts = 0
+        self.retries = 0
+        self.wasted = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self.wasted_by_action = Counter()
+        self._lock = threading.Lock()
+
+    def record_attempt(self, attempt):
+        with self._lock:
+            self.attempts += 1
+            if attempt > 1:
+                self.retries += 1
+
+    def record_failure(self, action, exhausted=False, recovered=False):
+        with self._lock:
+            self.wasted += 1
+            self.wasted_by_action[action] += 1
+            self.exhausted += exhausted
+            self.recovered += recovered
+
+    def as_dict(self):
+        """Returns a snapshot of the counters
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'attempts': self.attempts,
+                'retries': self.retries,
+                'wasted': self.wasted,
+                'recovered': self.recovered,
+                'exhausted': self.exhausted,
+                'wasted_by_action': dict(self.wasted_by_action),
+            }
+
+    def since(self, snapshot):
+        """Returns the counters accumulated since a snapshot was taken
+
+        :param snapshot: Earlier snapshot of these counters; see `as_dict`
+        :type snapshot: dict
+
+        :rtype: dict
+        """
+        counters = self.as_dict()
+        for name, value in snapshot.items():
+            if name == 'wasted_by_action':
+                wasted_by_action = Counter(counters[name])
+                wasted_by_action.subtract(value)
+                counters[name] = {action: count for action, count in wasted_by_action.items() if count}
+            else:
+                counters[name] -= value
+
+        return counters
+
+    def add(self, counters):
+        """Adds counters kept elsewhere, such as by the client of a worker process, to these
+
+        :param counters: Counters to add, in the form returned by `as_dict`
+        :type counters: dict
+        """
+        with self._lock:
+            self.attempts += counters['attempts']
+            self.retries += counters['retries']
+            self.wasted += counters['wasted']
+            self.recovered += counters['recovered']
+            self.exhausted += counters['exhausted']
+            self.wasted_by_action.update(counters['wasted_by_action'])
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=5, base_delay=0.5, max_delay=30.0, max_elapsed=120.0, connect_errors=(),
+                 transport_errors=(), clock=time.monotonic):
+        """Initializes a RetryPolicy that retries transient failures with exponential backoff and full jitter
+
+        Throttled (429) and unavailable (503) responses, and failures to connect, are retried for every action, since
+        the server did not act on the request. Other server errors and connections dropped mid-request are only retried
+        for actions in `RETRY_SAFE_ACTIONS`. Any other error, including an `ActiveCampaignResponseError` describing an
+        invalid or duplicate object, is raised immediately.
+
+        :param max_attempts: Maximum number of times a request is submitted; 1 disables retries
+        :type max_attempts: int
+        :param base_delay: Upper bound, in seconds, of the delay before the first retry; the bound doubles with every
+            subsequent retry
+        :type base_delay: float
+        :param max_delay: Upper bound, in seconds, of the delay before any retry
+        :type max_delay: float
+        :param max_elapsed: Number of seconds after the first attempt beyond which no retry is started
+        :type max_elapsed: float
+        :param connect_errors: Transport exceptions raised when a connection could not be established
+        :type connect_errors: tuple[type]
+        :param transport_errors: Transport exceptions raised when a request may or may not have reached the server
+        :type transport_errors: tuple[type]
+        :param clock: Function returning the current time in seconds
+        :type clock: callable
+        """
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self.connect_errors = connect_errors
+        self.transport_errors = transport_errors
+        self.stats = RetryStats()
+        self._clock = clock
+
+    def call(self, function, action, verify=None):
+        """Calls a function submitting a request, retrying it while it fails with a retryable error
+
+        A retry rejected as a duplicate is only treated as success if an earlier attempt's outcome is unknown, because
+        the connection failed or timed out after the request may have reached the server, and `verify` confirms that
+        the existing object is the one the request would have created.
+
+        :param function: Function submitting a single request and returning its decoded response body
+        :type function: callable
+        :param action: API action performed by the request
+        :type action: str
+        :param verify: Function called with the duplicate error, returning the response body to use in place of the
+            request's if the existing object is the one the request would have created, or None if it is not; when
+            omitted, the duplicate error's response body is used
+        :type verify: callable
+
+        :return: Returns the response body of the first successful attempt
+        :rtype: dict
+        """
+        started = self._clock()
+        attempt = 1
+        outcome_unknown = False
+        while True:
+            self.stats.record_attempt(attempt)
+            try:
+                return function()
+            except Exception as error:
+                if outcome_unknown and self._may_have_succeeded(error, action):
+                    response_body = verify(error) if verify is not None else error.response_body
+                    if response_body is None:
+                        raise
+
+                    self.stats.record_failure(action, recovered=True)
+                    return response_body
+
+                delay = self._backoff(error, action, attempt, started)
+                if delay is None:
+                    raise
+
+                outcome_unknown = outcome_unknown or self._outcome_unknown(error)
+
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, function, action, verify=None):
+        """Awaits a coroutine function submitting a request, retrying it while it fails with a retryable error; see
+        `call`
+
+        :param verify: Coroutine function verifying an existing object; see `call`
+        :type verify: callable
+
+        :rtype: dict
+        """
+        # Imported here so that synchronous clients do not pay for loading asyncio
+        import asyncio
+
+        started = self._clock()
+        attempt = 1
+        outcome_unknown = False
+        while True:
+            self.stats.record_attempt(attempt)
+            try:
+                return await function()
+            except Exception as error:
+                if outcome_unknown and self._may_have_succeeded(error, action):
+                    response_body = await verify(error) if verify is not None else error.response_body
+                    if response_body is None:
+                        raise
+
+                    self.stats.record_failure(action, recovered=True)
+                    return response_body
+
+                delay = self._backoff(error, action, attempt, started)
+                if delay is None:
+                    raise
+
+                outcome_unknown = outcome_unknown or self._outcome_unknown(error)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def is_retryable(self, error, action):
+        """Determines whether a request that failed with the given error may be submitted again
+
+        :param error: Exception raised by the failed attempt
+        :type error: Exception
+        :param action: API action performed by the request
+        :type action: str
+
+        :rtype: bool
+        """
+        if isinstance(error, exc.ActiveCampaignRateLimitError) or isinstance(error, self.connect_errors):
+            return True
+        elif isinstance(error, exc.ActiveCampaignServerError):
+            return error.status_code == 503 or action in RETRY_SAFE_ACTIONS
+        elif isinstance(error, self.transport_errors):
+            return action in RETRY_SAFE_ACTIONS
+        else:
+            return False
+
+    def delay(self, attempt):
+        """Returns a randomized delay to wait before the given retry
+
+        :param attempt: Number of the attempt that just failed
+        :type attempt: int
+
+        :rtype: float
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _outcome_unknown(self, error):
+        """Determines whether a failed attempt may have been carried out by the server all the same, because the
+        connection failed or timed out after it was established
+
+        :rtype: bool
+        """
+        return isinstance(error, self.transport_errors) and not isinstance(error, self.connect_errors)
+
+    @staticmethod
+    def _may_have_succeeded(error, action):
+        """Determines whether a retry failed in the way it would if an earlier attempt had succeeded
+
+        :rtype: bool
+        """
+        return action in RETRY_SAFE_ACTIONS and isinstance(error, exc.ActiveCampaignDuplicateError)
+
+    def _backoff(self, error, action, attempt, started):
+        """Records a failed attempt and determines how long to wait before retrying it
+
+        :return: Returns the number of seconds to wait, or None if the error should be raised
+        :rtype: float
+        """
+        if not self.is_retryable(error, action):
+            return None
+
+        delay = self.delay(attempt)
+        exhausted = attempt >= self.max_attempts or self._clock() + delay - started > self.max_elapsed
+        self.stats.record_failure(action, exhausted=exhausted)
+        return None if exhausted else delay
+
+
+def create_retry_policy(connect_errors=(), transport_errors=()):
+    """Creates a retry policy from the `RETRY_*` configuration directives
+
+    :param connect_errors: Transport exceptions raised when a connection could not be established
+    :type connect_errors: tuple[type]
+    :param transport_errors: Transport exceptions raised when a request may or may not have reached the server
+    :type transport_errors: tuple[type]
+
+    :rtype: RetryPolicy
+    """
+    return RetryPolicy(
+        max_attempts=config['RETRY_MAX_ATTEMPTS'],
+        base_delay=config['RETRY_BASE_DELAY'],
+        max_delay=config['RETRY_MAX_DELAY'],
+        max_elapsed=config['RETRY_MAX_ELAPSED'],
+        connect_errors=connect_errors,
+        transport_errors=transport_errors
+    )
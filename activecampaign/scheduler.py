@@ -0,0 +1,168 @@
+import heapq
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from activecampaign import exc
+
+
+Step = namedtuple('Step', ['key', 'function', 'dependencies'])
+Step.__new__.__defaults__ = ((),)
+Step.__doc__ = """A unit of work run by `StepScheduler` once every step it depends on has succeeded
+
+:ivar key: Hashable identifier of the step, unique among the steps run together
+:ivar function: Callable performing the step, called with the value of each dependency in order
+:ivar dependencies: Keys of the steps whose values the step needs
+"""
+
+StepResult = namedtuple('StepResult', ['key', 'value', 'error', 'elapsed'])
+StepResult.__doc__ = """Outcome of a single step run by `StepScheduler`
+
+:ivar key: Identifier of the step
+:ivar value: Value returned by the step, or None if it failed or was skipped
+:ivar error: Exception raised by the step, an `activecampaign.exc.ActiveCampaignDependencyError` if it was skipped
+    because a step it depends on failed, or None if it succeeded
+:ivar elapsed: Seconds the step took to run; 0 if it was skipped
+"""
+
+
+class StepScheduler:
+    def __init__(self, workers=1):
+        """Initializes a StepScheduler that runs interdependent steps on a bounded pool of worker threads, starting each
+        step as soon as the steps it depends on have succeeded
+
+        When more steps are ready than there are free workers, steps heading the longest chains of dependent steps are
+        started first, so that the critical path is never left waiting behind work that could be done later.
+
+        :param workers: Number of steps that may run concurrently
+        :type workers: int
+        """
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+
+        self.workers = workers
+
+    def run(self, steps):
+        """Runs every step, yielding the outcome of each as it finishes
+
+        A step that fails does not stop unrelated steps; the steps depending on it, directly or not, are skipped.
+
+        :param steps: Steps to run
+        :type steps: collections.abc.Iterable[Step]
+
+        :return: Returns an iterator over the outcome of each step, in the order they finish
+        :rtype: collections.abc.Iterator[StepResult]
+
+        :raises ValueError: if a step depends on an unknown step, or steps depend on each other in a cycle
+        """
+        steps = {step.key: step for step in steps}
+        dependents = {key: [] for key in steps}
+        for key, dependencies in self._dependencies(steps).items():
+            for dependency in dependencies:
+                if dependency not in steps:
+                    raise ValueError('{!r} depends on unknown step {!r}'.format(key, dependency))
+                dependents[dependency].append(key)
+
+        heights = self._heights(steps, dependents)
+        # Number of dependencies each step is still waiting for; steps leave it once they are ready or skipped
+        waiting = {key: len(dependencies) for key, dependencies in self._dependencies(steps).items()}
+        values = {}
+        # Steps whose dependencies have succeeded, tallest first and then in the order they became ready
+        ready = []
+        sequence = 0
+        for key in steps:
+            if not waiting[key]:
+                del waiting[key]
+                heapq.heappush(ready, (-heights[key], sequence, key))
+                sequence += 1
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = {}
+
+            while ready or running:
+                while ready and len(running) < self.workers:
+                    key = heapq.heappop(ready)[2]
+                    step = steps[key]
+                    arguments = [values[dependency] for dependency in step.dependencies]
+                    running[executor.submit(self._call, step.function, arguments)] = key
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    value, error, elapsed = future.result()
+                    yield StepResult(key, value, error, elapsed)
+
+                    if error is not None:
+                        yield from self._skip(key, error, dependents, waiting)
+                        continue
+
+                    values[key] = value
+                    for dependent in dependents[key]:
+                        if dependent not in waiting:
+                            continue
+
+                        waiting[dependent] -= 1
+                        if not waiting[dependent]:
+                            del waiting[dependent]
+                            heapq.heappush(ready, (-heights[dependent], sequence, dependent))
+                            sequence += 1
+
+    @staticmethod
+    def _dependencies(steps):
+        """Returns the distinct dependencies of every step, as a step may list the same one more than once
+
+        :rtype: dict
+        """
+        return {key: list(dict.fromkeys(step.dependencies)) for key, step in steps.items()}
+
+    @staticmethod
+    def _call(function, arguments):
+        """Runs a step's function, capturing its outcome
+
+        :return: Returns the value returned, the exception raised or None, and the seconds the call took
+        :rtype: tuple
+        """
+        started = time.perf_counter()
+        try:
+            return function(*arguments), None, time.perf_counter() - started
+        except Exception as error:
+            return None, error, time.perf_counter() - started
+
+    @staticmethod
+    def _skip(key, error, dependents, waiting):
+        """Skips every step depending, directly or not, on a failed step
+
+        Skipped steps are removed from `waiting` so that they are never started.
+
+        :rtype: collections.abc.Iterator[StepResult]
+        """
+        pending = list(dependents[key])
+        while pending:
+            dependent = pending.pop()
+            if waiting.pop(dependent, None) is not None:
+                yield StepResult(dependent, None, exc.ActiveCampaignDependencyError(key, error), 0)
+                pending.extend(dependents[dependent])
+
+    @staticmethod
+    def _heights(steps, dependents):
+        """Returns, for every step, the number of steps on the longest chain starting at it
+
+        :raises ValueError: if steps depend on each other in a cycle
+        """
+        # Kahn's algorithm over the reversed graph visits every step after all of its dependents
+        remaining = {key: len(dependents[key]) for key in steps}
+        pending = [key for key, count in remaining.items() if not count]
+        heights = {}
+
+        while pending:
+            key = pending.pop()
+            heights[key] = 1 + max((heights[dependent] for dependent in dependents[key]), default=0)
+            for dependency in dict.fromkeys(steps[key].dependencies):
+                remaining[dependency] -= 1
+                if not remaining[dependency]:
+                    pending.append(dependency)
+
+        if len(heights) < len(steps):
+            raise ValueError('Steps depend on each other in a cycle')
+
+        return heights
@@ -0,0 +1,363 @@
+import os
+import pickle
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from activecampaign import exc
+from config import config
+
+
+# Size of the blocks a CSV file is scanned in while looking for row boundaries
+SCAN_BLOCK_SIZE = 1 << 20
+
+
+Shard = namedtuple('Shard', ['number', 'start', 'end'])
+Shard.__doc__ = """A byte range of a CSV file holding whole rows
+
+:ivar number: 0-based position of the shard in the file
+:ivar start: Byte offset at which the shard's first row starts
+:ivar end: Byte offset at which the row following the shard's last row starts
+"""
+
+ShardResult = namedtuple(
+    'ShardResult', ['shard', 'rows', 'imported', 'failures', 'rejects', 'duplicates', 'retries', 'rejects_path']
+)
+ShardResult.__doc__ = """Outcome of importing a single shard
+
+Rows are numbered from 1 within each shard; `ShardedImporter` renumbers them within the whole file.
+
+:ivar shard: Shard that was imported
+:ivar rows: Number of data rows in the shard
+:ivar imported: Number of contacts created
+:ivar failures: (row number, email address, error message) of each contact that could not be created
+:ivar rejects: Number of rows rejected before submission
+:ivar duplicates: Number of rows repeating an email address found earlier in the shard, or that the server reported
+    as duplicates of a contact created from another shard
+:ivar retries: Counters of the requests made while importing the shard; see `activecampaign.retry.RetryStats.as_dict`
+:ivar rejects_path: Location of the file the shard's rejected rows were spilled to, as pickled (row, reason) tuples
+"""
+
+ImportReport = namedtuple('ImportReport', ['rows', 'imported', 'failures', 'rejects', 'duplicates', 'retries'])
+ImportReport.__doc__ = """Outcome of importing a CSV file, merged from its shards when it was imported in several
+
+Rejected rows are not kept; they are passed to the `reject` function of the import as they are found.
+
+:ivar rows: Number of data rows in the file
+:ivar imported: Number of contacts created
+:ivar failures: (row number, email address, error message) of each contact that could not be created, in file order
+:ivar rejects: Number of rows rejected before submission
+:ivar duplicates: Number of rows repeating an email address, either within their shard or, as reported by the server,
+    a contact already on the mailing lists, such as one created from another shard
+:ivar retries: Counters of the requests made during the import; see `activecampaign.retry.RetryStats.as_dict`
+"""
+
+
+def find_shards(path, count):
+    """Splits a CSV file into byte ranges of about equal size that each hold whole rows
+
+    Boundaries are placed after line breaks outside quoted values, so rows whose values span several lines are never
+    split. Finding them takes a single scan counting quotes, which is much cheaper than parsing the file.
+
+    :param path: Location of the CSV file, whose first line is a header
+    :type path: str
+    :param count: Number of shards to split the file into; fewer are returned if the file has too few rows
+    :type count: int
+
+    :rtype: list[Shard]
+    """
+    with open(path, 'rb') as stream:
+        stream.readline()
+        header_end, size = stream.tell(), os.fstat(stream.fileno()).st_size
+
+        targets = [header_end + (size - header_end) * n // count for n in range(1, count)]
+        boundaries = [header_end]
+        position, quotes = header_end, 0
+
+        for target in targets:
+            if target <= boundaries[-1]:
+                continue
+
+            boundary, position, quotes = _next_boundary(stream, target, position, quotes)
+            if boundary is None:
+                break
+            elif boundary > boundaries[-1]:
+                boundaries.append(boundary)
+
+    if boundaries[-1] < size:
+        boundaries.append(size)
+
+    return [Shard(number, start, end) for number, (start, end) in enumerate(zip(boundaries, boundaries[1:]))]
+
+
+def _next_boundary(stream, target, position, quotes):
+    """Finds the first row boundary at or after a byte offset
+
+    :param stream: CSV file opened in binary mode
+    :type stream: io.BufferedIOBase
+    :param target: Byte offset to search from
+    :type target: int
+    :param position: Byte offset up to which quotes have been counted
+    :type position: int
+    :param quotes: Number of quotes between the end of the header and `position`
+    :type quotes: int
+
+    :return: Returns the boundary, or None if there is none before the end of the file, along with the new `position`
+        and `quotes` to continue searching from
+    :rtype: tuple
+    """
+    stream.seek(position)
+
+    while True:
+        block = stream.read(SCAN_BLOCK_SIZE)
+        if not block:
+            return None, position, quotes
+
+        # A boundary must follow a line break, so the scan can only stop at the line break ending the target's line
+        search_from = max(0, target - position - 1)
+        line_break = block.find(b'\n', search_from)
+        while line_break != -1:
+            if (quotes + block.count(b'"', 0, line_break)) % 2 == 0:
+                position += line_break + 1
+                return position, position, quotes + block.count(b'"', 0, line_break + 1)
+
+            line_break = block.find(b'\n', line_break + 1)
+
+        quotes += block.count(b'"')
+        position += len(block)
+
+
+def import_contacts(api, path, mailing_lists, workers=1, bulk=False, start=0, end=None, reject=None):
+    """Imports the contacts of a CSV file, or of a byte range of it, through the same pipeline as `demo.py`
+
+    :param api: Client used to create contacts
+    :type api: activecampaign.api.ActiveCampaignAPI
+    :param path: Location of the CSV file
+    :type path: str
+    :param mailing_lists: Mailing lists every imported contact should be associated with
+    :type mailing_lists: list[int]
+    :param workers: Number of contacts created concurrently
+    :type workers: int
+    :param bulk: Whether contacts are submitted through the bulk import endpoint
+    :type bulk: bool
+    :param start: Byte offset at which to start reading rows
+    :type start: int
+    :param end: Byte offset at which to stop reading rows; defaults to the end of the file
+    :type end: int
+    :param reject: Function called with each rejected row and the reason it was rejected; when omitted, rejected rows
+        are only counted
+    :type reject: callable
+
+    :return: Returns the outcome of the import, with rows numbered from 1 at `start`; its retry counters cover every
+        request made through `api` while the import ran
+    :rtype: ImportReport
+    """
+    from activecampaign.dedup import EmailIndex
+    from activecampaign.importer import BulkContactImporter, ContactImporter
+    from activecampaign.pipeline import prepare_contacts
+    from activecampaign.reader import read_contacts
+
+    importer = BulkContactImporter(api, mailing_lists) if bulk else ContactImporter(api, mailing_lists, workers=workers)
+    stats = api.retry_policy.stats
+    retried = stats.as_dict()
+    rows = imported = duplicates = rejects = 0
+    failures = []
+
+    def counted(contacts):
+        nonlocal rows
+        for row in contacts:
+            rows = row.number
+            yield row
+
+    def rejected(row, reason):
+        nonlocal rejects
+        rejects += 1
+        if reject is not None:
+            reject(row, reason)
+
+    with open(path, 'rb') as stream, EmailIndex() as seen:
+        contacts = counted(read_contacts(stream, offset=start, end=end))
+        for result in importer.run(prepare_contacts(contacts, rejected, seen)):
+            if result.error is None:
+                imported += 1
+            elif (isinstance(result.error, exc.ActiveCampaignDuplicateError)
+                    and api.find_listed_contact(result.email, mailing_lists) is not None):
+                # Created from a row the index cannot know about, such as one in another shard. A contact that existed
+                # before the import without being on the mailing lists is a failure, as it is in an unsharded import
+                duplicates += 1
+            else:
+                # Errors are kept as text, since exceptions holding HTTP responses cannot always be pickled
+                failures.append((result.row, result.email, str(result.error)))
+
+        duplicates += seen.duplicates
+
+    return ImportReport(rows, imported, failures, rejects, duplicates, stats.since(retried))
+
+
+def import_shard(path, shard, mailing_lists, rejects_path, workers=1, bulk=False):
+    """Imports the rows of a single shard, in a process set up by `ShardedImporter`
+
+    :param path: Location of the CSV file
+    :type path: str
+    :param shard: Shard to import
+    :type shard: Shard
+    :param mailing_lists: Mailing lists every imported contact should be associated with
+    :type mailing_lists: list[int]
+    :param rejects_path: Location of the file rejected rows are spilled to, rather than being sent back to the parent
+        process in memory
+    :type rejects_path: str
+    :param workers: Number of contacts created concurrently within the process
+    :type workers: int
+    :param bulk: Whether contacts are submitted through the bulk import endpoint
+    :type bulk: bool
+
+    :rtype: ShardResult
+    """
+    with open(rejects_path, 'wb') as rejects:
+        report = import_contacts(
+            _worker_api, path, mailing_lists, workers, bulk, shard.start, shard.end,
+            lambda row, reason: pickle.dump((row, reason), rejects)
+        )
+
+    return ShardResult(shard, *report, rejects_path)
+
+
+def read_rejects(path):
+    """Reads the rejected rows a shard spilled to a file
+
+    :param path: Location of the file; see `ShardResult.rejects_path`
+    :type path: str
+
+    :return: Returns an iterator over (row, reason) tuples, in the order they were rejected
+    :rtype: collections.abc.Iterator[tuple]
+    """
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+# Client used by `import_shard`, created once in each worker process
+_worker_api = None
+
+
+def _init_worker(settings, rate_limiter):
+    """Sets up a worker process with the parent process's configuration and a client sharing its rate limiter
+
+    :param settings: Configuration directives of the parent process
+    :type settings: dict
+    :param rate_limiter: Rate limiter shared by all worker processes, or None if rate limiting is disabled
+    :type rate_limiter: activecampaign.ratelimit.SharedRateLimiter
+    """
+    global _worker_api
+    from activecampaign.api import ActiveCampaignAPI
+
+    config.update(settings)
+    _worker_api = ActiveCampaignAPI(rate_limiter=rate_limiter)
+
+
+class ShardedImporter:
+    def __init__(self, path, mailing_lists, processes, workers=1, bulk=False, shards=None):
+        """Initializes a ShardedImporter that imports a CSV file in byte-range shards, one worker process at a time per
+        shard, so that parsing, validating and encoding contacts can use every core
+
+        Every worker process has its own client, and all of them draw on a single rate budget configured by the
+        `RATE_*` configuration directives. Each shard is deduplicated on its own; a contact repeated in a later shard
+        is rejected by the server as a duplicate, and reported as one.
+
+        :param path: Location of the CSV file
+        :type path: str
+        :param mailing_lists: Mailing lists every imported contact should be associated with
+        :type mailing_lists: list[int]
+        :param processes: Number of worker processes
+        :type processes: int
+        :param workers: Number of contacts each worker process creates concurrently
+        :type workers: int
+        :param bulk: Whether contacts are submitted through the bulk import endpoint
+        :type bulk: bool
+        :param shards: Number of shards the file is split into; defaults to four per process, so that processes which
+            finish early can take on more of the file
+        :type shards: int
+        """
+        if processes < 1:
+            raise ValueError('processes must be at least 1')
+
+        self.path = path
+        self.mailing_lists = mailing_lists
+        self.processes = processes
+        self.workers = workers
+        self.bulk = bulk
+        self.shards = shards or processes * 4
+
+    def run(self, reject=None):
+        """Imports every shard of the file and merges their outcomes
+
+        :param reject: Function called with each rejected row, numbered within the whole file, and the reason it was
+            rejected; rows are passed in file order once every shard has been imported
+        :type reject: callable
+
+        :rtype: ImportReport
+        """
+        from activecampaign.ratelimit import create_rate_limiter
+
+        # Worker processes are spawned rather than forked, as forking a process that may hold threads is unsafe
+        context = get_context('spawn')
+        shards = find_shards(self.path, self.shards)
+        settings = dict(config, POOL_MAXSIZE=max(config['POOL_MAXSIZE'], self.workers))
+
+        with tempfile.TemporaryDirectory() as directory:
+            with ProcessPoolExecutor(
+                max_workers=min(self.processes, len(shards)) or 1,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(settings, create_rate_limiter(context))
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        import_shard,
+                        self.path,
+                        shard,
+                        self.mailing_lists,
+                        os.path.join(directory, '{}.rejects'.format(shard.number)),
+                        self.workers,
+                        self.bulk
+                    )
+                    for shard in shards
+                ]
+                results = [future.result() for future in futures]
+
+            return merge_results(results, reject)
+
+
+def merge_results(results, reject=None):
+    """Merges the outcomes of a file's shards into a single report, numbering rows within the whole file
+
+    :param results: Outcome of every shard of the file
+    :type results: collections.abc.Iterable[ShardResult]
+    :param reject: Function called with each rejected row, renumbered within the whole file, and the reason it was
+        rejected
+    :type reject: callable
+
+    :rtype: ImportReport
+    """
+    from activecampaign.retry import RetryStats
+
+    rows = imported = rejects = duplicates = 0
+    failures = []
+    stats = RetryStats()
+
+    for result in sorted(results, key=lambda result: result.shard.number):
+        failures.extend((number + rows, email, error) for number, email, error in result.failures)
+        if reject is not None:
+            for row, reason in read_rejects(result.rejects_path):
+                reject(row._replace(number=row.number + rows), reason)
+        rows += result.rows
+        imported += result.imported
+        rejects += result.rejects
+        duplicates += result.duplicates
+        stats.add(result.retries)
+
+    return ImportReport(rows, imported, failures, rejects, duplicates, stats.as_dict())
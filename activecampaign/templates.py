@@ -0,0 +1,45 @@
+from urllib.parse import urlencode
+
+
+# Content type of request bodies encoded by a template, which the HTTP clients only set themselves for dictionaries
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+# Headers of form-encoded request bodies compressed with gzip
+COMPRESSED_FORM_HEADERS = dict(FORM_HEADERS, **{'Content-Encoding': 'gzip'})
+
+
+class RequestTemplate:
+    def __init__(self, action, request_url, params, constant_fields=()):
+        """Initializes a RequestTemplate, a request for an API action whose URL and constant body fields are encoded
+        once, ahead of the requests made from it
+
+        :param action: API action performed by requests made from the template
+        :type action: str
+        :param request_url: URL of the API, without a query string
+        :type request_url: str
+        :param params: Query parameters of every request made from the template
+        :type params: dict
+        :param constant_fields: Body fields with the same value in every request made from the template, such as list
+            memberships; they are encoded after the variable fields
+        :type constant_fields: dict | collections.abc.Iterable[tuple]
+        """
+        self.action = action
+        self.url = '{}?{}'.format(request_url, urlencode(params))
+        self._suffix = urlencode(constant_fields)
+
+    def encode(self, fields):
+        """Encodes a request body from the variable fields of a single request and the template's constant fields
+
+        :param fields: Body fields specific to the request
+        :type fields: dict | collections.abc.Iterable[tuple]
+
+        :return: Returns the form-encoded request body
+        :rtype: bytes
+        """
+        variable = urlencode(fields)
+        if not self._suffix:
+            return variable.encode('ascii')
+        elif not variable:
+            return self._suffix.encode('ascii')
+
+        return '{}&{}'.format(variable, self._suffix).encode('ascii')
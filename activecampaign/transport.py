@@ -0,0 +1,212 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+from http.client import responses
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from activecampaign import exc
+from config import config
+
+
+# Query parameters whose values are replaced in recordings, so that recordings can be shared without leaking credentials
+SCRUBBED_PARAMS = frozenset(['api_key'])
+SCRUBBED_VALUE = 'scrubbed'
+
+
+Exchange = namedtuple('Exchange', ['method', 'target', 'digest', 'status', 'content_type', 'elapsed', 'content'])
+Exchange.__doc__ = """Request and response recorded by a `RecordingAdapter`
+
+:ivar method: HTTP method of the request
+:ivar target: Path and query string of the request, with the values of `SCRUBBED_PARAMS` replaced
+:ivar digest: Hash of the request's uncompressed body, identifying it without keeping it; see `request_key`
+:ivar status: HTTP status code of the response
+:ivar content_type: Content type of the response, or None if it had none
+:ivar elapsed: Seconds between sending the request and receiving the response
+:ivar content: Body of the response
+"""
+
+
+def request_key(request):
+    """Identifies a request independently of the server it is sent to and of the credentials it carries
+
+    :param request: Prepared request
+    :type request: requests.PreparedRequest
+
+    :return: Returns the request's method, scrubbed path and query string, and a hash of its uncompressed body
+    :rtype: tuple[str, str, str]
+    """
+    url = urlsplit(request.url)
+    query = urlencode([
+        (name, SCRUBBED_VALUE if name in SCRUBBED_PARAMS else value)
+        for name, value in parse_qsl(url.query, keep_blank_values=True)
+    ])
+
+    body = request.body or b''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    # Compressed bodies embed the time they were compressed at, so identify them by their content
+    if request.headers.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+
+    return request.method, url.path + ('?' + query if query else ''), hashlib.sha1(body).hexdigest()
+
+
+def create_adapter():
+    """Creates an adapter sending requests over connections that are pooled and kept alive between requests
+
+    :return: Returns an adapter configured from the `POOL_CONNECTIONS`, `POOL_MAXSIZE` and `POOL_BLOCK` directives
+    :rtype: requests.adapters.HTTPAdapter
+    """
+    return HTTPAdapter(
+        pool_connections=config['POOL_CONNECTIONS'],
+        pool_maxsize=config['POOL_MAXSIZE'],
+        pool_block=config['POOL_BLOCK']
+    )
+
+
+def _open(path, mode):
+    """Opens a recording as text, compressed with gzip if its name ends in .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+
+    return open(path, mode, encoding='utf-8')
+
+
+class RecordingAdapter(BaseAdapter):
+    def __init__(self, path, adapter=None):
+        """Initializes a RecordingAdapter, which sends requests through another adapter and records every exchange
+
+        Exchanges are written to the recording as they complete, one compact JSON array per line holding the fields
+        of `Exchange`; the file is compressed with gzip if its name ends in .gz. API keys in query strings are
+        scrubbed and request bodies are only recorded as a hash, so recordings hold no credentials. A request that
+        fails before a response is received is not recorded.
+
+        :param path: Location of the recording; replaced if it exists
+        :type path: str
+        :param adapter: Adapter requests are sent through; when omitted, a pooled adapter is created from the `POOL_*`
+            configuration directives
+        :type adapter: requests.adapters.BaseAdapter
+        """
+        super().__init__()
+        self.path = path
+        self.adapter = adapter if adapter is not None else create_adapter()
+        self.count = 0
+        self._file = _open(path, 'w')
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        response = self.adapter.send(request, **kwargs)
+        elapsed = time.monotonic() - started
+
+        method, target, digest = request_key(request)
+        exchange = Exchange(
+            method,
+            target,
+            digest,
+            response.status_code,
+            response.headers.get('Content-Type'),
+            round(elapsed, 6),
+            response.content.decode('utf-8', 'surrogateescape')
+        )
+        line = json.dumps(exchange, separators=(',', ':')) + '\n'
+
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+
+        return response
+
+    def close(self):
+        """Closes the wrapped adapter, and writes out and closes the recording"""
+        self.adapter.close()
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, path, timing=False):
+        """Initializes a ReplayAdapter, which answers requests with the responses recorded by a `RecordingAdapter`,
+        without any network access
+
+        Each request is answered with the next unused response recorded for a request with the same method, path,
+        query string and body, regardless of the server and API key it is sent with. Requests that were repeated, such
+        as retries, are answered in the order they were recorded, so concurrent requests can be replayed in any order.
+
+        :param path: Location of the recording
+        :type path: str
+        :param timing: Whether each response is delayed by the time the recorded response took; by default responses
+            are returned immediately, so that only the client's own overhead is measured
+        :type timing: bool
+        """
+        super().__init__()
+        self.path = path
+        self.timing = timing
+        self.count = 0
+        self._exchanges = defaultdict(deque)
+        self._lock = threading.Lock()
+
+        with _open(path, 'r') as f:
+            for line in f:
+                exchange = Exchange(*json.loads(line))
+                self._exchanges[exchange.method, exchange.target, exchange.digest].append(exchange)
+
+    def __len__(self):
+        """Returns the number of recorded responses not replayed yet"""
+        return sum(len(exchanges) for exchanges in self._exchanges.values())
+
+    def send(self, request, **kwargs):
+        """Answers a request with its recorded response
+
+        :raises exc.ActiveCampaignReplayError: if no response to the request is left in the recording
+        """
+        key = request_key(request)
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            if not exchanges:
+                raise exc.ActiveCampaignReplayError('No recorded response left for {} {}'.format(*key[:2]))
+
+            exchange = exchanges.popleft()
+            self.count += 1
+
+        if self.timing:
+            time.sleep(exchange.elapsed)
+
+        response = requests.Response()
+        response.status_code = exchange.status
+        response.reason = responses.get(exchange.status)
+        response.headers = CaseInsensitiveDict()
+        if exchange.content_type is not None:
+            response.headers['Content-Type'] = exchange.content_type
+        response._content = exchange.content.encode('utf-8', 'surrogateescape')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def create_transport():
+    """Creates a transport from the `TRANSPORT_*` configuration directives
+
+    :return: Returns a `ReplayAdapter` for the recording named by `TRANSPORT_REPLAY`, a `RecordingAdapter` writing to
+        the recording named by `TRANSPORT_RECORD`, or a pooled adapter if neither is set
+    :rtype: requests.adapters.BaseAdapter
+    """
+    if config['TRANSPORT_REPLAY']:
+        return ReplayAdapter(config['TRANSPORT_REPLAY'], config['TRANSPORT_REPLAY_TIMING'])
+    elif config['TRANSPORT_RECORD']:
+        return RecordingAdapter(config['TRANSPORT_RECORD'])
+
+    return create_adapter()
@@ -0,0 +1,366 @@
+"""End-to-end throughput benchmark for the campaign pipeline
+
+Runs the full flow `demo.py` performs (mailing list, address, contact import, message and campaign) against a local
+`activecampaign.fakeserver` with simulated latency, for every combination of the given contact counts and worker
+counts. Each combination runs in a fresh process so that its peak memory and CPU time are its own.
+
+    python -m benchmarks.pipeline --contacts 1000 10000 --workers 1 8 --latency lognormal:0.02,0.5 --output new.json
+    python -m benchmarks.pipeline --contacts 1000 10000 --workers 1 8 --baseline new.json
+
+Results are printed as a table and, with `--output`, written as JSON. With `--baseline`, each result is compared with
+the matching result of an earlier run and the command exits with status 1 if throughput regressed by more than
+`--tolerance`.
+
+With `--recordings`, each combination's requests and responses are recorded the first time it runs, and later runs
+replay the recordings at full speed instead of starting a server, so that only the client's own overhead is measured
+and results do not vary with simulated latency:
+
+    python -m benchmarks.pipeline --contacts 10000 --workers 1 8 --recordings recordings/ --baseline before.json
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+from activecampaign.api import ActiveCampaignAPI
+from activecampaign.dedup import EmailIndex
+from activecampaign.fakeserver import FakeActiveCampaign
+from activecampaign.importer import BulkContactImporter, ContactImporter
+from activecampaign.pipeline import prepare_contacts
+from activecampaign.reader import read_contacts
+from config import config
+
+
+SENDER = {
+    'name': 'Benchmark Co',
+    'email': 'sender@example.com',
+    'address': '1 Main St',
+    'city': 'Springfield',
+    'state': 'IL',
+    'zip': '62701',
+    'country': 'US'
+}
+
+# Base URL requests are sent to when they are answered from a recording; nothing needs to be listening at it
+REPLAY_BASE_URL = 'http://replay.invalid'
+
+MESSAGE = '<html><body><p>Hello from the benchmark</p></body></html>'
+
+
+def generate_contacts(path, count):
+    """Writes a CSV file of distinct, valid contacts
+
+    :param path: Location of the file to write
+    :type path: str
+    :param count: Number of contacts to write
+    :type count: int
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['email', 'first_name', 'last_name'])
+        for n in range(count):
+            writer.writerow(['contact{}@example.com'.format(n), 'First{}'.format(n), 'Last{}'.format(n)])
+
+
+def percentile(values, fraction):
+    """Returns the nearest-rank percentile of a sorted sequence
+
+    :param values: Sorted values
+    :type values: collections.abc.Sequence[float]
+    :param fraction: Percentile as a fraction, e.g. 0.95
+    :type fraction: float
+
+    :rtype: float
+    """
+    if not values:
+        return None
+
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def run_case(base_url, api_key, path, contacts, workers, bulk, record=None, replay=None):
+    """Runs the campaign flow once, importing the contacts in the given CSV file
+
+    :param base_url: Base URL of the server to run against
+    :type base_url: str
+    :param api_key: API key the server accepts
+    :type api_key: str
+    :param path: Location of the CSV file of contacts
+    :type path: str
+    :param contacts: Number of contacts in the file
+    :type contacts: int
+    :param workers: Number of contacts created concurrently
+    :type workers: int
+    :param bulk: Whether contacts are submitted through the bulk import endpoint
+    :type bulk: bool
+    :param record: Location of a file the run's requests and responses are recorded to
+    :type record: str
+    :param replay: Location of a recording whose responses answer the run's requests, instead of the server
+    :type replay: str
+
+    :return: Returns the measurements of the run
+    :rtype: dict
+    """
+    config['AC_BASE_URL'] = base_url
+    config['AC_API_KEY'] = api_key
+    # Measure the client, not the client-side throttle
+    config['RATE_LIMIT'] = 0
+    config['POOL_MAXSIZE'] = max(config['POOL_MAXSIZE'], workers)
+    config['TRANSPORT_RECORD'] = record or ''
+    config['TRANSPORT_REPLAY'] = replay or ''
+
+    # Response times are held in a compact array so that recording them barely affects peak memory
+    latencies = array('d')
+    failures = 0
+
+    with ActiveCampaignAPI() as api:
+        api.session.hooks['response'].append(
+            lambda response, **kwargs: latencies.append(response.elapsed.total_seconds())
+        )
+
+        started, cpu_started = time.perf_counter(), time.process_time()
+
+        mailing_list_id = api.create_mailing_list('Benchmark - Mailing List', SENDER)
+        api.create_address(SENDER, [mailing_list_id])
+
+        if bulk:
+            importer = BulkContactImporter(api, [mailing_list_id])
+        else:
+            importer = ContactImporter(api, [mailing_list_id], workers=workers)
+
+        with open(path, 'rb') as stream, EmailIndex() as seen:
+            rows = prepare_contacts(read_contacts(stream), lambda row, reason: None, seen)
+            for result in importer.run(rows):
+                failures += result.error is not None
+
+        message_id = api.create_html_message(
+            [mailing_list_id],
+            'Benchmark',
+            MESSAGE,
+            SENDER['email'],
+            SENDER['name'],
+            SENDER['email']
+        )
+        api.create_single_campaign('Benchmark', '2030-01-01 00:00:00', [mailing_list_id], message_id)
+
+        elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+
+    latencies = sorted(latencies)
+    return {
+        'contacts': contacts,
+        'workers': workers,
+        'bulk': bulk,
+        'requests': len(latencies),
+        'failures': failures,
+        'elapsed': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'contacts_per_second': contacts / elapsed,
+        'latency_p50': percentile(latencies, 0.50),
+        'latency_p95': percentile(latencies, 0.95),
+        'latency_p99': percentile(latencies, 0.99),
+        # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+        'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024),
+        'cpu_per_contact': cpu / contacts if contacts else None,
+    }
+
+
+def run_isolated(*args):
+    """Runs `run_case` in a freshly spawned process, so that its memory and CPU measurements start from zero
+
+    :rtype: dict
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        return executor.submit(run_case, *args).result()
+
+
+def compare(results, baseline, tolerance):
+    """Compares results with those of an earlier run
+
+    :param results: Results of this run
+    :type results: list[dict]
+    :param baseline: Results of the earlier run
+    :type baseline: list[dict]
+    :param tolerance: Fraction by which throughput may drop before it counts as a regression
+    :type tolerance: float
+
+    :return: Returns an iterator over (result, baseline result, throughput change, regressed) tuples, for every result
+        with a matching baseline result
+    :rtype: collections.abc.Iterator[tuple]
+    """
+    previous = {(result['contacts'], result['workers'], result['bulk']): result for result in baseline}
+
+    for result in results:
+        before = previous.get((result['contacts'], result['workers'], result['bulk']))
+        if before is None:
+            continue
+
+        change = result['requests_per_second'] / before['requests_per_second'] - 1
+        yield result, before, change, change < -tolerance
+
+
+def format_result(result):
+    return '{:>9} {:>4} {:>5} {:>9.1f} {:>8.1f} {:>8.1f} {:>8.1f} {:>9.1f} {:>9.1f} {:>6}'.format(
+        result['contacts'],
+        result['workers'],
+        'yes' if result['bulk'] else 'no',
+        result['requests_per_second'],
+        result['latency_p50'] * 1000,
+        result['latency_p95'] * 1000,
+        result['latency_p99'] * 1000,
+        result['peak_rss'] / 2 ** 20,
+        result['cpu_per_contact'] * 1e6,
+        result['failures']
+    )
+
+
+def current_commit():
+    """Returns the commit the benchmarked code was checked out from, if it is a git checkout
+
+    :rtype: str
+    """
+    try:
+        output = subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError:
+        return None
+
+    return output.stdout.decode().strip() or None
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Benchmark the campaign pipeline against a local stand-in server')
+
+    parser.add_argument(
+        '-c',
+        '--contacts',
+        help='Numbers of contacts to import (default: 1000 10000)',
+        type=int,
+        nargs='+',
+        default=[1000, 10000]
+    )
+
+    parser.add_argument(
+        '-w',
+        '--workers',
+        help='Numbers of contacts created concurrently (default: 1 8)',
+        type=int,
+        nargs='+',
+        default=[1, 8]
+    )
+
+    parser.add_argument('-b', '--bulk', help='Also benchmark the bulk import endpoint', action='store_true')
+
+    parser.add_argument(
+        '-l',
+        '--latency',
+        help='Simulated server latency distribution; see activecampaign.fakeserver (default: constant:0.005)',
+        default='constant:0.005'
+    )
+
+    parser.add_argument('-o', '--output', help='File the results are written to as JSON')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+
+    parser.add_argument(
+        '--tolerance',
+        help='Fraction by which throughput may drop below the baseline before it is reported as a regression '
+             '(default: 0.1)',
+        type=float,
+        default=0.1
+    )
+
+    parser.add_argument('--seed', help='Random seed for the simulated latency', type=int, default=0)
+
+    parser.add_argument(
+        '-r',
+        '--recordings',
+        help='Directory each case\'s requests and responses are recorded in the first time it runs; later runs replay '
+             'them at full speed instead of starting a server'
+    )
+
+    return parser.parse_args()
+
+
+def main(args):
+    cases = [(contacts, workers, False) for contacts in args.contacts for workers in args.workers]
+    if args.bulk:
+        cases += [(contacts, 1, True) for contacts in args.contacts]
+
+    results = []
+    print('{:>9} {:>4} {:>5} {:>9} {:>8} {:>8} {:>8} {:>9} {:>9} {:>6}'.format(
+        'contacts', 'wkrs', 'bulk', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'RSS MiB', 'CPU us/c', 'failed'
+    ))
+
+    if args.recordings:
+        os.makedirs(args.recordings, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as directory:
+        for contacts in sorted(set(args.contacts)):
+            generate_contacts(os.path.join(directory, '{}.csv'.format(contacts)), contacts)
+
+        for contacts, workers, bulk in cases:
+            path = os.path.join(directory, '{}.csv'.format(contacts))
+            recording = None
+            if args.recordings:
+                recording = os.path.join(args.recordings, '{}-{}{}.jsonl.gz'.format(
+                    contacts,
+                    workers,
+                    '-bulk' if bulk else ''
+                ))
+
+            if recording and os.path.exists(recording):
+                # Recorded responses are matched regardless of the server and key requests are sent to
+                result = run_isolated(REPLAY_BASE_URL, 'replay', path, contacts, workers, bulk, None, recording)
+            else:
+                # A fresh server for every case, so earlier imports do not turn into duplicates
+                with FakeActiveCampaign(latency=args.latency, seed=args.seed) as server:
+                    result = run_isolated(server.base_url, server.api_key, path, contacts, workers, bulk, recording)
+
+            results.append(result)
+            print(format_result(result))
+
+    report = {
+        'commit': current_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'latency': args.latency,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        print('\nCompared with {} ({}):'.format(args.baseline, baseline.get('commit') or 'unknown commit'))
+        for result, before, change, slower in compare(results, baseline['results'], args.tolerance):
+            print('{:>9} {:>4} {:>5} {:>+8.1%} req/s, p95 {:.1f} ms -> {:.1f} ms{}'.format(
+                result['contacts'],
+                result['workers'],
+                'yes' if result['bulk'] else 'no',
+                change,
+                before['latency_p95'] * 1000,
+                result['latency_p95'] * 1000,
+                '  REGRESSION' if slower else ''
+            ))
+            regressed = regressed or slower
+
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(get_args()))
@@ -1,30 +1,185 @@
+import json
 import os
-import yaml
+import threading
+from collections.abc import MutableMapping
 
 
-def init_config():
+CONFIG_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG_PATH = os.path.join(CONFIG_DIRECTORY, 'config.yaml')
+
+# Environment variable naming an alternative configuration file, in YAML or JSON
+CONFIG_PATH_VARIABLE = 'AC_CONFIG_FILE'
+
+
+def init_config(path=None):
     """Initializes configuration for the application, obtaining values from a config.yaml file
 
+    A JSON file is read with the standard library's parser. For a YAML file, a compiled JSON copy alongside it (see
+    `compile_config`) is read instead as long as it is at least as recent, so that YAML need not be imported or parsed.
+
+    :param path: Location of the configuration file; defaults to the file named by the `AC_CONFIG_FILE` environment
+        variable, or config.yaml in this package
+    :type path: str
+
     :return: A dictionary containing configuration directives
     :rtype: dict
     """
-    with open('config/config.yaml') as f:
-        config_data = yaml.load(f.read())
+    path = path or os.getenv(CONFIG_PATH_VARIABLE) or DEFAULT_CONFIG_PATH
 
-    return config_data
+    if not path.endswith('.json'):
+        compiled_path = _compiled_path(path)
+        if _is_current(compiled_path, path):
+            path = compiled_path
+
+    with open(path) as f:
+        if path.endswith('.json'):
+            return json.load(f)
+
+        # YAML is only needed when no compiled copy is available, so avoid importing it otherwise
+        import yaml
+        return yaml.safe_load(f)
+
+
+def compile_config(path=None):
+    """Writes a JSON copy of a YAML configuration file, which `init_config` reads in preference to the YAML file
+
+    :param path: Location of the YAML configuration file; defaults to the same file `init_config` reads
+    :type path: str
+
+    :return: Returns the location of the JSON copy
+    :rtype: str
+    """
+    path = path or os.getenv(CONFIG_PATH_VARIABLE) or DEFAULT_CONFIG_PATH
+    compiled_path = _compiled_path(path)
+
+    import yaml
+    with open(path) as f:
+        config_data = yaml.safe_load(f)
+
+    with open(compiled_path, 'w') as f:
+        json.dump(config_data, f, indent=2)
+
+    return compiled_path
 
 
 def apply_environment_updates(config_data):
     """Overrides config items with environment-specific values
 
+    Overrides are converted to the type of the value they replace, so numeric and boolean directives remain usable
+    when set through the environment.
+
     :param config_data: Dictionary containing currently configured set of config options
     :type config_data: dict
     """
     for key in config_data:
         override = os.getenv(key)
         if override:
-            config_data[key] = override
+            config_data[key] = _coerce(override, config_data[key])
+
+
+def _coerce(value, current):
+    """Converts an environment override to the type of the configured value it replaces
+
+    :param value: Raw value obtained from the environment
+    :type value: str
+    :param current: Currently configured value
+    :type current: object
+
+    :return: Returns the override, converted to the type of `current` where that type is boolean or numeric
+    :rtype: object
+    """
+    if isinstance(current, bool):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    elif isinstance(current, (int, float)):
+        return type(current)(value)
+    else:
+        return value
+
+
+def load_config():
+    """Loads configuration directives and applies environment overrides to them
+
+    :rtype: dict
+    """
+    config_data = init_config()
+    apply_environment_updates(config_data)
+    return config_data
+
+
+def _compiled_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+def _is_current(compiled_path, path):
+    """Determines whether a compiled configuration file exists and is at least as recent as its source
+
+    :rtype: bool
+    """
+    try:
+        return os.stat(compiled_path).st_mtime >= os.stat(path).st_mtime
+    except FileNotFoundError:
+        return False
+
+
+class LazyConfig(MutableMapping):
+    def __init__(self, loader):
+        """Initializes a LazyConfig, a mapping of configuration directives that are loaded on first access
+
+        Importing modules that read configuration therefore costs nothing until a directive is actually needed, and
+        the file is read once, however many modules use it.
+
+        :param loader: Function returning the dictionary of configuration directives
+        :type loader: callable
+        """
+        self._loader = loader
+        self._data = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        """Returns whether the directives have been loaded
+
+        :rtype: bool
+        """
+        return self._data is not None
+
+    def reload(self):
+        """Discards the loaded directives, so that they are loaded again on next access"""
+        with self._lock:
+            self._data = None
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+
+    def __delitem__(self, key):
+        del self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, repr(self._data) if self.loaded else 'not loaded')
+
+    def _load(self):
+        """Returns the directives, loading them if this is the first access
+
+        :rtype: dict
+        """
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._loader()
+
+                data = self._data
+
+        return data
 
 
-config = init_config()
-apply_environment_updates(config)
+config = LazyConfig(load_config)
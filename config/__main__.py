@@ -0,0 +1,5 @@
+from config import compile_config
+
+
+if __name__ == '__main__':
+    print('Compiled configuration written to {}'.format(compile_config()))
@@ -1,7 +1,9 @@
 import argparse
-import csv
+import os
+import sys
+from collections import Counter
 
-from activecampaign.api import ActiveCampaignAPI
+from config import config
 
 
 def get_args():
@@ -89,50 +91,227 @@ def get_args():
         '-c',
         '--contacts',
         help='CSV file containing (email, first_name, last_name) for contacts who will receive the campaign',
-        type=argparse.FileType('r'),
+        type=argparse.FileType('rb'),
         required=True,
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        '-w',
+        '--workers',
+        help='Number of contacts to create concurrently (default: 1)',
+        type=int,
+        default=1
+    )
 
+    parser.add_argument(
+        '-b',
+        '--bulk',
+        help='Submit contacts through the bulk import endpoint, packing many contacts into each request',
+        action='store_true'
+    )
 
-if __name__ == '__main__':
-    api = ActiveCampaignAPI()
+    parser.add_argument(
+        '-p',
+        '--processes',
+        help='Split the CSV file into byte ranges imported by this many worker processes, each creating --workers '
+             'contacts concurrently and all sharing one rate limit',
+        type=int
+    )
 
-    args = get_args()
+    parser.add_argument(
+        '-cp',
+        '--checkpoint',
+        help='File recording the progress of the contact import, so that an interrupted import can be resumed'
+    )
+
+    parser.add_argument(
+        '-r',
+        '--resume',
+        help='Resume the interrupted import recorded in the --checkpoint file, skipping rows already processed',
+        action='store_true'
+    )
 
-    sender = {
-        'name': args.sender,
-        'email': args.sender_email,
-        'address': args.sender_address,
-        'city': args.sender_city,
-        'state': args.sender_state,
-        'zip': args.sender_zip,
-        'country': args.sender_country
-    }
+    parser.add_argument(
+        '-rj',
+        '--rejects',
+        help='CSV file that rows with invalid or duplicate email addresses are written to, instead of being reported'
+    )
 
-    # Create mailing list
-    mailing_list_id = api.create_mailing_list(
-        '{} - Mailing List'.format(args.campaign),
-        sender
+    parser.add_argument(
+        '-sy',
+        '--sync',
+        help='Membership index file recording the mailing list\'s contacts; only contacts added to, changed in or '
+             'removed from the CSV file since the previous sync are sent. Requires --object-cache'
     )
 
-    # Associate mailing list with a physical address
-    api.create_address(sender, [mailing_list_id])
+    parser.add_argument(
+        '-oc',
+        '--object-cache',
+        help='File recording the mailing lists, addresses and messages created by earlier runs, so that identical ones '
+             'are reused rather than created again'
+    )
+
+    parser.add_argument(
+        '-rs',
+        '--results',
+        help='File the outcome of every contact is written to as it is imported: CSV if it ends in .csv, JSON lines '
+             'if it ends in .jsonl, or SQLite if it ends in .db'
+    )
+
+    parser.add_argument(
+        '-m',
+        '--metrics',
+        help='File per-action request metrics are written to; Prometheus text format if it ends in .prom, else JSON'
+    )
+
+    args = parser.parse_args()
+
+    from activecampaign.results import SINK_FORMATS
+
+    if args.resume and not args.checkpoint:
+        parser.error('--resume requires --checkpoint')
+    elif args.resume and not os.path.exists(args.checkpoint):
+        parser.error('checkpoint {} does not exist; nothing to resume'.format(args.checkpoint))
+    elif args.checkpoint and not args.resume and os.path.exists(args.checkpoint):
+        parser.error('checkpoint {} already exists; pass --resume to continue that import'.format(args.checkpoint))
+    elif args.sync and (args.bulk or args.checkpoint):
+        parser.error('--sync cannot be combined with --bulk or --checkpoint')
+    elif args.workers < 1:
+        parser.error('--workers must be at least 1')
+    elif args.processes is not None and args.processes < 1:
+        parser.error('--processes must be at least 1')
+    elif args.processes and (args.checkpoint or args.sync or args.metrics or args.results):
+        parser.error('--processes cannot be combined with --checkpoint, --sync, --metrics or --results')
+    elif args.results and os.path.splitext(args.results)[1].lower() not in SINK_FORMATS:
+        parser.error('--results must end in .csv, .jsonl or .db')
+    elif args.sync and args.results:
+        parser.error('--sync cannot be combined with --results')
+    elif args.sync and not args.object_cache:
+        parser.error('--sync requires --object-cache, so that every run syncs the same mailing list')
+
+    return args
+
+
+def main(api, args):
+    # Imported here rather than at the top of the module so that parsing arguments, and reporting any errors in them,
+    # does not wait for the HTTP client libraries to load
+    from activecampaign.checkpoint import ImportCheckpoint
+    from activecampaign.dedup import EmailIndex
+    from activecampaign.importer import BulkContactImporter, ContactImporter, ContactSynchronizer
+    from activecampaign.membership import MembershipIndex
+    from activecampaign.models import Sender
+    from activecampaign.pipeline import RejectWriter, prepare_contacts, trim_rejects
+    from activecampaign.reader import read_contacts
+    from activecampaign.results import create_result_sink, trim_results
+
+    sender = Sender(
+        name=args.sender,
+        email=args.sender_email,
+        address=args.sender_address,
+        city=args.sender_city,
+        state=args.sender_state,
+        zip=args.sender_zip,
+        country=args.sender_country
+    )
 
-    # Add contacts to mailing list
-    reader = csv.DictReader(args.contacts)
-    for row in reader:
-        api.create_contact(row['email'], [mailing_list_id], first_name=row['first_name'], last_name=row['last_name'])
+    checkpoint = ImportCheckpoint(args.checkpoint) if args.checkpoint else None
+    state = checkpoint.load() if args.resume else None
+    if state and args.rejects:
+        trim_rejects(args.rejects, state.next_row)
+    if state and args.results:
+        trim_results(args.results, state.next_row)
+    rejects = open(args.rejects, 'a' if args.resume else 'w', newline='') if args.rejects else None
+    reject = RejectWriter(rejects) if rejects else report_rejected
+    seen = EmailIndex()
+    index = MembershipIndex(args.sync) if args.sync else None
+    results = create_result_sink(args.results, append=args.resume) if args.results else None
+    changes = Counter()
+
+    if args.resume:
+        # Contacts imported before the interruption were added to that run's mailing list, so keep adding to it
+        mailing_list_id = state.metadata['mailing_list_id']
+        rows = read_contacts(args.contacts, offset=state.offset, start=state.next_row)
+        # Only contacts that were created count as seen, so that a later row repeating a failed one is still imported
+        for email, _ in checkpoint.created_contacts():
+            seen.add(email)
+        failures = state.failed
+    else:
+        rows = read_contacts(args.contacts)
+
+        # Create mailing list
+        mailing_list_id = api.create_mailing_list(
+            '{} - Mailing List'.format(args.campaign),
+            sender
+        )
+
+        # Associate mailing list with a physical address
+        api.create_address(sender, [mailing_list_id])
+
+        if checkpoint:
+            checkpoint.start(mailing_list_id=mailing_list_id)
+
+        failures = 0
+
+    # Add contacts to mailing list, skipping rows that would be rejected by the API or that repeat an earlier contact.
+    # A resumed import repeats the rows processed after the interrupted run's last checkpoint, so contacts those rows
+    # already created are recognized as such rather than reported as duplicates
+    if index:
+        importer = ContactSynchronizer(api, index, mailing_list_id, workers=args.workers)
+    elif args.bulk:
+        importer = BulkContactImporter(api, [mailing_list_id], recover_duplicates=args.resume)
+    else:
+        importer = ContactImporter(api, [mailing_list_id], workers=args.workers, recover_duplicates=args.resume)
+
+    try:
+        if args.processes:
+            sharded_failures, duplicates = import_sharded(api, args, mailing_list_id, reject)
+            failures += sharded_failures
+        else:
+            for result in importer.run(prepare_contacts(rows, reject, seen)):
+                if checkpoint:
+                    checkpoint.record(result)
+                if results:
+                    results.write(result)
+
+                if result.error and index:
+                    failures += 1
+                    print(
+                        'Could not {} contact {}: {}'.format(result.action, result.email, result.error),
+                        file=sys.stderr
+                    )
+                elif result.error and results:
+                    failures += 1
+                elif result.error:
+                    failures += 1
+                    print(
+                        'Row {} ({}) could not be imported: {}'.format(result.row, result.email, result.error),
+                        file=sys.stderr
+                    )
+                elif index:
+                    changes[result.action] += 1
+
+            duplicates = seen.duplicates
+    finally:
+        seen.close()
+        if index:
+            index.close()
+        if checkpoint:
+            checkpoint.close()
+        if results:
+            results.close()
+        if rejects:
+            rejects.close()
+            if reject.count:
+                print('{} row(s) rejected; see {}'.format(reject.count, args.rejects), file=sys.stderr)
 
     # Create an HTML message to send as part of the campaign
     message_id = api.create_html_message(
         [mailing_list_id],
         args.subject,
         args.html.read(),
-        sender['email'],
-        sender['name'],
-        sender['email']
+        sender.email,
+        sender.name,
+        sender.email
     )
 
     # Create and schedule the campaign
@@ -143,3 +322,100 @@ if __name__ == '__main__':
             args.campaign_date
         )
     )
+    if index:
+        print('Synced mailing list: {} contact(s) added, {} updated, {} removed'.format(
+            changes['add'],
+            changes['update'],
+            changes['remove']
+        ))
+    if duplicates:
+        print('{} duplicate contact(s) removed before import'.format(duplicates), file=sys.stderr)
+    if failures:
+        print('{} contact(s) could not be imported'.format(failures), file=sys.stderr)
+    if results:
+        report_results(results.summary, args.results)
+
+    stats = api.retry_policy.stats
+    if stats.wasted:
+        print('{} request(s) retried, {} round-trip(s) wasted'.format(stats.retries, stats.wasted), file=sys.stderr)
+
+
+def import_sharded(api, args, mailing_list_id, reject):
+    """Imports the CSV file's contacts through worker processes, each importing a share of the file
+
+    :param api: Client whose retry counters the worker processes' requests are added to
+    :type api: activecampaign.api.ActiveCampaignAPI
+    :param args: Parsed command line arguments
+    :type args: argparse.Namespace
+    :param mailing_list_id: Id of the mailing list contacts are added to
+    :type mailing_list_id: int
+    :param reject: Function called with each rejected row and the reason it was rejected
+    :type reject: callable
+
+    :return: Returns the number of contacts that could not be imported, and the number of duplicate rows removed
+    :rtype: tuple[int, int]
+    """
+    from activecampaign.sharding import ShardedImporter
+
+    importer = ShardedImporter(args.contacts.name, [mailing_list_id], args.processes, args.workers, args.bulk)
+    report = importer.run(reject)
+    # Requests made by the worker processes are reported along with those made by this one
+    api.retry_policy.stats.add(report.retries)
+
+    for number, email, error in report.failures:
+        print('Row {} ({}) could not be imported: {}'.format(number, email, error), file=sys.stderr)
+
+    return len(report.failures), report.duplicates
+
+
+def report_results(summary, path):
+    """Reports the totals of the results written to the --results file
+
+    :param summary: Totals of the results
+    :type summary: activecampaign.results.ResultSummary
+    :param path: Location of the results file
+    :type path: str
+    """
+    errors = ', '.join('{} {}'.format(count, name) for name, count in summary.errors.most_common())
+    print('{} contact(s) imported, {} failed{}; see {}'.format(
+        summary.created,
+        summary.failed,
+        ' ({})'.format(errors) if errors else '',
+        path
+    ))
+
+
+def report_rejected(row, reason):
+    """Reports a row rejected before submission when no --rejects file was given
+
+    :param row: Rejected contact
+    :type row: activecampaign.reader.ContactRow
+    :param reason: Description of why the row was rejected
+    :type reason: str
+    """
+    print('Row {} ({}) was skipped: {}'.format(row.number, row.email, reason), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    args = get_args()
+
+    # Keep a pooled connection available for every worker
+    config['POOL_MAXSIZE'] = max(config['POOL_MAXSIZE'], args.workers)
+
+    from activecampaign.api import ActiveCampaignAPI
+    from activecampaign.cache import ObjectCache
+    from activecampaign.instrumentation import Instrumentation, MetricsCollector
+
+    collector = MetricsCollector() if args.metrics else None
+    instrumentation = Instrumentation(after_hooks=[collector]) if collector else None
+    cache = ObjectCache(args.object_cache) if args.object_cache else None
+
+    try:
+        with ActiveCampaignAPI(instrumentation=instrumentation, cache=cache) as api:
+            main(api, args)
+    finally:
+        if cache:
+            cache.close()
+        if collector:
+            with open(args.metrics, 'w') as f:
+                f.write(collector.to_prometheus() if args.metrics.endswith('.prom') else collector.to_json())
@@ -1,9 +1,23 @@
+import gzip
+import json
+from urllib.parse import urlencode
+
+import requests
 import responses
 from unittest import TestCase
-from unittest.mock import patch
-
-from activecampaign.api import ActiveCampaignAPI
-from activecampaign.exc import ActiveCampaignResponseError
+from unittest.mock import MagicMock, patch
+
+from activecampaign.api import ActiveCampaignAPI, BulkContactResult
+from activecampaign.exc import (
+    ActiveCampaignDuplicateError,
+    ActiveCampaignRateLimitError,
+    ActiveCampaignResponseError,
+    ActiveCampaignServerError
+)
+from activecampaign.messages import MessagePreparer
+from activecampaign.models import Campaign, Contact, MailingList, Message, Sender
+from activecampaign.reader import ContactRow
+from activecampaign.retry import RetryPolicy
 
 from config import config
 
@@ -12,6 +26,8 @@ class ActiveCampaignAPITestCase(TestCase):
     def setUp(self):
         config['AC_API_KEY'] = 'mysupersecretkey'
         config['AC_BASE_URL'] = 'https://myaccount.api-us1.com'
+        config['RATE_LIMIT'] = 0
+        config['RETRY_MAX_ATTEMPTS'] = 1
 
         self.api = ActiveCampaignAPI()
 
@@ -31,6 +47,50 @@ class ActiveCampaignAPIInitTestCase(ActiveCampaignAPITestCase):
         self.assertEqual(self.api.request_url, 'https://myaccount.api-us1.com/admin/api.php')
         self.assertEqual(self.api.api_key, 'mysupersecretkey')
         self.assertEqual(self.api.api_output, 'json')
+        self.assertEqual(self.api.timeout, (config['CONNECT_TIMEOUT'], config['READ_TIMEOUT']))
+
+
+class ActiveCampaignAPISessionTestCase(ActiveCampaignAPITestCase):
+    def test_pooled_adapter_mounted(self):
+        adapter = self.api.session.get_adapter(self.api.request_url)
+        self.assertEqual(adapter._pool_connections, config['POOL_CONNECTIONS'])
+        self.assertEqual(adapter._pool_maxsize, config['POOL_MAXSIZE'])
+        self.assertEqual(adapter._pool_block, config['POOL_BLOCK'])
+
+    def test_transport_mounted(self):
+        transport = MagicMock()
+        with ActiveCampaignAPI(transport=transport) as api:
+            self.assertIs(api.session.get_adapter(api.request_url), transport)
+            self.assertIs(api.session.get_adapter('http://127.0.0.1'), transport)
+
+        transport.close.assert_called_with()
+
+    def test_keep_alive_header(self):
+        self.assertEqual(self.api.session.headers['Connection'], 'keep-alive')
+
+    def test_session_reused_between_requests(self):
+        with patch.object(self.api.session, 'post') as mock_post:
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.content = b'{"id": 1, "result_code": 1, "result_message": "testing"}'
+            self.api._make_post_request('some_action', {})
+            self.api._make_post_request('some_action', {})
+
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_context_manager_closes_session(self):
+        api = ActiveCampaignAPI()
+        with patch.object(api.session, 'close') as mock_close:
+            with api:
+                pass
+
+        mock_close.assert_called_once_with()
+
+    def test_provided_session_left_open(self):
+        session = MagicMock()
+        with ActiveCampaignAPI(session=session) as api:
+            self.assertIs(api.session, session)
+
+        session.close.assert_not_called()
 
 
 class ActiveCampaignAPIParamsTestCase(ActiveCampaignAPITestCase):
@@ -64,6 +124,13 @@ class ActiveCampaignAPICreateMailingListTestCase(ActiveCampaignAPIMockedRequestT
     def test_returns_id(self):
         self.assertEqual(self.api.create_mailing_list('test list', self.sender), 1)
 
+    def test_accepts_model(self):
+        sender = Sender(email=None, state=None, **self.sender)
+        self.api.create_mailing_list(MailingList('test list', sender))
+        self.api.create_mailing_list('test list', self.sender)
+
+        self.assertEqual(self.mock_make_post_request.call_args_list[0], self.mock_make_post_request.call_args_list[1])
+
 
 class ActiveCampaignAPICreateAddressTestCase(ActiveCampaignAPIMockedRequestTestCase):
     def setUp(self):
@@ -93,15 +160,42 @@ class ActiveCampaignAPICreateAddressTestCase(ActiveCampaignAPIMockedRequestTestC
     def test_returns_id(self):
         self.assertEqual(self.api.create_address(self.sender, [1]), 1)
 
+    def test_accepts_model(self):
+        self.api.create_address(Sender(email=None, **self.sender), [1])
+        self.api.create_address(self.sender, [1])
+
+        self.assertEqual(self.mock_make_post_request.call_args_list[0], self.mock_make_post_request.call_args_list[1])
+
+
+class ActiveCampaignAPITemplatedRequestTestCase(ActiveCampaignAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.mock_make_templated_request = patch.object(
+            self.api,
+            '_make_templated_request',
+            return_value={'id': 1}
+        ).start()
+
+    def doCleanups(self):
+        self.mock_make_templated_request.stop()
+
+    def assert_request(self, action, expected_post_body, call=0):
+        template, fields = self.mock_make_templated_request.call_args_list[call][0]
+        expected_params = {'api_action': action, 'api_key': 'mysupersecretkey', 'api_output': 'json'}
+
+        self.assertEqual(template.action, action)
+        self.assertEqual(template.url, '{}?{}'.format(self.api.request_url, urlencode(expected_params)))
+        self.assertEqual(template.encode(fields), urlencode(expected_post_body).encode('ascii'))
 
-class ActiveCampaignAPICreateContactTestCase(ActiveCampaignAPIMockedRequestTestCase):
+
+class ActiveCampaignAPICreateContactTestCase(ActiveCampaignAPITemplatedRequestTestCase):
     def test_expected_call_args(self):
         self.api.create_contact('person@example.com', [1])
         expected_post_body = {
             'email': 'person@example.com',
             'p[1]': 1
         }
-        self.mock_make_post_request.assert_called_once_with('contact_add', expected_post_body)
+        self.assert_request('contact_add', expected_post_body)
 
     def test_optional_arguments_included(self):
         self.api.create_contact('person@example.com', [1], 'Person', 'Test')
@@ -111,11 +205,194 @@ class ActiveCampaignAPICreateContactTestCase(ActiveCampaignAPIMockedRequestTestC
             'last_name': 'Test',
             'p[1]': 1,
         }
-        self.mock_make_post_request.assert_called_once_with('contact_add', expected_post_body)
+        self.assert_request('contact_add', expected_post_body)
 
     def test_returns_id(self):
         self.assertEqual(self.api.create_contact('person@example.com', [1]), 1)
 
+    def test_accepts_model(self):
+        self.api.create_contact(Contact('person@example.com', 'Person', 'Test'), [1])
+        self.api.create_contact('person@example.com', [1], 'Person', 'Test')
+
+        self.assertEqual(
+            self.mock_make_templated_request.call_args_list[0][0],
+            self.mock_make_templated_request.call_args_list[1][0]
+        )
+
+    def test_accepts_row(self):
+        self.api.create_contact(ContactRow(2, 40, 'person@example.com', 'Person', ''), [1])
+        self.assert_request('contact_add', {'email': 'person@example.com', 'first_name': 'Person', 'p[1]': 1})
+
+    def test_template_reused_for_same_lists(self):
+        self.api.create_contact('first@example.com', [1, 2])
+        self.api.create_contact('second@example.com', [1, 2])
+        self.api.create_contact('third@example.com', [3])
+
+        templates = [call[0][0] for call in self.mock_make_templated_request.call_args_list]
+        self.assertIs(templates[0], templates[1])
+        self.assertIsNot(templates[0], templates[2])
+        self.assert_request('contact_add', {'email': 'third@example.com', 'p[3]': 3}, call=2)
+
+
+class ActiveCampaignAPISyncContactTestCase(ActiveCampaignAPITemplatedRequestTestCase):
+    def test_expected_call_args(self):
+        self.api.sync_contact('person@example.com', [1, 2], 'Person')
+        expected_post_body = {
+            'email': 'person@example.com',
+            'first_name': 'Person',
+            'p[1]': 1,
+            'p[2]': 2,
+            'status[1]': 1,
+            'status[2]': 1,
+        }
+        self.assert_request('contact_sync', expected_post_body)
+
+    def test_returns_subscriber_id(self):
+        self.mock_make_templated_request.return_value = {'subscriber_id': 7}
+        self.assertEqual(self.api.sync_contact('person@example.com', [1]), 7)
+
+
+class ActiveCampaignAPIMakeTemplatedRequestTestCase(ActiveCampaignAPITestCase):
+    @responses.activate
+    def test_request_structure(self):
+        responses.add(responses.POST, self.api.request_url, json={'id': 4, 'result_code': 1}, status=200)
+
+        self.assertEqual(self.api.create_contact('person@example.com', [1], 'Person'), 4)
+
+        request = responses.calls[0].request
+        self.assertEqual(
+            request.url,
+            self.api.request_url + '?api_action=contact_add&api_key=mysupersecretkey&api_output=json'
+        )
+        self.assertEqual(request.headers['Content-Type'], 'application/x-www-form-urlencoded')
+        self.assertEqual(request.body, b'email=person%40example.com&first_name=Person&p%5B1%5D=1')
+
+    @responses.activate
+    def test_raises_duplicate_error(self):
+        expected_response = {'result_code': 0, 'result_message': 'Contact Email Address is already in the system.'}
+        responses.add(responses.POST, self.api.request_url, json=expected_response, status=200)
+
+        with self.assertRaises(ActiveCampaignDuplicateError):
+            self.api.create_contact('person@example.com', [1])
+
+
+class ActiveCampaignAPIUnsubscribeContactTestCase(ActiveCampaignAPIMockedRequestTestCase):
+    def test_expected_call_args(self):
+        self.api.unsubscribe_contact(7, 'person@example.com', [1])
+        expected_post_body = {
+            'id': 7,
+            'email': 'person@example.com',
+            'overwrite': 0,
+            'p[1]': 1,
+            'status[1]': 2,
+        }
+        self.mock_make_post_request.assert_called_once_with('contact_edit', expected_post_body)
+
+
+class ActiveCampaignAPICreateContactsBulkTestCase(ActiveCampaignAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.bulk_url = self.api.base_url + '/api/3/import/bulk_import'
+        self.contacts = [
+            ContactRow(1, 10, 'a@example.com', 'A', 'Person'),
+            ContactRow(2, 20, 'b@example.com', None, None),
+            ContactRow(3, 30, 'c@example.com', 'C', None),
+        ]
+
+    @responses.activate
+    def test_request_structure(self):
+        responses.add(responses.POST, self.bulk_url, json={'success': 1, 'queued_contacts': 3, 'batchId': 'abc'})
+
+        self.api.create_contacts_bulk(self.contacts[:2], [1, 2])
+
+        request = responses.calls[0].request
+        self.assertEqual(request.headers['Api-Token'], 'mysupersecretkey')
+        self.assertEqual(request.headers['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(request.body), {'contacts': [
+            {'email': 'a@example.com', 'first_name': 'A', 'last_name': 'Person',
+             'subscribe': [{'listid': 1}, {'listid': 2}]},
+            {'email': 'b@example.com', 'subscribe': [{'listid': 1}, {'listid': 2}]},
+        ]})
+
+    @responses.activate
+    def test_queued_results(self):
+        responses.add(responses.POST, self.bulk_url, json={'success': 1, 'queued_contacts': 3, 'batchId': 'abc'})
+
+        self.assertEqual(self.api.create_contacts_bulk(self.contacts, [1]), [
+            BulkContactResult(contact, None, 'abc', None) for contact in self.contacts
+        ])
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_split_by_contact_count(self):
+        responses.add(responses.POST, self.bulk_url, json={'success': 1, 'batchId': 'abc'})
+
+        with patch('activecampaign.api.BULK_IMPORT_MAX_CONTACTS', 2):
+            results = self.api.create_contacts_bulk(self.contacts, [1])
+
+        self.assertEqual([len(json.loads(call.request.body)['contacts']) for call in responses.calls], [2, 1])
+        self.assertEqual([result.contact for result in results], self.contacts)
+
+    @responses.activate
+    def test_split_by_payload_size(self):
+        responses.add(responses.POST, self.bulk_url, json={'success': 1, 'batchId': 'abc'})
+
+        with patch('activecampaign.api.BULK_IMPORT_MAX_BYTES', 160):
+            self.api.create_contacts_bulk(self.contacts, [1])
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertTrue(all(len(call.request.body) <= 160 for call in responses.calls))
+
+    @responses.activate
+    def test_rejected_chunk_created_individually(self):
+        responses.add(
+            responses.POST,
+            self.bulk_url,
+            json={'success': 0, 'failureReasons': ['invalid email']},
+            status=400
+        )
+        responses.add(responses.POST, self.api.request_url, json={'id': 7, 'result_code': 1, 'result_message': ''})
+        responses.add(responses.POST, self.api.request_url, json={'result_code': 0, 'result_message': 'invalid'})
+        responses.add(responses.POST, self.api.request_url, json={'id': 9, 'result_code': 1, 'result_message': ''})
+
+        results = self.api.create_contacts_bulk(self.contacts, [1])
+
+        self.assertEqual([(result.contact, result.contact_id) for result in results], [
+            (self.contacts[0], 7),
+            (self.contacts[1], None),
+            (self.contacts[2], 9),
+        ])
+        self.assertIsInstance(results[1].error, ActiveCampaignResponseError)
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    def test_chunk_with_unreadable_error_created_individually(self):
+        responses.add(
+            responses.POST,
+            self.bulk_url,
+            body='<html><body>400 Bad Request</body></html>',
+            status=400,
+            content_type='text/html'
+        )
+        responses.add(responses.POST, self.api.request_url, json={'id': 7, 'result_code': 1, 'result_message': ''})
+
+        results = self.api.create_contacts_bulk(self.contacts[:1], [1])
+
+        self.assertEqual(results, [BulkContactResult(self.contacts[0], 7, None, None)])
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_unreachable_chunk_failed(self):
+        responses.add(responses.POST, self.bulk_url, body='Bad Gateway', status=502)
+
+        results = self.api.create_contacts_bulk(self.contacts, [1])
+
+        self.assertTrue(all(isinstance(result.error, ActiveCampaignServerError) for result in results))
+        self.assertEqual(len(responses.calls), 1)
+
+    def test_no_contacts(self):
+        self.assertEqual(self.api.create_contacts_bulk([], [1]), [])
+
 
 class ActiveCampaignAPICreateHTMLMessageTestCase(ActiveCampaignAPIMockedRequestTestCase):
     def test_expected_call_args(self):
@@ -182,6 +459,23 @@ class ActiveCampaignAPICreateHTMLMessageTestCase(ActiveCampaignAPIMockedRequestT
         )
         self.assertEqual(rval, 1)
 
+    def test_content_unchanged_by_default(self):
+        html = '<html>\n  <body>  test</body>\n</html>\n'
+        self.api.create_html_message([1], 'test', html, 'a@example.com')
+        self.assertEqual(self.mock_make_post_request.call_args[0][1]['html'], html)
+
+    def test_content_minified(self):
+        self.api.message_preparer = MessagePreparer(minify=True)
+        self.api.create_html_message([1], 'test', '<html>\n  <body>  test</body>\n</html>\n', 'a@example.com')
+        self.assertEqual(self.mock_make_post_request.call_args[0][1]['html'], '<html>\n<body> test</body>\n</html>')
+
+    def test_accepts_model(self):
+        message = Message([1], 'test', '<p>test</p>', 'test@example.com', 'Test Person', 'test@example.com')
+        self.api.create_html_message(message)
+        self.api.create_html_message([1], 'test', '<p>test</p>', 'test@example.com', 'Test Person', 'test@example.com')
+
+        self.assertEqual(self.mock_make_post_request.call_args_list[0], self.mock_make_post_request.call_args_list[1])
+
 
 class ActiveCampaignAPICreateSingleCampaignTestCase(ActiveCampaignAPIMockedRequestTestCase):
     def test_expected_call_args(self):
@@ -203,6 +497,12 @@ class ActiveCampaignAPICreateSingleCampaignTestCase(ActiveCampaignAPIMockedReque
     def test_returns_id(self):
         self.assertEqual(self.api.create_single_campaign('Test Campaign', '2018-09-09 13:00:00', [1], 1), 1)
 
+    def test_accepts_model(self):
+        self.api.create_single_campaign(Campaign('Test Campaign', '2018-09-09 13:00:00', [1], 1))
+        self.api.create_single_campaign('Test Campaign', '2018-09-09 13:00:00', [1], 1)
+
+        self.assertEqual(self.mock_make_post_request.call_args_list[0], self.mock_make_post_request.call_args_list[1])
+
 
 class ActiveCampaignAPIMakePostRequestTestCase(ActiveCampaignAPITestCase):
     @responses.activate
@@ -222,10 +522,17 @@ class ActiveCampaignAPIMakePostRequestTestCase(ActiveCampaignAPITestCase):
             status=200
         )
 
-        with patch('requests.post') as mock_post:
+        with patch.object(self.api.session, 'post') as mock_post:
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.content = b'{"result_code": 1}'
             self.api._make_post_request('some_action', expected_body)
 
-        mock_post.assert_called_once_with(self.api.request_url, params=expected_params, data=expected_body)
+        mock_post.assert_called_once_with(
+            self.api.request_url,
+            params=expected_params,
+            data=expected_body,
+            timeout=self.api.timeout
+        )
 
     @responses.activate
     def test_raises_error_if_response_code_falsey(self):
@@ -241,6 +548,25 @@ class ActiveCampaignAPIMakePostRequestTestCase(ActiveCampaignAPITestCase):
         with self.assertRaisesRegex(ActiveCampaignResponseError, 'error'):
             self.api._make_post_request('some_action', {'key1': 'value1'})
 
+    @responses.activate
+    def test_raises_duplicate_error(self):
+        expected_response = {'result_code': 0, 'result_message': 'Contact Email Address is already in the system.'}
+        responses.add(responses.POST, self.api.request_url, json=expected_response, status=200)
+
+        with self.assertRaises(ActiveCampaignDuplicateError) as context:
+            self.api._make_post_request('contact_add', {'email': 'person@example.com'})
+
+        self.assertDictEqual(context.exception.response_body, expected_response)
+
+    @responses.activate
+    def test_raises_server_error(self):
+        responses.add(responses.POST, self.api.request_url, body='Internal Server Error', status=500)
+
+        with self.assertRaises(ActiveCampaignServerError) as context:
+            self.api._make_post_request('some_action', {'key1': 'value1'})
+
+        self.assertEqual(context.exception.status_code, 500)
+
     @responses.activate
     def test_returns_response(self):
         expected_response = {'id': 1, 'result_code': 1, 'result_message': 'testing'}
@@ -256,6 +582,172 @@ class ActiveCampaignAPIMakePostRequestTestCase(ActiveCampaignAPITestCase):
         self.assertDictEqual(response, expected_response)
 
 
+class ActiveCampaignAPICompressionTestCase(ActiveCampaignAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.api.compression_threshold = 100
+        self.body = {'subject': 'test', 'html': '<p>{}</p>'.format('test ' * 100)}
+
+    def test_disabled(self):
+        self.api.compression_threshold = 0
+        self.assertEqual(self.api._form_payload(self.body), {'data': self.body})
+
+    def test_small_body_encoded(self):
+        payload = self.api._form_payload({'subject': 'test'})
+
+        self.assertEqual(payload['data'], b'subject=test')
+        self.assertNotIn('Content-Encoding', payload['headers'])
+
+    def test_large_body_compressed(self):
+        payload = self.api._form_payload(self.body)
+
+        self.assertEqual(payload['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(payload['data']), urlencode(self.body).encode('ascii'))
+        self.assertLess(len(payload['data']), len(urlencode(self.body)))
+
+    @responses.activate
+    def test_compressed_request(self):
+        responses.add(responses.POST, self.api.request_url, json={'id': 1, 'result_code': 1, 'result_message': ''})
+
+        self.api._make_post_request('message_add', self.body)
+
+        request = responses.calls[0].request
+        self.assertEqual(request.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(request.body), urlencode(self.body).encode('ascii'))
+
+    @responses.activate
+    def test_sent_uncompressed_once_refused(self):
+        responses.add(responses.POST, self.api.request_url, body='Unsupported Media Type', status=415)
+        responses.add(responses.POST, self.api.request_url, json={'id': 1, 'result_code': 1, 'result_message': ''})
+        responses.add(responses.POST, self.api.request_url, json={'id': 2, 'result_code': 1, 'result_message': ''})
+
+        self.assertEqual(self.api._make_post_request('message_add', self.body)['id'], 1)
+        self.assertEqual(self.api._make_post_request('message_add', self.body)['id'], 2)
+
+        self.assertFalse(self.api.compression_accepted)
+        self.assertEqual(
+            [call.request.headers.get('Content-Encoding') for call in responses.calls],
+            ['gzip', None, None]
+        )
+
+
+class ActiveCampaignAPIRetryTestCase(ActiveCampaignAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.api.retry_policy = RetryPolicy(
+            max_attempts=3,
+            base_delay=0,
+            connect_errors=ActiveCampaignAPI.CONNECT_ERRORS,
+            transport_errors=ActiveCampaignAPI.TRANSPORT_ERRORS
+        )
+
+    @responses.activate
+    def test_transient_server_error_retried(self):
+        responses.add(responses.POST, self.api.request_url, body='Service Unavailable', status=503)
+        responses.add(responses.POST, self.api.request_url, json={'id': 1, 'result_code': 1, 'result_message': ''})
+
+        self.assertEqual(self.api.create_mailing_list('test list', self.sender), 1)
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(self.api.retry_policy.stats.wasted, 1)
+
+    @responses.activate
+    def test_connection_reset_not_retried_for_unsafe_action(self):
+        responses.add(responses.POST, self.api.request_url, body=requests.ConnectionError('reset'))
+
+        with self.assertRaises(requests.ConnectionError):
+            self.api.create_mailing_list('test list', self.sender)
+
+        self.assertEqual(len(responses.calls), 1)
+
+    def add_duplicate_responses(self, first_error, contact):
+        responses.add(responses.POST, self.api.request_url, body=first_error)
+        responses.add(
+            responses.POST,
+            self.api.request_url,
+            json={'result_code': 0, 'result_message': 'Contact Email Address is already in the system.'}
+        )
+        responses.add(responses.GET, self.api.request_url, json=dict(
+            contact,
+            result_code=1,
+            result_message='Success: Something is returned'
+        ))
+
+    @responses.activate
+    def test_contact_created_by_dropped_request_recovered(self):
+        self.add_duplicate_responses(
+            requests.ConnectionError('reset'),
+            {'id': 7, 'email': 'person@example.com', 'first_name': 'Person', 'last_name': '', 'lists': {'1': {}}}
+        )
+
+        self.assertEqual(self.api.create_contact('person@example.com', [1], 'Person'), 7)
+        self.assertEqual(self.api.retry_policy.stats.recovered, 1)
+        self.assertIn('api_action=contact_view_email', responses.calls[2].request.url)
+        self.assertIn('email=person%40example.com', responses.calls[2].request.url)
+
+    @responses.activate
+    def test_different_existing_contact_not_recovered(self):
+        self.add_duplicate_responses(
+            requests.ConnectionError('reset'),
+            {'id': 7, 'email': 'person@example.com', 'first_name': 'Someone', 'last_name': '', 'lists': {'1': {}}}
+        )
+
+        with self.assertRaises(ActiveCampaignDuplicateError):
+            self.api.create_contact('person@example.com', [1], 'Person')
+
+        self.assertEqual(self.api.retry_policy.stats.recovered, 0)
+
+    @responses.activate
+    def test_duplicate_after_known_failure_not_recovered(self):
+        self.add_duplicate_responses(
+            requests.ConnectTimeout('timed out'),
+            {'id': 7, 'email': 'person@example.com', 'lists': {'1': {}}}
+        )
+
+        with self.assertRaises(ActiveCampaignDuplicateError):
+            self.api.create_contact('person@example.com', [1])
+
+        # The contact is not looked up, since the request that failed to connect cannot have created it
+        self.assertEqual(len(responses.calls), 2)
+
+    @property
+    def sender(self):
+        return {'name': 'test person', 'address': '123 S Fake St', 'city': 'Chicago', 'zip': '60606', 'country': 'us'}
+
+
+class ActiveCampaignAPIRateLimitTestCase(ActiveCampaignAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.rate_limiter = MagicMock()
+        self.api = ActiveCampaignAPI(rate_limiter=self.rate_limiter)
+
+    def test_rate_limiter_created_from_config(self):
+        config['RATE_LIMIT'] = 2.5
+        self.assertEqual(ActiveCampaignAPI().rate_limiter.rate, 2.5)
+
+    def test_rate_limiter_disabled(self):
+        self.assertIsNone(ActiveCampaignAPI().rate_limiter)
+
+    @responses.activate
+    def test_token_acquired_and_outcome_recorded(self):
+        responses.add(responses.POST, self.api.request_url, json={'result_code': 1, 'result_message': ''}, status=200)
+
+        self.api._make_post_request('some_action', {})
+
+        self.rate_limiter.acquire.assert_called_once_with()
+        status_code, elapsed = self.rate_limiter.record.call_args[0]
+        self.assertEqual(status_code, 200)
+        self.assertGreaterEqual(elapsed, 0)
+
+    @responses.activate
+    def test_raises_error_if_throttled(self):
+        responses.add(responses.POST, self.api.request_url, body='Too Many Requests', status=429)
+
+        with self.assertRaises(ActiveCampaignRateLimitError):
+            self.api._make_post_request('some_action', {})
+
+        self.assertEqual(self.rate_limiter.record.call_args[0][0], 429)
+
+
 class ActiveCampaignAPIFormatMailingListsTestCase(ActiveCampaignAPITestCase):
     def test_return_value_formatted(self):
         body_formatted = self.api._format_mailing_lists([1, 2], {'key1': 'value1'})
@@ -264,3 +756,7 @@ class ActiveCampaignAPIFormatMailingListsTestCase(ActiveCampaignAPITestCase):
     def test_nonstandard_prefix(self):
         body_formatted = self.api._format_mailing_lists([1, 2], {'key1': 'value1'}, prefix='test')
         self.assertDictEqual(body_formatted, {'key1': 'value1', 'test[1]': 1, 'test[2]': 2})
+
+    def test_fixed_value(self):
+        body_formatted = self.api._format_mailing_lists([1, 2], {}, prefix='status', value=2)
+        self.assertDictEqual(body_formatted, {'status[1]': 2, 'status[2]': 2})
@@ -0,0 +1,210 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from activecampaign.async_api import AsyncActiveCampaignAPI
+from activecampaign.exc import ActiveCampaignRateLimitError, ActiveCampaignResponseError
+from activecampaign.instrumentation import Instrumentation
+
+from config import config
+
+
+class AsyncActiveCampaignAPITestCase(TestCase):
+    def setUp(self):
+        config['AC_API_KEY'] = 'mysupersecretkey'
+        config['RATE_LIMIT'] = 0
+        config['RETRY_MAX_ATTEMPTS'] = 1
+        self.loop = asyncio.new_event_loop()
+        self.requests = []
+        self.status = 200
+        self.response = {'id': 1, 'result_code': 1, 'result_message': 'testing'}
+
+        async def handler(request):
+            self.requests.append((dict(request.query), dict(await request.post())))
+            return web.json_response(self.response, status=self.status, content_type='text/html')
+
+        app = web.Application()
+        app.router.add_post('/admin/api.php', handler)
+        app.router.add_get('/admin/api.php', handler)
+        self.server = TestServer(app)
+        self.wait(self.server.start_server())
+
+        config['AC_BASE_URL'] = str(self.server.make_url(''))
+        self.api = AsyncActiveCampaignAPI()
+
+    def tearDown(self):
+        self.wait(self.api.close())
+        self.wait(self.server.close())
+        self.loop.close()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+
+class AsyncActiveCampaignAPIRequestTestCase(AsyncActiveCampaignAPITestCase):
+    def test_request_structure(self):
+        self.wait(self.api._make_post_request('some_action', {'key1': 'value1', 'p[1]': 1}))
+
+        expected_params = {'api_action': 'some_action', 'api_key': 'mysupersecretkey', 'api_output': 'json'}
+        self.assertEqual(self.requests, [(expected_params, {'key1': 'value1', 'p[1]': '1'})])
+
+    def test_returns_response(self):
+        response = self.wait(self.api._make_post_request('some_action', {'key1': 'value1'}))
+        self.assertDictEqual(response, self.response)
+
+    def test_instrumented_request_traced(self):
+        traces = []
+        self.api.instrumentation = Instrumentation(after_hooks=[traces.append])
+
+        self.wait(self.api._make_post_request('some_action', {'key1': 'value1'}))
+
+        trace, = traces
+        self.assertEqual((trace.action, trace.attempt, trace.status), ('some_action', 1, 200))
+        self.assertEqual(trace.request_bytes, len('key1=value1'))
+        self.assertGreater(trace.response_bytes, 0)
+        self.assertIsNotNone(trace.decode)
+
+    def test_raises_error_if_response_code_falsey(self):
+        self.response = {'id': 1, 'result_code': 0, 'result_message': 'error'}
+
+        with self.assertRaisesRegex(ActiveCampaignResponseError, 'error'):
+            self.wait(self.api._make_post_request('some_action', {'key1': 'value1'}))
+
+    def test_rate_limiter_consulted(self):
+        self.api.rate_limiter = MagicMock()
+        self.api.rate_limiter.reserve.return_value = 0.01
+
+        self.wait(self.api._make_post_request('some_action', {}))
+
+        self.api.rate_limiter.reserve.assert_called_once_with()
+        self.assertEqual(self.api.rate_limiter.record.call_args[0][0], 200)
+
+    def test_raises_error_if_throttled(self):
+        self.status = 429
+
+        with self.assertRaises(ActiveCampaignRateLimitError):
+            self.wait(self.api._make_post_request('some_action', {}))
+
+    def test_session_created_lazily_and_reused(self):
+        self.assertIsNone(self.api._session)
+        self.wait(self.api._make_post_request('some_action', {}))
+        session = self.api.session
+        self.wait(self.api._make_post_request('some_action', {}))
+
+        self.assertIs(self.api.session, session)
+
+    def test_close_releases_session(self):
+        self.wait(self.api._make_post_request('some_action', {}))
+        session = self.api.session
+        self.wait(self.api.close())
+
+        self.assertTrue(session.closed)
+
+    def test_many_requests_in_flight(self):
+        async def create_contacts():
+            return await asyncio.gather(*(
+                self.api.create_contact('{}@example.com'.format(i), [1]) for i in range(200)
+            ))
+
+        self.assertEqual(self.wait(create_contacts()), [1] * 200)
+        self.assertEqual(len(self.requests), 200)
+
+
+class AsyncActiveCampaignAPIMethodTestCase(AsyncActiveCampaignAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.sender = {
+            'name': 'test person',
+            'address': '123 S Fake St',
+            'city': 'Chicago',
+            'state': 'il',
+            'zip': '60606',
+            'country': 'us'
+        }
+
+    def last_request(self):
+        params, body = self.requests[-1]
+        return params['api_action'], body
+
+    def test_create_mailing_list(self):
+        self.assertEqual(self.wait(self.api.create_mailing_list('test list', self.sender)), 1)
+        self.assertEqual(self.last_request(), ('list_add', {
+            'name': 'test list',
+            'sender_name': 'test person',
+            'sender_addr1': '123 S Fake St',
+            'sender_city': 'Chicago',
+            'sender_zip': '60606',
+            'sender_country': 'us'
+        }))
+
+    def test_create_address(self):
+        self.assertEqual(self.wait(self.api.create_address(self.sender, [1])), 1)
+        self.assertEqual(self.last_request(), ('address_add', {
+            'company_name': 'test person',
+            'address_1': '123 S Fake St',
+            'city': 'Chicago',
+            'state': 'il',
+            'zip': '60606',
+            'country': 'us',
+            'list[1]': '1'
+        }))
+
+    def test_create_contact(self):
+        self.assertEqual(self.wait(self.api.create_contact('person@example.com', [1], 'Person', 'Test')), 1)
+        self.assertEqual(self.last_request(), ('contact_add', {
+            'email': 'person@example.com',
+            'first_name': 'Person',
+            'last_name': 'Test',
+            'p[1]': '1'
+        }))
+
+    def test_existing_contact_looked_up(self):
+        contact = {'id': 7, 'email': 'person@example.com', 'first_name': 'Person', 'lists': {'1': {}}}
+        self.response = dict(contact, result_code=1, result_message='Success: Something is returned')
+        fields = [('email', 'person@example.com'), ('first_name', 'Person')]
+
+        self.assertEqual(self.wait(self.api._existing_contact(fields, [1]))['id'], 7)
+        self.assertIsNone(self.wait(self.api._existing_contact(fields, [1, 2])))
+        self.assertEqual(self.requests[0][0]['api_action'], 'contact_view_email')
+        self.assertEqual(self.requests[0][0]['email'], 'person@example.com')
+
+    def test_create_html_message(self):
+        message_id = self.wait(self.api.create_html_message(
+            [1],
+            'test',
+            '<html><body>test</body></html>',
+            'test@example.com',
+            'Test Person',
+            'test@example.com'
+        ))
+
+        self.assertEqual(message_id, 1)
+        self.assertEqual(self.last_request(), ('message_add', {
+            'subject': 'test',
+            'fromemail': 'test@example.com',
+            'fromname': 'Test Person',
+            'reply2': 'test@example.com',
+            'html': '<html><body>test</body></html>',
+            'priority': '3',
+            'format': 'html',
+            'htmlconstructor': 'editor',
+            'charset': 'utf-8',
+            'encoding': 'quoted-printable',
+            'p[1]': '1'
+        }))
+
+    def test_create_single_campaign(self):
+        self.assertEqual(self.wait(self.api.create_single_campaign('Test Campaign', '2018-09-09 13:00:00', [1], 1)), 1)
+        self.assertEqual(self.last_request(), ('campaign_create', {
+            'type': 'single',
+            'name': 'Test Campaign',
+            'sdate': '2018-09-09 13:00:00',
+            'status': '1',
+            'public': '1',
+            'tracklinks': 'all',
+            'p[1]': '1',
+            'm[1]': '100'
+        }))
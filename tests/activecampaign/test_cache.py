@@ -0,0 +1,196 @@
+import os
+import tempfile
+
+from unittest import TestCase
+
+from activecampaign.api import ActiveCampaignAPI
+from activecampaign.cache import CachedObject, ObjectCache
+from activecampaign.fakeserver import FakeActiveCampaign
+
+from config import config
+
+
+SENDER = {
+    'name': 'Example Co',
+    'address': '1 Main St',
+    'city': 'Springfield',
+    'state': 'IL',
+    'zip': '62701',
+    'country': 'US'
+}
+
+
+ACCOUNT = 'https://example.api-us1.com 5e884898'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ObjectCacheTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'objects.sqlite3')
+        self.clock = FakeClock()
+        self.cache = ObjectCache(self.path, ttl=100, max_entries=2, validate_after=10, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get(ACCOUNT, 'list_add', {'name': 'a'}))
+
+        self.cache.put(ACCOUNT, 'list_add', {'name': 'a'}, 5)
+
+        self.assertEqual(self.cache.get(ACCOUNT, 'list_add', {'name': 'a'}), CachedObject(5, True))
+        self.assertIsNone(self.cache.get(ACCOUNT, 'list_add', {'name': 'b'}))
+        self.assertIsNone(self.cache.get(ACCOUNT, 'message_add', {'name': 'a'}))
+
+    def test_key_ignores_field_order(self):
+        self.assertEqual(
+            ObjectCache.key(ACCOUNT, 'list_add', {'a': 1, 'b': 2}),
+            ObjectCache.key(ACCOUNT, 'list_add', {'b': 2, 'a': 1})
+        )
+
+    def test_scoped_to_account(self):
+        self.cache.put(ACCOUNT, 'list_add', {'name': 'a'}, 5)
+
+        self.assertIsNone(self.cache.get('https://other.api-us1.com 0123', 'list_add', {'name': 'a'}))
+
+    def test_persists_between_instances(self):
+        self.cache.put(ACCOUNT, 'list_add', {'name': 'a'}, 5)
+        self.cache.close()
+
+        self.cache = ObjectCache(self.path, ttl=100, max_entries=2, validate_after=10, clock=self.clock)
+        self.assertEqual(self.cache.get(ACCOUNT, 'list_add', {'name': 'a'}).object_id, 5)
+
+    def test_expires_after_ttl(self):
+        self.cache.put(ACCOUNT, 'list_add', {'name': 'a'}, 5)
+        self.clock.now += 101
+
+        self.assertIsNone(self.cache.get(ACCOUNT, 'list_add', {'name': 'a'}))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_validation_needed_after_interval(self):
+        self.cache.put(ACCOUNT, 'list_add', {'name': 'a'}, 5)
+        self.clock.now += 11
+        self.assertFalse(self.cache.get(ACCOUNT, 'list_add', {'name': 'a'}).validated)
+
+        self.cache.mark_validated(ACCOUNT, 'list_add', {'name': 'a'})
+        self.assertTrue(self.cache.get(ACCOUNT, 'list_add', {'name': 'a'}).validated)
+
+    def test_least_recently_used_evicted(self):
+        self.cache.put(ACCOUNT, 'list_add', {'name': 'a'}, 1)
+        self.clock.now += 1
+        self.cache.put(ACCOUNT, 'list_add', {'name': 'b'}, 2)
+        self.clock.now += 1
+        self.cache.get(ACCOUNT, 'list_add', {'name': 'a'})
+        self.clock.now += 1
+        self.cache.put(ACCOUNT, 'list_add', {'name': 'c'}, 3)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get(ACCOUNT, 'list_add', {'name': 'b'}))
+        self.assertEqual(self.cache.get(ACCOUNT, 'list_add', {'name': 'a'}).object_id, 1)
+
+    def test_discard(self):
+        self.cache.put(ACCOUNT, 'list_add', {'name': 'a'}, 5)
+        self.cache.discard(ACCOUNT, 'list_add', {'name': 'a'})
+
+        self.assertIsNone(self.cache.get(ACCOUNT, 'list_add', {'name': 'a'}))
+
+
+class CachedClientTestCase(TestCase):
+    def setUp(self):
+        self.saved_config = dict(config)
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = FakeActiveCampaign()
+        config['AC_BASE_URL'] = self.server.start()
+        config['AC_API_KEY'] = self.server.api_key
+        config['RATE_LIMIT'] = 0
+        config['RETRY_MAX_ATTEMPTS'] = 1
+
+        self.clock = FakeClock()
+        path = os.path.join(self.directory.name, 'objects.sqlite3')
+        self.cache = ObjectCache(path, ttl=1000, max_entries=10, validate_after=60, clock=self.clock)
+        self.api = ActiveCampaignAPI(cache=self.cache)
+
+    def tearDown(self):
+        self.api.close()
+        self.cache.close()
+        self.server.stop()
+        self.directory.cleanup()
+        config.clear()
+        config.update(self.saved_config)
+
+    def create_objects(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        address_id = self.api.create_address(SENDER, [list_id])
+        message_id = self.api.create_html_message([list_id], 'Hi', '<p>Hi</p>', 'a@example.com', 'A', 'a@example.com')
+        return list_id, address_id, message_id
+
+    def test_identical_objects_reused(self):
+        first = self.create_objects()
+        second = self.create_objects()
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.server.lists), 1)
+        self.assertEqual(sum(self.server.requests.values()), 3)
+
+    def test_different_content_created(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+
+        self.assertNotEqual(self.api.create_mailing_list('Other', SENDER), list_id)
+        self.assertEqual(len(self.server.lists), 2)
+
+    def test_stale_objects_validated(self):
+        first = self.create_objects()
+        self.clock.now += 61
+
+        self.assertEqual(self.create_objects(), first)
+        self.assertEqual(self.server.requests['list_view'], 1)
+        self.assertEqual(self.server.requests['address_view'], 1)
+        self.assertEqual(self.server.requests['message_view'], 1)
+
+        self.create_objects()
+        self.assertEqual(self.server.requests['list_view'], 1)
+
+    def test_deleted_objects_recreated(self):
+        list_id, _, message_id = self.create_objects()
+        del self.server.lists[list_id]
+        self.clock.now += 61
+
+        new_list_id, _, new_message_id = self.create_objects()
+
+        self.assertNotEqual(new_list_id, list_id)
+        self.assertNotEqual(new_message_id, message_id)
+        self.assertEqual(len(self.server.lists), 1)
+
+    def test_deleted_address_recreated(self):
+        _, address_id, _ = self.create_objects()
+        del self.server.addresses[address_id]
+        self.clock.now += 61
+
+        _, new_address_id, _ = self.create_objects()
+
+        self.assertNotEqual(new_address_id, address_id)
+        self.assertEqual(len(self.server.addresses), 1)
+
+    def test_objects_of_other_accounts_not_reused(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+
+        with FakeActiveCampaign(api_key='otherkey') as other:
+            config['AC_BASE_URL'] = other.base_url
+            config['AC_API_KEY'] = other.api_key
+            with ActiveCampaignAPI(cache=self.cache) as api:
+                self.assertNotEqual(api.cache_account, self.api.cache_account)
+                self.assertNotIn(other.api_key, api.cache_account)
+                api.create_mailing_list('Newsletter', SENDER)
+
+            self.assertEqual(len(other.lists), 1)
+
+        self.assertEqual(self.api.create_mailing_list('Newsletter', SENDER), list_id)
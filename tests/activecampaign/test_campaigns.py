@@ -0,0 +1,154 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from activecampaign.api import ActiveCampaignAPI
+from activecampaign.campaigns import (
+    CAMPAIGN, CONTACTS, MESSAGE, CampaignPlan, load_manifest, rejects_path, run_campaigns
+)
+from activecampaign.exc import ActiveCampaignDependencyError
+from activecampaign.fakeserver import FakeActiveCampaign
+from activecampaign.models import Sender
+
+from config import config
+
+
+SENDER = {
+    'name': 'Sender',
+    'email': 'sender@example.com',
+    'address': '1 Street',
+    'city': 'City',
+    'state': 'State',
+    'zip': '12345',
+    'country': 'Country'
+}
+
+
+class ManifestTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_manifest(self, campaigns, name='manifest.json', **manifest):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            json.dump(dict(manifest, campaigns=campaigns), f)
+
+        return path
+
+    @staticmethod
+    def campaign(name, **values):
+        return dict({
+            'name': name,
+            'send_date': '2030-01-01 09:00:00',
+            'subject': 'Subject of {}'.format(name),
+            'html': '{}.html'.format(name),
+            'contacts': '{}.csv'.format(name)
+        }, **values)
+
+
+class LoadManifestTestCase(ManifestTestCase):
+    def test_campaigns_loaded(self):
+        own_sender = dict(SENDER, name='Own')
+        plans = load_manifest(self.write_manifest(
+            [self.campaign('first'), self.campaign('second', sender=own_sender)],
+            sender=SENDER
+        ))
+
+        self.assertEqual([plan.name for plan in plans], ['first', 'second'])
+        self.assertEqual(plans[0].html, os.path.join(self.directory, 'first.html'))
+        self.assertEqual(plans[0].contacts, os.path.join(self.directory, 'first.csv'))
+        self.assertEqual(plans[0].sender, Sender(**SENDER))
+        self.assertEqual(plans[1].sender.name, 'Own')
+
+    def test_yaml_manifest(self):
+        path = os.path.join(self.directory, 'manifest.yaml')
+        with open(path, 'w') as f:
+            f.write('campaigns:\n- name: first\n  send_date: 2030-01-01 09:00:00\n  subject: Hi\n  html: a.html\n'
+                    '  contacts: a.csv\n  sender: {name: Sender, email: sender@example.com}\n')
+
+        plans = load_manifest(path)
+        self.assertEqual(plans[0].send_date, '2030-01-01 09:00:00')
+
+    def test_missing_keys(self):
+        campaign = self.campaign('first')
+        del campaign['subject']
+
+        with self.assertRaisesRegex(ValueError, 'Campaign 1 of the manifest has no subject, sender'):
+            load_manifest(self.write_manifest([campaign]))
+
+    def test_duplicate_names(self):
+        with self.assertRaisesRegex(ValueError, 'unique'):
+            load_manifest(self.write_manifest([self.campaign('first'), self.campaign('first')], sender=SENDER))
+
+
+class RunCampaignsTestCase(ManifestTestCase):
+    def setUp(self):
+        super().setUp()
+        self.saved_config = dict(config)
+        self.server = FakeActiveCampaign(api_key='testkey')
+        config['AC_BASE_URL'] = self.server.start()
+        config['AC_API_KEY'] = 'testkey'
+        config['RATE_LIMIT'] = 0
+
+        for number in range(3):
+            name = 'campaign{}'.format(number)
+            with open(os.path.join(self.directory, name + '.html'), 'w') as f:
+                f.write('<p>{}</p>'.format(name))
+            with open(os.path.join(self.directory, name + '.csv'), 'w') as f:
+                f.write('email,first_name,last_name\n')
+                f.writelines('{}.{}@example.com,First,Last\n'.format(name, n) for n in range(5))
+
+    def tearDown(self):
+        self.server.stop()
+        config.clear()
+        config.update(self.saved_config)
+        super().tearDown()
+
+    def run_campaigns(self, campaigns, rejects_directory=None):
+        plans = load_manifest(self.write_manifest(campaigns, sender=SENDER))
+        with ActiveCampaignAPI() as api:
+            results = run_campaigns(api, plans, workers=4, contact_workers=2, rejects_directory=rejects_directory)
+            return {result.key: result for result in results}
+
+    def test_campaigns_created(self):
+        results = self.run_campaigns([self.campaign('campaign{}'.format(number)) for number in range(3)])
+
+        self.assertEqual(len(results), 15)
+        self.assertTrue(all(result.error is None for result in results.values()))
+        self.assertEqual(results['campaign1', CONTACTS].value.imported, 5)
+        self.assertEqual(len(self.server.campaigns), 3)
+        self.assertEqual(len(self.server.contacts), 15)
+
+    def test_failure_skips_only_its_campaign(self):
+        results = self.run_campaigns([self.campaign('campaign0'), self.campaign('campaign1', html='missing.html')])
+
+        self.assertIsInstance(results['campaign1', MESSAGE].error, FileNotFoundError)
+        self.assertIsInstance(results['campaign1', CAMPAIGN].error, ActiveCampaignDependencyError)
+        self.assertIsNone(results['campaign0', CAMPAIGN].error)
+        self.assertEqual(len(self.server.campaigns), 1)
+
+    def test_rejected_rows_reported(self):
+        with open(os.path.join(self.directory, 'campaign1.csv'), 'a') as f:
+            f.write('not an email,First,Last\ncampaign1.0@example.com,Again,Last\n')
+        plan = load_manifest(self.write_manifest([self.campaign('campaign1')], sender=SENDER))[0]
+
+        results = self.run_campaigns([self.campaign('campaign1')], rejects_directory=self.directory)
+
+        report = results['campaign1', CONTACTS].value
+        self.assertEqual((report.imported, report.rejects), (5, 2))
+        with open(rejects_path(self.directory, plan)) as f:
+            self.assertEqual([line.split(',')[0] for line in f.read().splitlines()], ['row', '6', '7'])
+
+    def test_rejects_paths_distinct(self):
+        names = ('Spring Sale', 'Spring/Sale', 'Spring_Sale')
+        plans = [CampaignPlan(name, None, None, None, None, None) for name in names]
+        paths = [rejects_path(self.directory, plan) for plan in plans]
+
+        self.assertEqual(len(set(paths)), 3)
+        self.assertTrue(all(os.path.dirname(path) == self.directory for path in paths))
+        self.assertTrue(os.path.basename(paths[0]).startswith('Spring_Sale-'))
@@ -0,0 +1,156 @@
+import io
+import os
+import shutil
+import tempfile
+from itertools import islice
+from unittest import TestCase
+
+from activecampaign.api import ActiveCampaignAPI
+from activecampaign.checkpoint import CheckpointState, ImportCheckpoint
+from activecampaign.exc import ActiveCampaignDuplicateError, ActiveCampaignResponseError
+from activecampaign.fakeserver import FakeActiveCampaign
+from activecampaign.importer import ContactImporter, ImportResult
+from activecampaign.reader import read_contacts
+from config import config
+
+
+class ImportCheckpointTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'import.checkpoint')
+
+        with ImportCheckpoint(self.path) as checkpoint:
+            checkpoint.start(mailing_list_id=7)
+            checkpoint.record(ImportResult(1, 'a@example.com', 101, None, 30))
+            checkpoint.record(ImportResult(2, 'b@example.com', None, ActiveCampaignResponseError('invalid'), 55))
+            checkpoint.record(ImportResult(3, 'c@example.com', 103, None, 80))
+
+    def test_exists(self):
+        self.assertTrue(ImportCheckpoint(self.path).exists())
+        self.assertFalse(ImportCheckpoint(self.path + '.missing').exists())
+
+    def test_start_refuses_to_overwrite(self):
+        with self.assertRaises(FileExistsError):
+            ImportCheckpoint(self.path).start()
+
+    def test_load(self):
+        with ImportCheckpoint(self.path) as checkpoint:
+            self.assertEqual(checkpoint.load(), CheckpointState({'mailing_list_id': 7}, 80, 4, 2, 1))
+
+    def test_load_new_checkpoint(self):
+        path = os.path.join(self.directory, 'new.checkpoint')
+        with ImportCheckpoint(path) as checkpoint:
+            checkpoint.start(mailing_list_id=8)
+
+        with ImportCheckpoint(path) as checkpoint:
+            self.assertEqual(checkpoint.load(), CheckpointState({'mailing_list_id': 8}, 0, 1, 0, 0))
+
+    def test_record_after_load(self):
+        with ImportCheckpoint(self.path) as checkpoint:
+            checkpoint.load()
+            checkpoint.record(ImportResult(4, 'd@example.com', 104, None, 99))
+
+        with ImportCheckpoint(self.path) as checkpoint:
+            self.assertEqual(checkpoint.load(), CheckpointState({'mailing_list_id': 7}, 99, 5, 3, 1))
+
+    def test_partial_entry_discarded(self):
+        with open(self.path, 'a') as f:
+            f.write('[4,99,"d@exam')
+
+        with ImportCheckpoint(self.path) as checkpoint:
+            self.assertEqual(checkpoint.load().offset, 80)
+            checkpoint.record(ImportResult(4, 'd@example.com', 104, None, 99))
+
+        self.assertEqual(list(ImportCheckpoint(self.path).created_contacts())[-1], ('d@example.com', 104))
+
+    def test_failed_rows(self):
+        self.assertEqual(list(ImportCheckpoint(self.path).failed_rows()), [(2, 'b@example.com', 'invalid')])
+
+    def test_created_contacts(self):
+        self.assertEqual(
+            list(ImportCheckpoint(self.path).created_contacts()),
+            [('a@example.com', 101), ('c@example.com', 103)]
+        )
+
+    def test_emails(self):
+        self.assertEqual(
+            list(ImportCheckpoint(self.path).emails()),
+            ['a@example.com', 'b@example.com', 'c@example.com']
+        )
+
+    def test_entries_synced_at_interval(self):
+        path = os.path.join(self.directory, 'synced.checkpoint')
+        checkpoint = ImportCheckpoint(path, sync_interval=2)
+        checkpoint.start()
+        checkpoint.record(ImportResult(1, 'a@example.com', 101, None, 30))
+        self.assertEqual(self.count_lines(path), 1)
+
+        checkpoint.record(ImportResult(2, 'b@example.com', 102, None, 55))
+        self.assertEqual(self.count_lines(path), 3)
+        checkpoint.close()
+
+    @staticmethod
+    def count_lines(path):
+        with open(path) as f:
+            return len(f.readlines())
+
+
+class ResumeImportTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'import.checkpoint')
+
+        self.saved_config = dict(config)
+        self.addCleanup(config.update, self.saved_config)
+        self.server = FakeActiveCampaign(api_key='testkey')
+        config['AC_BASE_URL'] = self.server.start()
+        config['AC_API_KEY'] = 'testkey'
+        config['RATE_LIMIT'] = 0
+        self.addCleanup(self.server.stop)
+        self.server.lists[1] = {'name': 'Newsletter'}
+
+        self.api = ActiveCampaignAPI()
+        self.contacts = b'email\n' + b''.join('c{}@example.com\n'.format(n).encode() for n in range(30))
+
+    def interrupt(self):
+        """Imports the first 15 rows with a checkpoint synced every 10, then copies the journal as it stands on disk
+        when the import is killed before its next sync
+
+        :return: Returns the path of the copied journal
+        :rtype: str
+        """
+        crashed = os.path.join(self.directory, 'crashed.checkpoint')
+        checkpoint = ImportCheckpoint(self.path, sync_interval=10)
+        checkpoint.start(mailing_list_id=1)
+        for result in ContactImporter(self.api, [1]).run(islice(read_contacts(io.BytesIO(self.contacts)), 15)):
+            checkpoint.record(result)
+
+        shutil.copy(self.path, crashed)
+        checkpoint.close()
+        return crashed
+
+    def resume(self, recover_duplicates):
+        with ImportCheckpoint(self.interrupt()) as checkpoint:
+            state = checkpoint.load()
+            rows = read_contacts(io.BytesIO(self.contacts), offset=state.offset, start=state.next_row)
+            importer = ContactImporter(self.api, [1], recover_duplicates=recover_duplicates)
+            return state, list(importer.run(rows))
+
+    def test_rows_after_last_sync_recovered(self):
+        state, results = self.resume(recover_duplicates=True)
+
+        self.assertEqual((state.next_row, state.created), (11, 10))
+        self.assertEqual([result.row for result in results], list(range(11, 31)))
+        self.assertEqual([result.error for result in results], [None] * 20)
+        self.assertNotIn(None, [result.contact_id for result in results])
+        self.assertEqual(len(self.server.contacts), 30)
+
+    def test_rows_after_last_sync_reported_as_duplicates(self):
+        state, results = self.resume(recover_duplicates=False)
+
+        self.assertEqual(
+            [result.row for result in results if isinstance(result.error, ActiveCampaignDuplicateError)],
+            list(range(11, 16))
+        )
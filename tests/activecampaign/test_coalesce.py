@@ -0,0 +1,126 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from activecampaign.api import ActiveCampaignAPI
+from activecampaign.coalesce import ContactCoalescer
+from activecampaign.exc import ActiveCampaignResponseError
+from activecampaign.fakeserver import FakeActiveCampaign
+from activecampaign.models import Contact
+from activecampaign.reader import ContactRow
+
+from config import config
+
+
+class ContactCoalescerTestCase(TestCase):
+    def setUp(self):
+        self.api = MagicMock()
+        self.api.create_contact.side_effect = lambda contact, mailing_lists: len(contact.email)
+        self.api.sync_contact.side_effect = lambda contact, mailing_lists: len(contact.email) * 2
+
+    def test_invalid_worker_count(self):
+        with self.assertRaises(ValueError):
+            ContactCoalescer(self.api, workers=0)
+
+    def test_lists_merged_per_contact(self):
+        with ContactCoalescer(self.api, max_contacts=10, max_delay=60) as coalescer:
+            first = coalescer.add('a@example.com', [1, 2], 'A', 'Person')
+            second = coalescer.add('A@Example.com', [2, 3])
+            other = coalescer.add(ContactRow(1, 10, 'bb@example.com', 'B', None), [1])
+
+        self.assertEqual(self.api.create_contact.call_count, 2)
+        self.api.create_contact.assert_any_call(Contact('a@example.com', 'A', 'Person'), [1, 2, 3])
+        self.api.create_contact.assert_any_call(Contact('bb@example.com', 'B', None), [1])
+        self.assertEqual((first.result(), second.result(), other.result()), (13, 13, 14))
+        self.assertEqual((coalescer.additions, coalescer.requests), (3, 2))
+
+    def test_later_names_replace_earlier_ones(self):
+        with ContactCoalescer(self.api, max_contacts=10, max_delay=60) as coalescer:
+            coalescer.add(Contact('a@example.com', 'A', 'Person'), [1])
+            coalescer.add(Contact('a@example.com', None, 'Renamed'), [2])
+
+        self.api.create_contact.assert_called_once_with(Contact('a@example.com', 'A', 'Renamed'), [1, 2])
+
+    def test_sent_when_max_contacts_pending(self):
+        coalescer = ContactCoalescer(self.api, max_contacts=2, max_delay=60)
+        first = coalescer.add('a@example.com', [1])
+        second = coalescer.add('bb@example.com', [1])
+        coalescer.add('a@example.com', [2])
+        coalescer.add('ccc@example.com', [1])
+
+        self.assertEqual((first.result(timeout=1), second.result(timeout=1)), (13, 14))
+        self.api.create_contact.assert_any_call(Contact('a@example.com', None, None), [1, 2])
+        coalescer.close()
+
+    def test_sent_after_max_delay(self):
+        coalescer = ContactCoalescer(self.api, max_contacts=10, max_delay=0.05)
+        future = coalescer.add('a@example.com', [1])
+
+        self.assertEqual(future.result(timeout=1), 13)
+        coalescer.close()
+
+    def test_flush(self):
+        coalescer = ContactCoalescer(self.api, max_contacts=10, max_delay=60)
+        future = coalescer.add('a@example.com', [1])
+        coalescer.flush()
+
+        self.assertEqual(future.result(timeout=1), 13)
+        coalescer.close()
+
+    def test_sync(self):
+        with ContactCoalescer(self.api, sync=True) as coalescer:
+            future = coalescer.add('a@example.com', [1])
+
+        self.api.create_contact.assert_not_called()
+        self.assertEqual(future.result(), 26)
+
+    def test_error_reported_to_every_addition(self):
+        error = ActiveCampaignResponseError('Invalid email address')
+        self.api.create_contact.side_effect = error
+
+        with ContactCoalescer(self.api) as coalescer:
+            futures = [coalescer.add('a@example.com', [1]), coalescer.add('a@example.com', [2])]
+
+        for future in futures:
+            self.assertIs(future.exception(), error)
+
+
+class ContactCoalescerServerTestCase(TestCase):
+    def setUp(self):
+        self.saved_config = dict(config)
+        self.server = FakeActiveCampaign(api_key='testkey')
+        config['AC_BASE_URL'] = self.server.start()
+        config['AC_API_KEY'] = 'testkey'
+        config['RATE_LIMIT'] = 0
+        self.server.lists.update({1: {'name': 'One'}, 2: {'name': 'Two'}, 3: {'name': 'Three'}})
+
+    def tearDown(self):
+        self.server.stop()
+        config.clear()
+        config.update(self.saved_config)
+
+    def test_one_request_per_contact(self):
+        emails = ['c{}@example.com'.format(n) for n in range(20)]
+
+        with ActiveCampaignAPI() as api, ContactCoalescer(api, max_contacts=10, max_delay=60, workers=4) as coalescer:
+            futures = [coalescer.add(email, [mailing_list]) for mailing_list in (1, 2, 3) for email in emails[:8]]
+            futures += [coalescer.add(email, [1, 3]) for email in emails[8:]]
+
+        self.assertTrue(all(future.exception() is None for future in futures))
+        self.assertEqual(self.server.requests['contact_add'], 20)
+        self.assertEqual(len(self.server.contacts), 20)
+        self.assertEqual(len(self.server.subscriptions), 8 * 3 + 12 * 2)
+
+    def test_interleaved_additions_merged_beyond_max_contacts(self):
+        # More contacts than are held at once, each added to its lists in turn as the README shows
+        emails = ['c{}@example.com'.format(n) for n in range(25)]
+        futures = []
+
+        with ActiveCampaignAPI() as api, ContactCoalescer(api, sync=True, max_contacts=10, max_delay=60) as coalescer:
+            for email in emails:
+                futures.append(coalescer.add(email, [1]))
+                futures.append(coalescer.add(email, [2]))
+
+        self.assertTrue(all(future.exception() is None for future in futures))
+        self.assertEqual((coalescer.additions, coalescer.requests), (50, 25))
+        self.assertEqual(self.server.requests['contact_sync'], 25)
+        self.assertEqual(len(self.server.subscriptions), 50)
@@ -0,0 +1,72 @@
+import json
+
+from unittest import TestCase, skipIf
+
+from activecampaign import decode
+from activecampaign.decode import RESPONSE_FIELDS, ResponseDecoder, create_response_decoder
+
+from config import config
+
+
+LARGE_BODY = json.dumps({
+    'result_code': 1,
+    'result_message': 'Success: Something is returned',
+    'rows': [{'id': n, 'name': 'List {}'.format(n), 'tags': ['a', 'b'], 'meta': {'n': n}} for n in range(1000)],
+    'id': 5,
+    'nested': {'id': 6, 'result_code': 0},
+    'ratio': 0.5,
+}).encode('utf-8')
+
+
+class ResponseDecoderTestCase(TestCase):
+    def test_keeps_only_fields(self):
+        decoder = ResponseDecoder()
+        response_body = decoder.decode(LARGE_BODY)
+
+        self.assertDictEqual(
+            response_body,
+            {'result_code': 1, 'result_message': 'Success: Something is returned', 'id': 5}
+        )
+
+    def test_keeps_everything_without_fields(self):
+        decoder = ResponseDecoder(fields=None)
+        self.assertDictEqual(decoder.decode(LARGE_BODY), json.loads(LARGE_BODY))
+
+    def test_non_object_returned_as_is(self):
+        self.assertEqual(ResponseDecoder().decode(b'[1, 2]'), [1, 2])
+
+    def test_invalid_body(self):
+        with self.assertRaises(ValueError):
+            ResponseDecoder().decode(b'<html>Bad Gateway</html>')
+
+    def test_created_from_config(self):
+        decoder = create_response_decoder()
+
+        self.assertEqual(decoder.fields, RESPONSE_FIELDS)
+        self.assertEqual(decoder.stream_threshold, config['RESPONSE_STREAM_THRESHOLD'])
+
+
+@skipIf(decode.ijson is None, 'ijson is not installed')
+class IncrementalResponseDecoderTestCase(TestCase):
+    def setUp(self):
+        self.decoder = ResponseDecoder(RESPONSE_FIELDS | {'nested', 'ratio'}, stream_threshold=100)
+
+    def test_matches_whole_decoding(self):
+        expected = ResponseDecoder(self.decoder.fields).decode(LARGE_BODY)
+        self.assertDictEqual(self.decoder.decode(LARGE_BODY), expected)
+
+    def test_builds_nested_and_float_values(self):
+        response_body = self.decoder.decode(LARGE_BODY)
+
+        self.assertDictEqual(response_body['nested'], {'id': 6, 'result_code': 0})
+        self.assertIsInstance(response_body['ratio'], float)
+
+    def test_small_body_decoded_whole(self):
+        self.assertDictEqual(self.decoder.decode(b'{"result_code": 1, "extra": 2}'), {'result_code': 1})
+
+    def test_non_object_returned_as_is(self):
+        self.assertEqual(self.decoder.decode(json.dumps(list(range(100))).encode()), list(range(100)))
+
+    def test_invalid_body(self):
+        with self.assertRaises(ValueError):
+            self.decoder.decode(LARGE_BODY[:-20])
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from activecampaign.dedup import BloomFilter, DiskEmailSet, EmailIndex
+
+from config import config
+
+
+class BloomFilterTestCase(TestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        keys = ['{}@example.com'.format(i) for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(1000, false_positive_rate=0.01)
+        for i in range(1000):
+            bloom.add('{}@example.com'.format(i))
+
+        false_positives = sum('{}@example.org'.format(i) in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_sized_for_capacity(self):
+        bloom = BloomFilter(1000, false_positive_rate=0.01)
+        self.assertEqual(bloom.size, 9585)
+        self.assertEqual(bloom.hash_count, 7)
+
+
+class DiskEmailSetTestCase(TestCase):
+    def test_membership(self):
+        emails = DiskEmailSet(batch_size=2)
+        self.addCleanup(emails.close)
+
+        for email in ('a@example.com', 'b@example.com', 'c@example.com', 'a@example.com'):
+            emails.add(email)
+
+        self.assertIn('a@example.com', emails)
+        self.assertIn('c@example.com', emails)
+        self.assertNotIn('d@example.com', emails)
+
+    def test_temporary_database_removed(self):
+        emails = DiskEmailSet()
+        self.assertTrue(os.path.exists(emails.path))
+
+        emails.close()
+        self.assertFalse(os.path.exists(emails.path))
+
+    def test_given_database_kept(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'emails.sqlite3')
+
+        DiskEmailSet(path).close()
+        self.assertTrue(os.path.exists(path))
+
+
+class EmailIndexTestCase(TestCase):
+    def test_defaults_from_config(self):
+        index = EmailIndex()
+        self.assertEqual(index.exact_limit, config['DEDUP_EXACT_LIMIT'])
+        self.assertEqual(index.expected_emails, config['DEDUP_EXPECTED_EMAILS'])
+
+    def test_add_reports_duplicates(self):
+        index = EmailIndex()
+
+        self.assertTrue(index.add('a@example.com'))
+        self.assertTrue(index.add('b@example.com'))
+        self.assertFalse(index.add(' A@Example.com'))
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.duplicates, 1)
+        self.assertFalse(index.spilled)
+
+    def test_switches_to_disk_beyond_exact_limit(self):
+        with EmailIndex(exact_limit=10, expected_emails=100) as index:
+            for i in range(50):
+                self.assertTrue(index.add('{}@example.com'.format(i)))
+
+            self.assertTrue(index.spilled)
+            for i in range(50):
+                self.assertFalse(index.add('{}@EXAMPLE.com'.format(i)))
+
+            self.assertIn('0@example.com', index)
+            self.assertNotIn('50@example.com', index)
+            self.assertEqual(len(index), 50)
+            self.assertEqual(index.duplicates, 50)
+
+    def test_exact_beyond_filter_capacity(self):
+        with EmailIndex(exact_limit=1, expected_emails=1) as index:
+            emails = ['{}@example.com'.format(i) for i in range(500)]
+            self.assertTrue(all(index.add(email) for email in emails))
+            self.assertEqual(index.duplicates, 0)
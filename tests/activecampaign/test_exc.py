@@ -6,3 +6,28 @@ from activecampaign import exc
 class ActiveCampaignResponseErrorTestCase(TestCase):
     def test_type(self):
         self.assertIsInstance(exc.ActiveCampaignResponseError(), Exception)
+
+
+class ActiveCampaignRateLimitErrorTestCase(TestCase):
+    def test_type(self):
+        self.assertIsInstance(exc.ActiveCampaignRateLimitError(), exc.ActiveCampaignResponseError)
+
+
+class ActiveCampaignServerErrorTestCase(TestCase):
+    def test_type(self):
+        self.assertIsInstance(exc.ActiveCampaignServerError(), exc.ActiveCampaignResponseError)
+
+    def test_status_code(self):
+        error = exc.ActiveCampaignServerError(502)
+        self.assertEqual(error.status_code, 502)
+        self.assertEqual(str(error), 'Server responded with HTTP 502')
+
+
+class ActiveCampaignDuplicateErrorTestCase(TestCase):
+    def test_type(self):
+        self.assertIsInstance(exc.ActiveCampaignDuplicateError(), exc.ActiveCampaignResponseError)
+
+    def test_response_body(self):
+        error = exc.ActiveCampaignDuplicateError('exists', {'result_code': 0})
+        self.assertEqual(str(error), 'exists')
+        self.assertEqual(error.response_body, {'result_code': 0})
@@ -0,0 +1,192 @@
+import random
+
+from unittest import TestCase
+
+from activecampaign.api import ActiveCampaignAPI
+from activecampaign.exc import (
+    ActiveCampaignDuplicateError,
+    ActiveCampaignRateLimitError,
+    ActiveCampaignResponseError,
+    ActiveCampaignServerError
+)
+from activecampaign.fakeserver import FakeActiveCampaign, parse_latency
+from activecampaign.reader import ContactRow
+
+from config import config
+
+
+SENDER = {
+    'name': 'Example Co',
+    'address': '1 Main St',
+    'city': 'Springfield',
+    'state': 'IL',
+    'zip': '62701',
+    'country': 'US'
+}
+
+
+class ParseLatencyTestCase(TestCase):
+    def test_constant(self):
+        self.assertEqual(parse_latency('constant:0.25')(random.Random()), 0.25)
+
+    def test_uniform_within_bounds(self):
+        sample = parse_latency('uniform:0.1,0.2')
+        rng = random.Random(1)
+        for _ in range(100):
+            self.assertTrue(0.1 <= sample(rng) <= 0.2)
+
+    def test_negative_samples_clamped(self):
+        sample = parse_latency('normal:-1,0.01')
+        self.assertEqual(sample(random.Random(1)), 0.0)
+
+    def test_invalid_spec(self):
+        for spec in ('gamma:1', 'uniform:1', 'constant:fast', ''):
+            with self.assertRaises(ValueError):
+                parse_latency(spec)
+
+
+class FakeActiveCampaignTestCase(TestCase):
+    server_options = {}
+
+    def setUp(self):
+        self.saved_config = dict(config)
+        self.server = FakeActiveCampaign(api_key='testkey', seed=1, **self.server_options)
+        config['AC_BASE_URL'] = self.server.start()
+        config['AC_API_KEY'] = 'testkey'
+        config['RATE_LIMIT'] = 0
+        config['RETRY_MAX_ATTEMPTS'] = 1
+
+        self.api = ActiveCampaignAPI()
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+        config.clear()
+        config.update(self.saved_config)
+
+
+class FakeActiveCampaignFlowTestCase(FakeActiveCampaignTestCase):
+    def test_campaign_flow(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        self.api.create_address(SENDER, [list_id])
+        contact_id = self.api.create_contact('jane@example.com', [list_id], 'Jane', 'Doe')
+        message_id = self.api.create_html_message(
+            [list_id], 'Hello', '<p>Hi</p>', 'a@example.com', 'A', 'a@example.com'
+        )
+        campaign_id = self.api.create_single_campaign('Launch', '2020-01-01 00:00:00', [list_id], message_id)
+
+        self.assertIn(list_id, self.server.lists)
+        self.assertEqual(self.server.contacts['jane@example.com']['id'], contact_id)
+        self.assertIn(campaign_id, self.server.campaigns)
+        self.assertEqual(self.server.requests['contact_add'], 1)
+
+    def test_duplicate_contact(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        self.api.create_contact('jane@example.com', [list_id])
+
+        with self.assertRaises(ActiveCampaignDuplicateError):
+            self.api.create_contact('Jane@Example.com', [list_id])
+
+    def test_existing_contact_viewed(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        contact_id = self.api.create_contact('jane@example.com', [list_id], 'Jane', 'Doe')
+        fields = [('email', 'Jane@Example.com'), ('first_name', 'Jane'), ('last_name', 'Doe')]
+
+        self.assertEqual(self.api._existing_contact(fields, [list_id])['id'], contact_id)
+        self.assertIsNone(self.api._existing_contact(fields[:2], [list_id]))
+        self.assertIsNone(self.api._existing_contact([('email', 'john@example.com')], [list_id]))
+
+    def test_listed_contact_found(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        other_list_id = self.api.create_mailing_list('Offers', SENDER)
+        contact_id = self.api.create_contact('jane@example.com', [list_id])
+
+        self.assertEqual(self.api.find_listed_contact('Jane@Example.com', [list_id]), contact_id)
+        self.assertIsNone(self.api.find_listed_contact('jane@example.com', [list_id, other_list_id]))
+        self.assertIsNone(self.api.find_listed_contact('john@example.com', [list_id]))
+
+    def test_sync_and_unsubscribe_contact(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        contact_id = self.api.sync_contact('jane@example.com', [list_id], 'Jane')
+
+        self.assertEqual(self.api.sync_contact('jane@example.com', [list_id], 'Janet'), contact_id)
+        self.assertEqual(self.server.contacts['jane@example.com']['first_name'], 'Janet')
+        self.assertEqual(self.server.subscriptions[list_id, 'jane@example.com'], 1)
+
+        self.api.unsubscribe_contact(contact_id, 'jane@example.com', [list_id])
+        self.assertEqual(self.server.subscriptions[list_id, 'jane@example.com'], 2)
+        self.assertEqual(self.server.contacts['jane@example.com']['first_name'], 'Janet')
+
+    def test_unknown_list(self):
+        with self.assertRaises(ActiveCampaignResponseError):
+            self.api.create_contact('jane@example.com', [42])
+
+    def test_wrong_api_key(self):
+        self.api.api_key = 'wrongkey'
+
+        with self.assertRaisesRegex(ActiveCampaignResponseError, 'not authorized'):
+            self.api.create_mailing_list('Newsletter', SENDER)
+
+    def test_bulk_import(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        contacts = [ContactRow(n, 0, 'user{}@example.com'.format(n), None, None) for n in range(3)]
+
+        results = list(self.api.create_contacts_bulk(contacts, [list_id]))
+
+        self.assertEqual([result.error for result in results], [None] * 3)
+        self.assertEqual(len(self.server.contacts), 3)
+
+    def test_contact_edited_by_id(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        contacts = [ContactRow(n, 0, 'user{}@example.com'.format(n), None, None) for n in range(2)]
+        self.api.create_contacts_bulk(contacts, [list_id])
+        contact_id = self.server.contacts['user1@example.com']['id']
+
+        self.api.unsubscribe_contact(contact_id, 'user1@example.com', [list_id])
+
+        self.assertEqual(self.server.subscriptions[list_id, 'user1@example.com'], 2)
+        self.assertEqual(self.server.subscriptions[list_id, 'user0@example.com'], 1)
+        with self.assertRaisesRegex(ActiveCampaignResponseError, 'Contact not found'):
+            self.api.unsubscribe_contact(999, 'user1@example.com', [list_id])
+
+
+class FakeActiveCampaignCompressionTestCase(FakeActiveCampaignTestCase):
+    def create_message(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        self.api.compression_threshold = 1
+        return self.api.create_html_message([list_id], 'Hello', '<p>Hi</p>' * 100, 'a@example.com', 'A')
+
+    def test_compressed_body_read(self):
+        message_id = self.create_message()
+
+        self.assertEqual(self.server.messages[message_id]['html'], '<p>Hi</p>' * 100)
+        self.assertLess(self.server.request_bytes['message_add'], len('<p>Hi</p>') * 100)
+
+    def test_compressed_body_refused(self):
+        self.server.accept_compression = False
+        message_id = self.create_message()
+
+        self.assertIn(message_id, self.server.messages)
+        self.assertFalse(self.api.compression_accepted)
+        self.assertEqual(self.server.requests['message_add'], 2)
+
+
+class FakeActiveCampaignErrorRateTestCase(FakeActiveCampaignTestCase):
+    server_options = {'error_rate': 1.0}
+
+    def test_server_error(self):
+        with self.assertRaises(ActiveCampaignServerError) as context:
+            self.api.create_mailing_list('Newsletter', SENDER)
+
+        self.assertEqual(context.exception.status_code, 500)
+
+
+class FakeActiveCampaignRateLimitTestCase(FakeActiveCampaignTestCase):
+    server_options = {'rate_limit': 0.01, 'burst': 2}
+
+    def test_throttled_beyond_burst(self):
+        self.api.create_mailing_list('First', SENDER)
+        self.api.create_mailing_list('Second', SENDER)
+
+        with self.assertRaises(ActiveCampaignRateLimitError):
+            self.api.create_mailing_list('Third', SENDER)
@@ -0,0 +1,209 @@
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import requests
+
+from activecampaign.exc import ActiveCampaignDuplicateError, ActiveCampaignResponseError
+from activecampaign.api import BulkContactResult
+from activecampaign.importer import BulkContactImporter, ContactImporter, ContactSynchronizer, ImportResult, SyncResult
+from activecampaign.membership import MembershipIndex
+from activecampaign.reader import ContactRow
+
+
+class ContactImporterTestCase(TestCase):
+    def setUp(self):
+        self.api = MagicMock()
+        self.api.create_contact.side_effect = lambda email, mailing_lists, first_name, last_name: len(email)
+        self.rows = [
+            ContactRow(1, 10, 'a@example.com', 'A', 'Person'),
+            ContactRow(2, 20, 'bb@example.com', 'B', 'Person'),
+            ContactRow(3, 30, 'ccc@example.com', None, None),
+        ]
+
+    def test_invalid_worker_count(self):
+        with self.assertRaises(ValueError):
+            ContactImporter(self.api, [1], workers=0)
+
+    def test_expected_call_args(self):
+        list(ContactImporter(self.api, [1, 2]).run(self.rows[:1]))
+        self.api.create_contact.assert_called_once_with('a@example.com', [1, 2], first_name='A', last_name='Person')
+
+    def test_optional_names_omitted(self):
+        list(ContactImporter(self.api, [1]).run(self.rows[2:]))
+        self.api.create_contact.assert_called_once_with('ccc@example.com', [1], first_name=None, last_name=None)
+
+    def test_results_in_row_order(self):
+        def create_contact(email, mailing_lists, first_name, last_name):
+            # Finish earlier rows last to make sure results are reordered
+            time.sleep(0.05 if email.startswith('a') else 0)
+            return len(email)
+
+        self.api.create_contact.side_effect = create_contact
+        results = list(ContactImporter(self.api, [1], workers=3).run(self.rows))
+
+        self.assertEqual(results, [
+            ImportResult(1, 'a@example.com', 13, None, 10),
+            ImportResult(2, 'bb@example.com', 14, None, 20),
+            ImportResult(3, 'ccc@example.com', 15, None, 30),
+        ])
+
+    def test_errors_reported_per_row(self):
+        error = ActiveCampaignResponseError('invalid email')
+        self.api.create_contact.side_effect = [1, error, requests.ConnectionError()]
+
+        results = list(ContactImporter(self.api, [1]).run(self.rows))
+
+        self.assertEqual(results[0], ImportResult(1, 'a@example.com', 1, None, 10))
+        self.assertEqual(results[1], ImportResult(2, 'bb@example.com', None, error, 20))
+        self.assertIsInstance(results[2].error, requests.ConnectionError)
+
+    def test_duplicates_recovered(self):
+        error = ActiveCampaignDuplicateError('exists')
+        self.api.create_contact.side_effect = [error, error]
+        self.api.find_listed_contact.side_effect = [7, None]
+
+        results = list(ContactImporter(self.api, [1], recover_duplicates=True).run(self.rows[:2]))
+
+        self.assertEqual(results, [
+            ImportResult(1, 'a@example.com', 7, None, 10),
+            ImportResult(2, 'bb@example.com', None, error, 20),
+        ])
+        self.api.find_listed_contact.assert_called_with('bb@example.com', [1])
+
+    def test_duplicates_not_recovered_by_default(self):
+        error = ActiveCampaignDuplicateError('exists')
+        self.api.create_contact.side_effect = [error]
+
+        results = list(ContactImporter(self.api, [1]).run(self.rows[:1]))
+
+        self.assertEqual(results, [ImportResult(1, 'a@example.com', None, error, 10)])
+        self.api.find_listed_contact.assert_not_called()
+
+    def test_concurrency_bounded_by_workers(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def create_contact(email, mailing_lists, first_name, last_name):
+            with lock:
+                active.append(email)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(email)
+
+        self.api.create_contact.side_effect = create_contact
+        rows = [ContactRow(i, i, '{}@example.com'.format(i), None, None) for i in range(20)]
+        list(ContactImporter(self.api, [1], workers=4).run(rows))
+
+        self.assertLessEqual(max(peak), 4)
+        self.assertGreater(max(peak), 1)
+
+    def test_rows_read_lazily(self):
+        consumed = []
+
+        def rows():
+            for i in range(100):
+                consumed.append(i)
+                yield ContactRow(i, i, '{}@example.com'.format(i), None, None)
+
+        results = ContactImporter(self.api, [1], workers=2, max_pending=5).run(rows())
+        next(results)
+
+        self.assertLessEqual(len(consumed), 5)
+        results.close()
+
+
+class BulkContactImporterTestCase(TestCase):
+    def setUp(self):
+        self.api = MagicMock()
+        self.api.create_contacts_bulk.side_effect = lambda contacts, mailing_lists: [
+            BulkContactResult(contact, None, 'batch', None) for contact in contacts
+        ]
+        self.rows = [ContactRow(i, i * 10, '{}@example.com'.format(i), None, None) for i in range(1, 6)]
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            BulkContactImporter(self.api, [1], chunk_size=0)
+
+    def test_rows_submitted_in_chunks(self):
+        list(BulkContactImporter(self.api, [1], chunk_size=2).run(self.rows))
+
+        self.assertEqual(
+            [call[0] for call in self.api.create_contacts_bulk.call_args_list],
+            [(self.rows[0:2], [1]), (self.rows[2:4], [1]), (self.rows[4:], [1])]
+        )
+
+    def test_results_mapped_to_rows(self):
+        error = ActiveCampaignResponseError('invalid')
+        self.api.create_contacts_bulk.side_effect = [[
+            BulkContactResult(self.rows[0], None, 'batch', None),
+            BulkContactResult(self.rows[1], 12, None, None),
+            BulkContactResult(self.rows[2], None, None, error),
+        ]]
+
+        self.assertEqual(list(BulkContactImporter(self.api, [1]).run(self.rows[:3])), [
+            ImportResult(1, '1@example.com', None, None, 10),
+            ImportResult(2, '2@example.com', 12, None, 20),
+            ImportResult(3, '3@example.com', None, error, 30),
+        ])
+
+
+    def test_duplicates_recovered(self):
+        error = ActiveCampaignDuplicateError('exists')
+        self.api.create_contacts_bulk.side_effect = [[
+            BulkContactResult(self.rows[0], None, None, error),
+            BulkContactResult(self.rows[1], None, None, error),
+        ]]
+        self.api.find_listed_contact.side_effect = [7, None]
+
+        self.assertEqual(list(BulkContactImporter(self.api, [1], recover_duplicates=True).run(self.rows[:2])), [
+            ImportResult(1, '1@example.com', 7, None, 10),
+            ImportResult(2, '2@example.com', None, error, 20),
+        ])
+
+
+class ContactSynchronizerTestCase(TestCase):
+    def setUp(self):
+        self.api = MagicMock()
+        self.api.sync_contact.side_effect = lambda email, mailing_lists, first_name, last_name: len(email)
+        self.index = MembershipIndex(':memory:')
+        self.index.record(1, 'kept@example.com', 1, 'Kept', None)
+        self.index.record(1, 'renamed@example.com', 2, 'Old', None)
+        self.index.record(1, 'gone@example.com', 3)
+        self.rows = [
+            ContactRow(1, 10, 'kept@example.com', 'Kept', None),
+            ContactRow(2, 20, 'renamed@example.com', 'New', None),
+            ContactRow(3, 30, 'new@example.com', 'New', None),
+        ]
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_only_changes_submitted(self):
+        results = list(ContactSynchronizer(self.api, self.index, 1, workers=2).run(self.rows))
+
+        self.assertEqual(results, [
+            SyncResult('update', 'renamed@example.com', 19, None),
+            SyncResult('add', 'new@example.com', 15, None),
+            SyncResult('remove', 'gone@example.com', 3, None),
+        ])
+        self.assertEqual(self.api.sync_contact.call_count, 2)
+        self.api.unsubscribe_contact.assert_called_once_with(3, 'gone@example.com', [1])
+
+    def test_changes_recorded(self):
+        list(ContactSynchronizer(self.api, self.index, 1).run(self.rows))
+
+        self.assertEqual(list(ContactSynchronizer(self.api, self.index, 1).run(self.rows)), [])
+        self.assertEqual(self.index.contact('renamed@example.com'), (19, 'New', None))
+        self.assertEqual(self.index.members(1), 3)
+
+    def test_failed_changes_not_recorded(self):
+        self.api.unsubscribe_contact.side_effect = ActiveCampaignResponseError('failed')
+
+        results = list(ContactSynchronizer(self.api, self.index, 1).run(self.rows))
+
+        self.assertIsInstance(results[-1].error, ActiveCampaignResponseError)
+        self.assertEqual(self.index.members(1), 4)
@@ -0,0 +1,138 @@
+import json
+
+from unittest import TestCase
+
+from activecampaign.api import ActiveCampaignAPI
+from activecampaign.exc import ActiveCampaignDuplicateError, ActiveCampaignRateLimitError
+from activecampaign.fakeserver import FakeActiveCampaign
+from activecampaign.instrumentation import Histogram, Instrumentation, MetricsCollector, RequestTrace
+from activecampaign.retry import RetryPolicy
+
+from config import config
+
+
+SENDER = {'name': 'Example Co', 'address': '1 Main St', 'city': 'Springfield', 'zip': '62701', 'country': 'US'}
+
+
+class InstrumentationTestCase(TestCase):
+    def test_hooks_called_around_attempt(self):
+        calls = []
+        instrumentation = Instrumentation(
+            before_hooks=[lambda trace: calls.append(('before', trace.elapsed))],
+            after_hooks=[lambda trace: calls.append(('after', trace.elapsed))]
+        )
+
+        with instrumentation.trace('list_add', 1, {'name': 'abc'}) as trace:
+            self.assertEqual(trace.request_bytes, len('name=abc'))
+
+        self.assertEqual(calls[0], ('before', None))
+        self.assertEqual(calls[1][0], 'after')
+        self.assertGreaterEqual(calls[1][1], 0)
+
+    def test_error_recorded_and_raised(self):
+        traces = []
+        instrumentation = Instrumentation(after_hooks=[traces.append])
+
+        with self.assertRaises(ValueError):
+            with instrumentation.trace('bulk_import', 2, b'{}'):
+                raise ValueError('failed')
+
+        self.assertIsInstance(traces[0].error, ValueError)
+        self.assertEqual(traces[0].request_bytes, 2)
+
+
+class HistogramTestCase(TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), [(0.1, 2), (1.0, 3), (float('inf'), 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 5.65)
+
+
+class MetricsCollectorTestCase(TestCase):
+    def setUp(self):
+        self.collector = MetricsCollector(buckets=(0.1, 1.0))
+
+        trace = RequestTrace('contact_add', 1, 100)
+        trace.status, trace.response_bytes, trace.elapsed, trace.transport, trace.decode = 200, 50, 0.2, 0.15, 0.01
+        self.collector(trace)
+
+        retry = RequestTrace('contact_add', 2, 100)
+        retry.status, retry.response_bytes, retry.elapsed = 429, 20, 0.05
+        retry.error = ActiveCampaignRateLimitError()
+        self.collector(retry)
+
+    def test_as_dict(self):
+        metrics = self.collector.as_dict()['contact_add']
+
+        self.assertEqual(metrics['requests'], {'200': 1, '429': 1})
+        self.assertEqual(metrics['retries'], 1)
+        self.assertEqual(metrics['errors'], {'ActiveCampaignRateLimitError': 1})
+        self.assertEqual(metrics['request_bytes'], 200)
+        self.assertEqual(metrics['response_bytes'], 70)
+        self.assertEqual(metrics['duration']['count'], 2)
+        self.assertEqual(metrics['phases']['decode']['count'], 1)
+        self.assertEqual(metrics['phases']['wait']['count'], 2)
+
+    def test_to_json(self):
+        self.assertEqual(json.loads(self.collector.to_json()), json.loads(json.dumps(self.collector.as_dict())))
+
+    def test_to_prometheus(self):
+        text = self.collector.to_prometheus()
+
+        self.assertIn('# TYPE activecampaign_requests_total counter', text)
+        self.assertIn('activecampaign_requests_total{action="contact_add",status="429"} 1', text)
+        self.assertIn('activecampaign_retries_total{action="contact_add"} 1', text)
+        self.assertIn('activecampaign_request_duration_seconds_bucket{action="contact_add",le="0.1"} 1', text)
+        self.assertIn('activecampaign_request_duration_seconds_bucket{action="contact_add",le="+Inf"} 2', text)
+        self.assertIn('activecampaign_request_phase_seconds_count{action="contact_add",phase="transport"} 1', text)
+        self.assertTrue(text.endswith('\n'))
+
+
+class InstrumentedClientTestCase(TestCase):
+    def setUp(self):
+        self.saved_config = dict(config)
+        self.server = FakeActiveCampaign(rate_limit=0.01, burst=2)
+        config['AC_BASE_URL'] = self.server.start()
+        config['AC_API_KEY'] = self.server.api_key
+        config['RATE_LIMIT'] = 0
+
+        self.collector = MetricsCollector()
+        self.api = ActiveCampaignAPI(
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=0),
+            instrumentation=Instrumentation(after_hooks=[self.collector])
+        )
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+        config.clear()
+        config.update(self.saved_config)
+
+    def test_attempts_traced(self):
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        self.api.create_contact('jane@example.com', [list_id])
+
+        with self.assertRaises(ActiveCampaignRateLimitError):
+            self.api.create_contact('john@example.com', [list_id])
+
+        metrics = self.collector.as_dict()
+        self.assertEqual(metrics['list_add']['requests'], {'200': 1})
+        self.assertEqual(metrics['contact_add']['requests'], {'200': 1, '429': 3})
+        self.assertEqual(metrics['contact_add']['retries'], 2)
+        self.assertEqual(metrics['contact_add']['errors'], {'ActiveCampaignRateLimitError': 3})
+        self.assertGreater(metrics['list_add']['response_bytes'], 0)
+        self.assertEqual(metrics['list_add']['phases']['decode']['count'], 1)
+
+    def test_application_errors_traced(self):
+        self.server.rate_limit = None
+        list_id = self.api.create_mailing_list('Newsletter', SENDER)
+        self.api.create_contact('jane@example.com', [list_id])
+
+        with self.assertRaises(ActiveCampaignDuplicateError):
+            self.api.create_contact('jane@example.com', [list_id])
+
+        self.assertEqual(self.collector.as_dict()['contact_add']['errors'], {'ActiveCampaignDuplicateError': 1})
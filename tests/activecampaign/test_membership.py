@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+from unittest import TestCase
+
+from activecampaign.membership import ADD, REMOVE, UPDATE, MembershipChange, MembershipIndex
+from activecampaign.reader import ContactRow
+
+
+class MembershipIndexTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'members.sqlite3')
+        self.index = MembershipIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    def test_record(self):
+        self.index.record(1, ' A@Example.com', 10, 'A', '')
+
+        self.assertEqual(self.index.contact('a@example.com'), (10, 'A', None))
+        self.assertEqual(self.index.members(1), 1)
+        self.assertEqual(self.index.members(2), 0)
+
+    def test_remove(self):
+        self.index.record(1, 'a@example.com', 10)
+        self.index.record(2, 'a@example.com', 10)
+        self.index.remove(1, 'a@example.com')
+
+        self.assertEqual(self.index.members(1), 0)
+        self.assertEqual(self.index.members(2), 1)
+
+    def test_persists_between_instances(self):
+        self.index.record(1, 'a@example.com', 10)
+        self.index.close()
+
+        self.index = MembershipIndex(self.path)
+        self.assertEqual(self.index.members(1), 1)
+
+    def test_diff(self):
+        self.index.record(1, 'same@example.com', 10, 'Same', 'Name')
+        self.index.record(1, 'renamed@example.com', 11, 'Old', 'Name')
+        self.index.record(1, 'gone@example.com', 12)
+        self.index.record(2, 'other@example.com', 13)
+
+        rows = [
+            ContactRow(1, 0, 'same@example.com', 'Same', 'Name'),
+            ContactRow(2, 0, 'Renamed@example.com', 'New', 'Name'),
+            ContactRow(3, 0, 'new@example.com', None, None),
+            ContactRow(4, 0, 'other@example.com', '', ''),
+        ]
+
+        self.assertEqual(list(self.index.diff(1, rows)), [
+            MembershipChange(UPDATE, 'renamed@example.com', 11, rows[1]),
+            MembershipChange(ADD, 'new@example.com', None, rows[2]),
+            MembershipChange(ADD, 'other@example.com', 13, rows[3]),
+            MembershipChange(REMOVE, 'gone@example.com', 12, None),
+        ])
+
+    def test_diff_empty_names_match_missing_names(self):
+        self.index.record(1, 'a@example.com', 10)
+
+        self.assertEqual(list(self.index.diff(1, [ContactRow(1, 0, 'a@example.com', '', None)])), [])
+
+    def test_diff_repeatable(self):
+        self.index.record(1, 'gone@example.com', 12)
+
+        self.assertEqual(len(list(self.index.diff(1, []))), 1)
+        self.assertEqual(len(list(self.index.diff(1, []))), 1)
@@ -0,0 +1,68 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from activecampaign import messages
+from activecampaign.messages import MessagePreparer, create_message_preparer, minify_html
+
+from config import config
+
+
+class MinifyHTMLTestCase(TestCase):
+    def test_indentation_collapsed(self):
+        html = '﻿<html>\r\n  <body>\r\n    <p>Hello,    <b>world</b>\t!</p>\r\n  </body>\r\n</html>\r\n'
+        self.assertEqual(minify_html(html), '<html>\n<body>\n<p>Hello, <b>world</b> !</p>\n</body>\n</html>')
+
+    def test_comments_removed(self):
+        html = '<p>a</p><!-- note --><!--[if mso]><table><![endif]--><!--<![endif]--><p>b</p>'
+        self.assertEqual(minify_html(html), '<p>a</p><!--[if mso]><table><![endif]--><!--<![endif]--><p>b</p>')
+
+    def test_preserved_elements_untouched(self):
+        html = '<div>\n  <PRE>  one\n    two</PRE>\n  <style>\n  p {  margin: 0; }\n</style>\n</div>'
+        self.assertEqual(
+            minify_html(html),
+            '<div>\n<PRE>  one\n    two</PRE>\n<style>\n  p {  margin: 0; }\n</style>\n</div>'
+        )
+
+    def test_non_breaking_spaces_kept(self):
+        self.assertEqual(minify_html('<p>a\xa0\n\xa0b</p>'), '<p>a\xa0\n\xa0b</p>')
+
+
+class MessagePreparerTestCase(TestCase):
+    def test_prepared_once_per_content(self):
+        preparer = MessagePreparer(minify=True)
+
+        with patch.object(messages, 'minify_html', wraps=minify_html) as mock_minify:
+            first = preparer.prepare('<p>  a  </p>')
+            second = preparer.prepare('<p>  a  </p>')
+
+        self.assertEqual(first, '<p> a </p>')
+        self.assertIs(second, first)
+        mock_minify.assert_called_once_with('<p>  a  </p>')
+
+    def test_least_recently_used_discarded(self):
+        preparer = MessagePreparer(minify=True, max_entries=2)
+        preparer.prepare('<p>1</p>')
+        preparer.prepare('<p>2</p>')
+        preparer.prepare('<p>1</p>')
+        preparer.prepare('<p>3</p>')
+
+        self.assertEqual(len(preparer), 2)
+        with patch.object(messages, 'minify_html', wraps=minify_html) as mock_minify:
+            preparer.prepare('<p>1</p>')
+            preparer.prepare('<p>2</p>')
+
+        mock_minify.assert_called_once_with('<p>2</p>')
+
+    def test_unchanged_by_default(self):
+        html = '<p>  a  </p>'
+        self.assertIs(MessagePreparer().prepare(html), html)
+        self.assertIs(create_message_preparer().prepare(html), html)
+
+    def test_empty_content(self):
+        self.assertIsNone(MessagePreparer().prepare(None))
+
+    def test_created_from_config(self):
+        preparer = create_message_preparer()
+
+        self.assertEqual(preparer.minify, config['MESSAGE_MINIFY'])
+        self.assertEqual(preparer.max_entries, config['MESSAGE_CACHE_SIZE'])
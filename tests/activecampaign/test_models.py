@@ -0,0 +1,35 @@
+import sys
+
+from unittest import TestCase
+
+from activecampaign.models import Contact, Message, Sender, as_sender
+
+
+class ContactTestCase(TestCase):
+    def test_names_optional(self):
+        self.assertEqual(Contact('person@example.com'), ('person@example.com', None, None))
+
+    def test_no_instance_dictionary(self):
+        contact = Contact('person@example.com', 'Person', 'Test')
+
+        self.assertFalse(hasattr(contact, '__dict__'))
+        self.assertLess(sys.getsizeof(contact), sys.getsizeof(contact._asdict()))
+
+
+class MessageTestCase(TestCase):
+    def test_default_priority(self):
+        message = Message([1], 'test', '<p>test</p>', 'test@example.com', 'Test Person', 'test@example.com')
+        self.assertEqual(message.priority, 3)
+
+
+class AsSenderTestCase(TestCase):
+    def test_sender_returned_as_is(self):
+        sender = Sender('Example Co', 'sender@example.com', '1 Main St', 'Springfield', 'IL', '62701', 'US')
+        self.assertIs(as_sender(sender), sender)
+
+    def test_converts_dictionary(self):
+        sender = as_sender({'name': 'Example Co', 'address': '1 Main St', 'city': 'Springfield', 'extra': 'ignored'})
+
+        self.assertEqual(sender.name, 'Example Co')
+        self.assertEqual(sender.city, 'Springfield')
+        self.assertIsNone(sender.email)
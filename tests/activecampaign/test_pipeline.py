@@ -0,0 +1,143 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from activecampaign.dedup import EmailIndex
+from activecampaign.pipeline import RejectWriter, dedupe, normalize, prepare_contacts, trim_rejects, validate
+from activecampaign.reader import ContactRow
+
+
+def row(email, first_name=None, last_name=None, number=1):
+    return ContactRow(number, number * 10, email, first_name, last_name)
+
+
+class RejectWriterTestCase(TestCase):
+    def test_rows_written(self):
+        stream = io.StringIO()
+        writer = RejectWriter(stream)
+        writer(row('bad', 'A', 'Person', number=3), 'invalid email address')
+
+        self.assertEqual(
+            stream.getvalue(),
+            'row,email,first_name,last_name,reason\r\n3,bad,A,Person,invalid email address\r\n'
+        )
+        self.assertEqual(writer.count, 1)
+
+    def test_header_not_repeated_when_appending(self):
+        stream = io.StringIO('row,email,first_name,last_name,reason\r\n')
+        stream.seek(0, io.SEEK_END)
+        RejectWriter(stream)(row('bad'), 'invalid email address')
+
+        self.assertEqual(stream.getvalue().count('reason'), 1)
+
+
+class TrimRejectsTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'rejects.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_rows_to_be_processed_again_removed(self):
+        with open(self.path, 'w', newline='') as f:
+            writer = RejectWriter(f)
+            for number in (2, 5, 7):
+                writer(row('bad', number=number), 'invalid email address')
+
+        trim_rejects(self.path, 5)
+
+        with open(self.path, newline='') as f:
+            self.assertEqual(
+                f.read(),
+                'row,email,first_name,last_name,reason\r\n2,bad,,,invalid email address\r\n'
+            )
+
+    def test_missing_file_ignored(self):
+        trim_rejects(self.path, 5)
+
+        self.assertFalse(os.path.exists(self.path))
+
+
+class NormalizeTestCase(TestCase):
+    def test_fields_normalized(self):
+        rows = list(normalize([row('  Person@Example.COM ', ' A ', '   ')]))
+        self.assertEqual(rows, [row('person@example.com', 'A', None)])
+
+    def test_missing_fields_left_empty(self):
+        self.assertEqual(list(normalize([row(None), row('')])), [row(None), row('')])
+
+
+class ValidateTestCase(TestCase):
+    def setUp(self):
+        self.reject = MagicMock()
+
+    def assertRejected(self, contact, reason):
+        self.assertEqual(list(validate([contact], self.reject)), [])
+        self.reject.assert_called_once_with(contact, reason)
+
+    def test_valid_rows_passed_on(self):
+        rows = [row('person@example.com'), row("o'brien+tag@mail.example.co.uk", 'A', 'B')]
+        self.assertEqual(list(validate(rows, self.reject)), rows)
+        self.reject.assert_not_called()
+
+    def test_missing_email(self):
+        self.assertRejected(row(''), 'missing email address')
+
+    def test_invalid_email(self):
+        for email in ('person', 'person@', '@example.com', 'person@example', 'a b@example.com', 'a..b@example.com',
+                      'person@-example.com', 'person@example.com.', 'a@b@example.com'):
+            self.reject.reset_mock()
+            self.assertRejected(row(email), 'invalid email address')
+
+    def test_email_too_long(self):
+        self.assertRejected(row('a' * 250 + '@example.com'), 'email address longer than 254 characters')
+
+    def test_local_part_too_long(self):
+        self.assertRejected(row('a' * 65 + '@example.com'), 'invalid email address')
+
+    def test_name_too_long(self):
+        self.assertRejected(row('person@example.com', last_name='x' * 256), 'last_name longer than 255 characters')
+
+
+class DedupeTestCase(TestCase):
+    def test_later_duplicates_rejected(self):
+        reject = MagicMock()
+        rows = [row('a@example.com', number=1), row('b@example.com', number=2), row('a@example.com', number=3)]
+
+        self.assertEqual(list(dedupe(rows, reject)), rows[:2])
+        reject.assert_called_once_with(rows[2], 'duplicate email address')
+
+    def test_previously_seen_rejected(self):
+        reject = MagicMock()
+        seen = EmailIndex()
+        seen.add('a@example.com')
+
+        self.assertEqual(list(dedupe([row('a@example.com')], reject, seen=seen)), [])
+        self.assertEqual(seen.duplicates, 1)
+
+
+class PrepareContactsTestCase(TestCase):
+    def test_stages_chained(self):
+        reject = MagicMock()
+        rows = [row('A@example.com', number=1), row('invalid', number=2), row('a@example.com ', number=3)]
+
+        self.assertEqual(list(prepare_contacts(rows, reject)), [row('a@example.com', number=1)])
+        self.assertEqual([call[0][1] for call in reject.call_args_list], [
+            'invalid email address',
+            'duplicate email address'
+        ])
+
+    def test_rows_streamed(self):
+        consumed = []
+
+        def rows():
+            for number in range(1, 1000):
+                consumed.append(number)
+                yield row('{}@example.com'.format(number), number=number)
+
+        next(prepare_contacts(rows(), MagicMock()))
+        self.assertEqual(consumed, [1])
@@ -0,0 +1,197 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from unittest import TestCase
+from unittest.mock import patch
+
+from activecampaign.ratelimit import AdaptiveRateLimiter, SharedRateLimiter, TokenBucket, create_rate_limiter
+
+from config import config
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTestCase(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(2, 3, clock=self.clock)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0, 1)
+
+        with self.assertRaises(ValueError):
+            TokenBucket(1, 0)
+
+    def test_burst_admitted_immediately(self):
+        self.assertEqual([self.bucket.reserve() for _ in range(3)], [0, 0, 0])
+
+    def test_reservations_queue_at_rate(self):
+        for _ in range(3):
+            self.bucket.reserve()
+
+        self.assertAlmostEqual(self.bucket.reserve(), 0.5)
+        self.assertAlmostEqual(self.bucket.reserve(), 1.0)
+
+    def test_refills_over_time(self):
+        for _ in range(3):
+            self.bucket.reserve()
+
+        self.clock.now = 1.0
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertAlmostEqual(self.bucket.reserve(), 0.5)
+
+    def test_refill_capped_at_burst(self):
+        self.clock.now = 100.0
+        delays = [self.bucket.reserve() for _ in range(4)]
+        self.assertEqual(delays[:3], [0, 0, 0])
+        self.assertAlmostEqual(delays[3], 0.5)
+
+    def test_try_acquire(self):
+        self.assertEqual([self.bucket.try_acquire() for _ in range(4)], [True, True, True, False])
+
+        self.clock.now = 0.5
+        self.assertTrue(self.bucket.try_acquire())
+        self.assertFalse(self.bucket.try_acquire())
+
+    @patch('activecampaign.ratelimit.time.sleep')
+    def test_acquire_sleeps_for_reservation(self, mock_sleep):
+        for _ in range(4):
+            self.bucket.acquire()
+
+        mock_sleep.assert_called_once_with(0.5)
+
+    def test_shared_between_threads(self):
+        bucket = TokenBucket(1, 10, clock=self.clock)
+        delays = []
+
+        def reserve():
+            for _ in range(5):
+                delays.append(bucket.reserve())
+
+        threads = [threading.Thread(target=reserve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(delays), [0] * 10 + list(range(1, 11)))
+
+
+class AdaptiveRateLimiterTestCase(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = AdaptiveRateLimiter(10, 5, 1, 2.0, clock=self.clock)
+
+    def test_throttled_response_decreases_rate(self):
+        self.limiter.record(429, 0.1)
+        self.assertEqual(self.limiter.rate, 5)
+
+    def test_slow_response_decreases_rate(self):
+        self.limiter.record(200, 2.5)
+        self.assertEqual(self.limiter.rate, 5)
+
+    def test_decrease_discards_burst(self):
+        self.limiter.record(429, 0.1)
+        self.assertAlmostEqual(self.limiter.reserve(), 0.2)
+
+    def test_decreases_once_per_cooldown(self):
+        self.limiter.record(429, 0.1)
+        self.limiter.record(429, 0.1)
+        self.assertEqual(self.limiter.rate, 5)
+
+        self.clock.now = 1.0
+        self.limiter.record(429, 0.1)
+        self.assertEqual(self.limiter.rate, 2.5)
+
+    def test_rate_never_below_minimum(self):
+        for second in range(10):
+            self.clock.now = second
+            self.limiter.record(429, 0.1)
+
+        self.assertEqual(self.limiter.rate, 1)
+
+    def test_healthy_responses_recover_rate(self):
+        self.limiter.record(429, 0.1)
+        for _ in range(10):
+            self.limiter.record(200, 0.1)
+
+        self.assertAlmostEqual(self.limiter.rate, 6)
+
+        for _ in range(100):
+            self.limiter.record(200, 0.1)
+
+        self.assertEqual(self.limiter.rate, 10)
+
+
+_limiter = None
+
+
+def _set_limiter(limiter):
+    global _limiter
+    _limiter = limiter
+
+
+def _drain_limiter():
+    while _limiter.try_acquire():
+        pass
+
+    _limiter.record(429, 0.0)
+
+
+class SharedRateLimiterTestCase(TestCase):
+    def test_behaves_as_adaptive_limiter(self):
+        limiter = SharedRateLimiter(2.0, 3, 0.5, 5.0)
+
+        self.assertEqual([limiter.try_acquire() for _ in range(4)], [True, True, True, False])
+        self.assertIsNone(limiter._decreased)
+
+        limiter.record(429, 0.1)
+        self.assertEqual(limiter.rate, 1.0)
+        self.assertIsNotNone(limiter._decreased)
+
+    def test_state_shared_with_worker_processes(self):
+        context = get_context('spawn')
+        limiter = SharedRateLimiter(0.01, 5, 0.001, 5.0, context=context)
+
+        with ProcessPoolExecutor(1, mp_context=context, initializer=_set_limiter, initargs=(limiter,)) as executor:
+            executor.submit(_drain_limiter).result()
+
+        # The worker took every token and was throttled, which this process sees as well
+        self.assertFalse(limiter.try_acquire())
+        self.assertEqual(limiter.rate, 0.005)
+
+
+class CreateRateLimiterTestCase(TestCase):
+    def setUp(self):
+        self.original = dict(config)
+
+    def tearDown(self):
+        config.update(self.original)
+
+    def test_values_set_from_config(self):
+        config.update({'RATE_LIMIT': 4.0, 'RATE_BURST': 2, 'RATE_LIMIT_MIN': 0.5, 'SLOW_RESPONSE_THRESHOLD': 3.0})
+        limiter = create_rate_limiter()
+
+        self.assertEqual(limiter.rate, 4.0)
+        self.assertEqual(limiter.burst, 2)
+        self.assertEqual(limiter.min_rate, 0.5)
+        self.assertEqual(limiter.slow_response_threshold, 3.0)
+
+    def test_disabled(self):
+        config['RATE_LIMIT'] = 0
+        self.assertIsNone(create_rate_limiter())
+
+    def test_shared(self):
+        config.update({'RATE_LIMIT': 4.0, 'RATE_BURST': 2, 'RATE_LIMIT_MIN': 0.5, 'SLOW_RESPONSE_THRESHOLD': 3.0})
+        limiter = create_rate_limiter(get_context('spawn'))
+
+        self.assertIsInstance(limiter, SharedRateLimiter)
+        self.assertEqual(limiter.rate, 4.0)
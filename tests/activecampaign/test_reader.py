@@ -0,0 +1,144 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from activecampaign import reader
+from activecampaign.reader import ContactFile, ContactRow, read_contacts
+
+
+CSV_CONTENT = (
+    'email,first_name,last_name\n'
+    'a@example.com,A,Person\n'
+    '\n'
+    'b@example.com,"B\nMultiline",Person\n'
+    'c@example.com,C,Pérson\n'
+).encode('utf-8')
+
+
+class ReadContactsTestCase(TestCase):
+    def setUp(self):
+        self.stream = io.BytesIO(CSV_CONTENT)
+
+    def test_rows_read(self):
+        rows = list(read_contacts(self.stream))
+
+        self.assertEqual([(row.number, row.email, row.first_name, row.last_name) for row in rows], [
+            (1, 'a@example.com', 'A', 'Person'),
+            (2, 'b@example.com', 'B\nMultiline', 'Person'),
+            (3, 'c@example.com', 'C', 'Pérson'),
+        ])
+
+    def test_end_offsets(self):
+        rows = list(read_contacts(self.stream))
+
+        self.assertEqual(CSV_CONTENT[rows[0].end_offset:].split(b'\n')[1], b'b@example.com,"B')
+        self.assertEqual(CSV_CONTENT[rows[1].end_offset:], 'c@example.com,C,Pérson\n'.encode('utf-8'))
+        self.assertEqual(rows[2].end_offset, len(CSV_CONTENT))
+
+    def test_resume_from_offset(self):
+        first = next(read_contacts(self.stream))
+        rows = list(read_contacts(self.stream, offset=first.end_offset, start=2))
+
+        self.assertEqual([(row.number, row.email) for row in rows], [(2, 'b@example.com'), (3, 'c@example.com')])
+
+    def test_stops_at_end(self):
+        rows = list(read_contacts(self.stream))
+        bounded = list(read_contacts(self.stream, offset=rows[0].end_offset, start=2, end=rows[1].end_offset))
+
+        self.assertEqual(bounded, [rows[1]])
+
+    def test_offset_within_header_ignored(self):
+
+        self.assertEqual(len(list(read_contacts(self.stream, offset=3))), 3)
+
+    def test_missing_name_columns(self):
+        rows = list(read_contacts(io.BytesIO(b'email\na@example.com\n')))
+        self.assertEqual(rows, [ContactRow(1, 20, 'a@example.com', None, None)])
+
+    def test_byte_order_mark_skipped(self):
+        rows = list(read_contacts(io.BytesIO(b'\xef\xbb\xbfemail\na@example.com\n')))
+        self.assertEqual(rows[0].email, 'a@example.com')
+
+    def test_missing_email_column(self):
+        with self.assertRaisesRegex(ValueError, 'no email column'):
+            read_contacts(io.BytesIO(b'first_name,last_name\nA,Person\n'))
+
+    def test_empty_file(self):
+        with self.assertRaises(ValueError):
+            read_contacts(io.BytesIO(b''))
+
+    def test_header_only(self):
+        self.assertEqual(list(read_contacts(io.BytesIO(b'email\n'))), [])
+
+
+class MappedReadContactsTestCase(ReadContactsTestCase):
+    """Runs the same tests against a file on disk, which is read through a memory map"""
+    def setUp(self):
+        descriptor, self.path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(CSV_CONTENT)
+        self.stream = open(self.path, 'rb')
+
+    def tearDown(self):
+        self.stream.close()
+        os.remove(self.path)
+
+    def test_empty_file(self):
+        with open(self.path, 'wb'):
+            pass
+
+        with self.assertRaises(ValueError), open(self.path, 'rb') as stream:
+            read_contacts(stream)
+
+
+class ContactFileTestCase(TestCase):
+    def rows(self, content, **kwargs):
+        return [tuple(row) for row in ContactFile(content).rows(**kwargs)]
+
+    def test_matches_line_reader(self):
+        content = (
+            'id,email,note,first_name,last_name,extra\r\n'
+            '1,a@example.com,,A,Person,x\r\n'
+            '2,b@example.com,"Quoted, with comma",B,"Multi\nline ""name""",y\r\n'
+            '\r\n'
+            '3,c@example.com,,C\r\n'
+            '4,d@example.com,,D,Pérson,z,more,columns\r\n'
+            '5,"e@example.com",,E,Person,\r\n'
+            '6,f@example.com,,F,Person'
+        ).encode('utf-8')
+        expected = [tuple(row) for row in read_contacts(io.BytesIO(content))]
+
+        # Small blocks put block edges inside rows and quoted values
+        for block_size in (4, 16, 64, reader.PARSE_BLOCK_SIZE):
+            with self.subTest(block_size=block_size), patch.object(reader, 'PARSE_BLOCK_SIZE', block_size):
+                self.assertEqual(self.rows(content), expected)
+
+        self.assertEqual(expected[2], (3, expected[2][1], 'c@example.com', 'C', None))
+        self.assertEqual(expected[3][2:], ('d@example.com', 'D', 'Pérson'))
+        self.assertEqual(expected[-1][1], len(content))
+
+    def test_missing_name_columns(self):
+        self.assertEqual(self.rows(b'email\na@example.com\n'), [(1, 20, 'a@example.com', None, None)])
+
+    def test_byte_order_mark_skipped(self):
+        self.assertEqual(self.rows(b'\xef\xbb\xbfemail\na@example.com\n')[0][2], 'a@example.com')
+
+    def test_missing_email_column(self):
+        with self.assertRaisesRegex(ValueError, 'no email column'):
+            ContactFile(b'first_name,last_name\nA,Person\n')
+
+    def test_row_at(self):
+        contacts = ContactFile(CSV_CONTENT)
+        rows = list(contacts.rows())
+
+        self.assertEqual(contacts.row_at(0), rows[0])
+        self.assertEqual(contacts.row_at(rows[0].end_offset, number=2), rows[1])
+        self.assertIsNone(contacts.row_at(len(CSV_CONTENT)))
+
+    def test_end(self):
+        contacts = ContactFile(CSV_CONTENT)
+        rows = list(contacts.rows())
+
+        self.assertEqual(list(contacts.rows(rows[0].end_offset, 2, rows[1].end_offset)), [rows[1]])
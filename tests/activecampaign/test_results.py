@@ -0,0 +1,210 @@
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from activecampaign.exc import ActiveCampaignDuplicateError, ActiveCampaignResponseError
+from activecampaign.importer import ImportResult
+from activecampaign.results import (
+    CSVResultSink, JSONLResultSink, RESULT_FIELDS, ResultSink, SQLiteResultSink, create_result_sink, trim_results
+)
+
+from config import config
+
+
+RESULTS = [
+    ImportResult(2, 'one@example.com', 1, None, 30),
+    ImportResult(3, 'two@example.com', None, ActiveCampaignResponseError('Email address is invalid'), 60),
+    ImportResult(4, 'three@example.com', 3, None, 90),
+    ImportResult(5, 'four@example.com', None, ActiveCampaignDuplicateError('Duplicate contact'), 120),
+]
+
+EXPECTED = [
+    (2, 'one@example.com', 1, None, None),
+    (3, 'two@example.com', None, 'ActiveCampaignResponseError', 'Email address is invalid'),
+    (4, 'three@example.com', 3, None, None),
+    (5, 'four@example.com', None, 'ActiveCampaignDuplicateError', 'Duplicate contact'),
+]
+
+
+class ResultSinkTests:
+    """Tests run against every result sink format"""
+    extension = None
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'results' + (self.extension or ''))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        raise NotImplementedError
+
+    def write(self, results, **kwargs):
+        with create_result_sink(self.path, **kwargs) as sink:
+            for result in results:
+                sink.write(result)
+
+        return sink
+
+    def test_written(self):
+        sink = self.write(RESULTS)
+
+        self.assertEqual(self.read(), EXPECTED)
+        self.assertEqual(sink.summary.created, 2)
+        self.assertEqual(sink.summary.failed, 2)
+        self.assertEqual(
+            sink.summary.errors,
+            {'ActiveCampaignResponseError': 1, 'ActiveCampaignDuplicateError': 1}
+        )
+
+    def test_appended(self):
+        self.write(RESULTS[:2])
+        sink = self.write(RESULTS[2:])
+
+        self.assertEqual(self.read(), EXPECTED)
+        # Results already in the file are counted too
+        self.assertEqual((sink.summary.created, sink.summary.failed), (2, 2))
+        self.assertEqual(
+            sink.summary.errors,
+            {'ActiveCampaignResponseError': 1, 'ActiveCampaignDuplicateError': 1}
+        )
+
+    def test_replaced(self):
+        self.write(RESULTS[:2])
+        self.write(RESULTS[2:], append=False)
+
+        self.assertEqual(self.read(), EXPECTED[2:])
+
+    def test_trimmed_on_resume(self):
+        self.write(RESULTS)
+        trim_results(self.path, 4)
+        sink = self.write(RESULTS[2:])
+
+        self.assertEqual(self.read(), EXPECTED)
+        self.assertEqual((sink.summary.created, sink.summary.failed), (2, 2))
+
+    def test_trim_missing_file(self):
+        trim_results(self.path, 4)
+
+        self.assertFalse(os.path.exists(self.path))
+
+
+class CSVResultSinkTestCase(ResultSinkTests, TestCase):
+    extension = '.csv'
+
+    def read(self):
+        with open(self.path, newline='') as f:
+            reader = csv.reader(f)
+            self.assertEqual(tuple(next(reader)), RESULT_FIELDS)
+            return [
+                (int(row), email, int(contact_id) if contact_id else None, error_type or None, error or None)
+                for row, email, contact_id, error_type, error in reader
+            ]
+
+
+class JSONLResultSinkTestCase(ResultSinkTests, TestCase):
+    extension = '.jsonl'
+
+    def read(self):
+        with open(self.path) as f:
+            return [tuple(json.loads(line)[field] for field in RESULT_FIELDS) for line in f]
+
+
+class SQLiteResultSinkTestCase(ResultSinkTests, TestCase):
+    extension = '.db'
+
+    def read(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute('SELECT * FROM results ORDER BY rowid').fetchall()
+        finally:
+            connection.close()
+
+
+class ListResultSink(ResultSink):
+    """Keeps results in memory, relying on the default `sync` and `close`"""
+
+    def __init__(self, sync_interval=None):
+        super().__init__(None, sync_interval)
+        self.records = []
+
+    def _write(self, record):
+        self.records.append(record)
+
+
+class ResultSinkTestCase(TestCase):
+    def test_write_required(self):
+        with self.assertRaises(TypeError):
+            ResultSink('results')
+
+    def test_default_sync_and_close(self):
+        with ListResultSink(sync_interval=2) as sink:
+            for result in RESULTS[:3]:
+                sink.write(result)
+            self.assertEqual(sink._unsynced, 1)
+
+        self.assertEqual(sink.records, EXPECTED[:3])
+        self.assertEqual(sink._unsynced, 0)
+
+
+class SyncIntervalTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_synced_in_batches(self):
+        for sink_class, name in ((CSVResultSink, 'r.csv'), (JSONLResultSink, 'r.jsonl'), (SQLiteResultSink, 'r.db')):
+            with self.subTest(sink_class=sink_class.__name__):
+                sink = sink_class(os.path.join(self.directory, name), sync_interval=2)
+                with patch.object(sink, 'sync', wraps=sink.sync) as mock_sync:
+                    for result in RESULTS[:3]:
+                        sink.write(result)
+                    self.assertEqual(mock_sync.call_count, 1)
+
+                    sink.close()
+                    self.assertEqual(mock_sync.call_count, 2)
+
+    def test_sqlite_rows_buffered_until_sync(self):
+        path = os.path.join(self.directory, 'results.db')
+        with SQLiteResultSink(path, sync_interval=3) as sink:
+            sink.write(RESULTS[0])
+            sink.write(RESULTS[1])
+
+            connection = sqlite3.connect(path)
+            self.assertEqual(connection.execute('SELECT COUNT(*) FROM results').fetchone()[0], 0)
+            sink.write(RESULTS[2])
+            self.assertEqual(connection.execute('SELECT COUNT(*) FROM results').fetchone()[0], 3)
+            connection.close()
+
+    def test_default_interval_from_config(self):
+        with CSVResultSink(os.path.join(self.directory, 'results.csv')) as sink:
+            self.assertEqual(sink.sync_interval, config['RESULT_SYNC_INTERVAL'])
+
+
+class CreateResultSinkTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_format_chosen_by_extension(self):
+        for name, sink_class in (
+            ('r.csv', CSVResultSink), ('r.JSONL', JSONLResultSink), ('r.ndjson', JSONLResultSink),
+            ('r.sqlite', SQLiteResultSink)
+        ):
+            with self.subTest(name=name):
+                with create_result_sink(os.path.join(self.directory, name)) as sink:
+                    self.assertIsInstance(sink, sink_class)
+
+    def test_unknown_extension(self):
+        with self.assertRaisesRegex(ValueError, 'format'):
+            create_result_sink(os.path.join(self.directory, 'results.txt'))
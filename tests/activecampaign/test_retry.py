@@ -0,0 +1,212 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from activecampaign import exc
+from activecampaign.retry import RetryPolicy, RetryStats, create_retry_policy
+
+from config import config
+
+
+class ConnectError(Exception):
+    pass
+
+
+class TransportError(Exception):
+    pass
+
+
+class RetryPolicyTestCase(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.policy = RetryPolicy(
+            max_attempts=3,
+            base_delay=1.0,
+            max_delay=10.0,
+            max_elapsed=60.0,
+            connect_errors=(ConnectError,),
+            transport_errors=(TransportError,),
+            clock=lambda: self.now
+        )
+        self.sleep = patch('activecampaign.retry.time.sleep').start()
+        self.addCleanup(patch.stopall)
+
+    def test_invalid_max_attempts(self):
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+    def test_returns_first_success(self):
+        function = MagicMock(side_effect=[exc.ActiveCampaignRateLimitError(), {'id': 1}])
+
+        self.assertEqual(self.policy.call(function, 'list_add'), {'id': 1})
+        self.assertEqual(function.call_count, 2)
+        self.assertEqual(self.sleep.call_count, 1)
+
+    def test_raises_fatal_error_immediately(self):
+        function = MagicMock(side_effect=exc.ActiveCampaignResponseError('invalid email'))
+
+        with self.assertRaisesRegex(exc.ActiveCampaignResponseError, 'invalid email'):
+            self.policy.call(function, 'contact_add')
+
+        self.assertEqual(function.call_count, 1)
+        self.assertEqual(self.policy.stats.wasted, 0)
+
+    def test_raises_after_max_attempts(self):
+        function = MagicMock(side_effect=exc.ActiveCampaignRateLimitError())
+
+        with self.assertRaises(exc.ActiveCampaignRateLimitError):
+            self.policy.call(function, 'contact_add')
+
+        self.assertEqual(function.call_count, 3)
+        self.assertEqual(self.policy.stats.as_dict(), {
+            'attempts': 3,
+            'retries': 2,
+            'wasted': 3,
+            'recovered': 0,
+            'exhausted': 1,
+            'wasted_by_action': {'contact_add': 3},
+        })
+
+    def test_raises_after_max_elapsed(self):
+        def function():
+            self.now += 61
+            raise exc.ActiveCampaignRateLimitError()
+
+        with self.assertRaises(exc.ActiveCampaignRateLimitError):
+            self.policy.call(function, 'contact_add')
+
+        self.sleep.assert_not_called()
+
+    def test_delay_bounded_exponentially(self):
+        with patch('activecampaign.retry.random.uniform', side_effect=lambda low, high: high):
+            self.assertEqual([self.policy.delay(attempt) for attempt in range(1, 6)], [1, 2, 4, 8, 10])
+
+    def test_delay_jittered(self):
+        delays = {self.policy.delay(3) for _ in range(20)}
+        self.assertGreater(len(delays), 1)
+        self.assertTrue(all(0 <= delay <= 4 for delay in delays))
+
+    def test_retryable_for_every_action(self):
+        for error in (exc.ActiveCampaignRateLimitError(), exc.ActiveCampaignServerError(503), ConnectError()):
+            self.assertTrue(self.policy.is_retryable(error, 'list_add'))
+
+    def test_retryable_only_for_safe_actions(self):
+        for error in (exc.ActiveCampaignServerError(500), TransportError()):
+            self.assertTrue(self.policy.is_retryable(error, 'contact_add'))
+            self.assertFalse(self.policy.is_retryable(error, 'list_add'))
+
+    def test_not_retryable(self):
+        errors = (exc.ActiveCampaignResponseError('invalid'), exc.ActiveCampaignDuplicateError('exists'), KeyError())
+        for error in errors:
+            self.assertFalse(self.policy.is_retryable(error, 'contact_add'))
+
+    def test_duplicate_after_retry_recovered(self):
+        response_body = {'result_code': 0, 'result_message': 'Contact already exists'}
+        function = MagicMock(side_effect=[
+            TransportError(),
+            exc.ActiveCampaignDuplicateError('Contact already exists', response_body)
+        ])
+
+        self.assertIs(self.policy.call(function, 'contact_add'), response_body)
+        self.assertEqual(self.policy.stats.recovered, 1)
+        self.assertEqual(self.policy.stats.wasted, 2)
+
+    def test_duplicate_after_known_failure_raised(self):
+        for first_error in (exc.ActiveCampaignServerError(500), exc.ActiveCampaignRateLimitError(), ConnectError()):
+            with self.subTest(first_error=type(first_error).__name__):
+                function = MagicMock(side_effect=[
+                    first_error,
+                    exc.ActiveCampaignDuplicateError('Contact already exists', {'result_code': 0})
+                ])
+
+                with self.assertRaises(exc.ActiveCampaignDuplicateError):
+                    self.policy.call(function, 'contact_add')
+
+        self.assertEqual(self.policy.stats.recovered, 0)
+
+    def test_duplicate_verified(self):
+        existing = {'id': 7}
+        verify = MagicMock(side_effect=[existing, None])
+
+        for expected in (existing, None):
+            function = MagicMock(side_effect=[TransportError(), exc.ActiveCampaignDuplicateError('exists', {})])
+            if expected is None:
+                with self.assertRaises(exc.ActiveCampaignDuplicateError):
+                    self.policy.call(function, 'contact_add', verify)
+            else:
+                self.assertIs(self.policy.call(function, 'contact_add', verify), expected)
+
+        self.assertEqual(self.policy.stats.recovered, 1)
+
+    def test_duplicate_on_first_attempt_raised(self):
+        function = MagicMock(side_effect=exc.ActiveCampaignDuplicateError('Contact already exists'))
+
+        with self.assertRaises(exc.ActiveCampaignDuplicateError):
+            self.policy.call(function, 'contact_add')
+
+    def test_call_async(self):
+        attempts = []
+
+        async def function():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise exc.ActiveCampaignRateLimitError()
+            return {'id': 1}
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        with patch.object(self.policy, 'delay', return_value=0):
+            response = loop.run_until_complete(self.policy.call_async(function, 'list_add'))
+
+        self.assertEqual(response, {'id': 1})
+        self.assertEqual(self.policy.stats.retries, 1)
+
+
+class RetryStatsTestCase(TestCase):
+    def test_counters_since_snapshot_added(self):
+        stats = RetryStats()
+        stats.record_attempt(1)
+        stats.record_failure('contact_add')
+        snapshot = stats.as_dict()
+
+        stats.record_attempt(2)
+        stats.record_failure('bulk_import', exhausted=True)
+        counters = stats.since(snapshot)
+
+        self.assertEqual(counters, {
+            'attempts': 1,
+            'retries': 1,
+            'wasted': 1,
+            'recovered': 0,
+            'exhausted': 1,
+            'wasted_by_action': {'bulk_import': 1},
+        })
+
+        total = RetryStats()
+        total.add(snapshot)
+        total.add(counters)
+        self.assertEqual(total.as_dict(), stats.as_dict())
+
+
+class CreateRetryPolicyTestCase(TestCase):
+    def setUp(self):
+        self.original = dict(config)
+
+    def tearDown(self):
+        config.update(self.original)
+
+    def test_values_set_from_config(self):
+        config.update({
+            'RETRY_MAX_ATTEMPTS': 4,
+            'RETRY_BASE_DELAY': 0.25,
+            'RETRY_MAX_DELAY': 8.0,
+            'RETRY_MAX_ELAPSED': 30.0
+        })
+        policy = create_retry_policy((ConnectError,), (TransportError,))
+
+        self.assertEqual(policy.max_attempts, 4)
+        self.assertEqual(policy.base_delay, 0.25)
+        self.assertEqual(policy.max_delay, 8.0)
+        self.assertEqual(policy.max_elapsed, 30.0)
+        self.assertEqual(policy.connect_errors, (ConnectError,))
+        self.assertEqual(policy.transport_errors, (TransportError,))
@@ -0,0 +1,89 @@
+import threading
+import time
+from unittest import TestCase
+
+from activecampaign.exc import ActiveCampaignDependencyError, ActiveCampaignResponseError
+from activecampaign.scheduler import Step, StepScheduler
+
+
+class StepSchedulerTestCase(TestCase):
+    def test_invalid_worker_count(self):
+        with self.assertRaises(ValueError):
+            StepScheduler(workers=0)
+
+    def test_dependency_values_passed(self):
+        steps = [
+            Step('sum', lambda a, b: a + b, ['a', 'b']),
+            Step('a', lambda: 1),
+            Step('b', lambda a: a + 1, ['a']),
+        ]
+        results = {result.key: result for result in StepScheduler(workers=2).run(steps)}
+
+        self.assertEqual({key: result.value for key, result in results.items()}, {'a': 1, 'b': 2, 'sum': 3})
+        self.assertTrue(all(result.error is None for result in results.values()))
+
+    def test_independent_steps_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=1)
+        steps = [Step(key, barrier.wait) for key in 'abc']
+
+        # Each step only returns once all three are running at the same time
+        results = list(StepScheduler(workers=3).run(steps))
+        self.assertTrue(all(result.error is None for result in results))
+
+    def test_longest_chain_started_first(self):
+        started = []
+
+        def step(key):
+            return lambda *values: started.append(key)
+
+        steps = [Step('short', step('short'))] + [
+            Step('chain{}'.format(n), step('chain{}'.format(n)), ['chain{}'.format(n - 1)] if n else [])
+            for n in range(3)
+        ]
+        list(StepScheduler(workers=1).run(steps))
+
+        # Once only one step of the chain is left, it is no taller than the step that has been ready for longer
+        self.assertEqual(started, ['chain0', 'chain1', 'short', 'chain2'])
+
+    def test_dependents_of_failed_step_skipped(self):
+        error = ActiveCampaignResponseError('List does not exist')
+
+        def fail():
+            raise error
+
+        steps = [
+            Step('list', fail),
+            Step('message', lambda mailing_list: 1, ['list']),
+            Step('campaign', lambda mailing_list, message: 2, ['list', 'message']),
+            Step('other', lambda: 3),
+        ]
+        results = {result.key: result for result in StepScheduler(workers=2).run(steps)}
+
+        self.assertIs(results['list'].error, error)
+        for key in ('message', 'campaign'):
+            self.assertIsInstance(results[key].error, ActiveCampaignDependencyError)
+            self.assertEqual(results[key].error.dependency, 'list')
+            self.assertIs(results[key].error.error, error)
+        self.assertEqual(results['other'].value, 3)
+
+    def test_skipped_once_when_several_dependencies_fail(self):
+        def fail():
+            time.sleep(0.01)
+            raise ValueError('failed')
+
+        steps = [Step('a', fail), Step('b', fail), Step('c', lambda a, b: None, ['a', 'b', 'a'])]
+        keys = [result.key for result in StepScheduler(workers=2).run(steps)]
+
+        self.assertEqual(sorted(keys), ['a', 'b', 'c'])
+
+    def test_repeated_dependency(self):
+        results = list(StepScheduler().run([Step('a', lambda: 2), Step('b', lambda x, y: x * y, ['a', 'a'])]))
+        self.assertEqual(results[-1].value, 4)
+
+    def test_unknown_dependency(self):
+        with self.assertRaisesRegex(ValueError, 'unknown step'):
+            list(StepScheduler().run([Step('a', lambda b: None, ['b'])]))
+
+    def test_cycle(self):
+        with self.assertRaisesRegex(ValueError, 'cycle'):
+            list(StepScheduler().run([Step('a', lambda b: None, ['b']), Step('b', lambda a: None, ['a'])]))
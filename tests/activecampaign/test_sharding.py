@@ -0,0 +1,173 @@
+import os
+import pickle
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from activecampaign import sharding
+from activecampaign.fakeserver import FakeActiveCampaign
+from activecampaign.reader import ContactRow, read_contacts
+from activecampaign.sharding import ImportReport, Shard, ShardResult, ShardedImporter, find_shards, merge_results
+
+from config import config
+
+
+class ShardsTestCase(TestCase):
+    def setUp(self):
+        descriptor, self.path = tempfile.mkstemp(suffix='.csv')
+        os.close(descriptor)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, content):
+        with open(self.path, 'wb') as f:
+            f.write(content)
+
+    def read_shards(self, shards):
+        with open(self.path, 'rb') as stream:
+            return [
+                [row.email for row in read_contacts(stream, offset=shard.start, end=shard.end)] for shard in shards
+            ]
+
+
+class FindShardsTestCase(ShardsTestCase):
+    def test_shards_cover_every_row_once(self):
+        self.write(b'email\n' + b''.join('c{}@example.com\n'.format(n).encode() for n in range(100)))
+        shards = find_shards(self.path, 4)
+
+        self.assertEqual(len(shards), 4)
+        self.assertEqual([shard.number for shard in shards], [0, 1, 2, 3])
+        self.assertEqual(shards[0].start, len(b'email\n'))
+        self.assertEqual(shards[-1].end, os.path.getsize(self.path))
+        self.assertEqual(
+            sum(self.read_shards(shards), []),
+            ['c{}@example.com'.format(n) for n in range(100)]
+        )
+
+    def test_quoted_line_breaks_never_split(self):
+        rows = [
+            'c{}@example.com,"Line one\nline ""two""\nline three",Last\n'.format(n).encode() for n in range(50)
+        ]
+        self.write(b'email,first_name,last_name\n' + b''.join(rows))
+
+        # Scan in tiny blocks so that boundaries are searched for across block edges
+        with patch.object(sharding, 'SCAN_BLOCK_SIZE', 7):
+            shards = find_shards(self.path, 8)
+
+        self.assertEqual(
+            sum(self.read_shards(shards), []),
+            ['c{}@example.com'.format(n) for n in range(50)]
+        )
+
+    def test_fewer_rows_than_shards(self):
+        self.write(b'email\na@example.com\n')
+        self.assertEqual(find_shards(self.path, 4), [Shard(0, 6, 20)])
+
+    def test_header_only(self):
+        self.write(b'email\n')
+        self.assertEqual(find_shards(self.path, 4), [])
+
+
+class MergeResultsTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def spill(self, name, rejects):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            for reject in rejects:
+                pickle.dump(reject, f)
+
+        return path
+
+    @staticmethod
+    def retries(attempts, retries, wasted_by_action):
+        return {
+            'attempts': attempts, 'retries': retries, 'wasted': sum(wasted_by_action.values()), 'recovered': 0,
+            'exhausted': 0, 'wasted_by_action': wasted_by_action
+        }
+
+    def test_rows_renumbered_within_file(self):
+        reject = ContactRow(1, 40, 'bad', None, None)
+        results = [
+            ShardResult(
+                Shard(1, 100, 200), 4, 3, [(2, 'x@example.com', 'error')], 1, 1,
+                self.retries(5, 1, {'contact_add': 1}), self.spill('1.rejects', [(reject, 'invalid')])
+            ),
+            ShardResult(
+                Shard(0, 10, 100), 5, 4, [(5, 'y@example.com', 'error')], 0, 0,
+                self.retries(6, 2, {'contact_add': 1, 'bulk_import': 1}), self.spill('0.rejects', [])
+            ),
+        ]
+        rejected = []
+
+        self.assertEqual(merge_results(results, lambda row, reason: rejected.append((row, reason))), ImportReport(
+            rows=9,
+            imported=7,
+            failures=[(5, 'y@example.com', 'error'), (7, 'x@example.com', 'error')],
+            rejects=1,
+            duplicates=1,
+            retries=self.retries(11, 3, {'contact_add': 2, 'bulk_import': 1})
+        ))
+        self.assertEqual(rejected, [(reject._replace(number=6), 'invalid')])
+
+
+class ShardedImporterTestCase(ShardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.saved_config = dict(config)
+        self.server = FakeActiveCampaign(api_key='testkey')
+        config['AC_BASE_URL'] = self.server.start()
+        config['AC_API_KEY'] = 'testkey'
+        config['RATE_LIMIT'] = 0
+        self.server.lists[1] = {'name': 'Newsletter'}
+
+    def tearDown(self):
+        self.server.stop()
+        config.clear()
+        config.update(self.saved_config)
+        super().tearDown()
+
+    def test_import(self):
+        rows = ['c{}@example.com,First,Last\n'.format(n) for n in range(40)]
+        rows[10] = 'not an email,First,Last\n'
+        rows[12] = 'c11@example.com,Again,Last\n'
+        rows[35] = 'C3@example.com,Again,Last\n'
+        self.write(''.join(['email,first_name,last_name\n'] + rows).encode())
+
+        rejected = []
+        report = ShardedImporter(self.path, [1], processes=2, workers=2, shards=4).run(
+            lambda row, reason: rejected.append((row.number, reason))
+        )
+
+        self.assertEqual(report.rows, 40)
+        self.assertEqual(report.imported, 37)
+        self.assertEqual(report.failures, [])
+        self.assertEqual(report.rejects, 2)
+        self.assertEqual(rejected, [(11, 'invalid email address'), (13, 'duplicate email address')])
+        # Every row that reached the server took one request, the rejected ones none, and row 36 another to look up the
+        # contact the server reported as a duplicate
+        self.assertEqual(report.retries['attempts'], 39)
+        # Row 13 repeats an address in its own shard, and row 36 one the server already holds from another shard
+        self.assertEqual(report.duplicates, 2)
+        self.assertEqual(len(self.server.contacts), 37)
+
+    def test_existing_contact_not_on_list_fails(self):
+        self.server.contacts['old@example.com'] = {'id': 99}
+        self.server.contact_emails['99'] = 'old@example.com'
+        self.write(b'email\nnew@example.com\nold@example.com\n')
+
+        report = ShardedImporter(self.path, [1], processes=1, shards=1).run()
+
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(report.duplicates, 0)
+        self.assertEqual([failure[:2] for failure in report.failures], [(2, 'old@example.com')])
+
+    def test_invalid_processes(self):
+        with self.assertRaises(ValueError):
+            ShardedImporter(self.path, [1], processes=0)
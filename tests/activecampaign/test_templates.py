@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from activecampaign.templates import RequestTemplate
+
+
+class RequestTemplateTestCase(TestCase):
+    def setUp(self):
+        self.template = RequestTemplate(
+            'contact_add',
+            'https://example.com/admin/api.php',
+            {'api_action': 'contact_add', 'api_key': 'key', 'api_output': 'json'},
+            {'p[1]': 1, 'p[2]': 2}
+        )
+
+    def test_url_includes_params(self):
+        self.assertEqual(
+            self.template.url,
+            'https://example.com/admin/api.php?api_action=contact_add&api_key=key&api_output=json'
+        )
+
+    def test_constant_fields_follow_variable_fields(self):
+        self.assertEqual(
+            self.template.encode([('email', 'person+tag@example.com'), ('first_name', 'Zoë')]),
+            b'email=person%2Btag%40example.com&first_name=Zo%C3%AB&p%5B1%5D=1&p%5B2%5D=2'
+        )
+
+    def test_without_variable_fields(self):
+        self.assertEqual(self.template.encode([]), b'p%5B1%5D=1&p%5B2%5D=2')
+
+    def test_without_constant_fields(self):
+        template = RequestTemplate('list_view', 'https://example.com/admin/api.php', {'api_action': 'list_view'})
+        self.assertEqual(template.encode({'id': 3}), b'id=3')
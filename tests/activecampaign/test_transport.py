@@ -0,0 +1,170 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from activecampaign import transport
+from activecampaign.api import ActiveCampaignAPI
+from activecampaign.exc import ActiveCampaignDuplicateError, ActiveCampaignReplayError
+from activecampaign.fakeserver import FakeActiveCampaign
+from activecampaign.models import Sender
+from activecampaign.transport import RecordingAdapter, ReplayAdapter, create_transport
+
+from config import config
+
+
+SENDER = Sender('Sender', 'sender@example.com', '1 Street', 'City', 'State', '12345', 'Country')
+
+
+class TransportTestCase(TestCase):
+    def setUp(self):
+        self.saved_config = dict(config)
+        config['AC_API_KEY'] = 'secretkey'
+        config['RATE_LIMIT'] = 0
+        config['RETRY_MAX_ATTEMPTS'] = 1
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        config.clear()
+        config.update(self.saved_config)
+
+    def record(self, name, **server_options):
+        """Runs a short campaign flow against the stand-in server, recording it
+
+        :return: Returns the location of the recording, and the ids the client received
+        :rtype: tuple
+        """
+        path = os.path.join(self.directory, name)
+        with FakeActiveCampaign(api_key='secretkey', **server_options) as server:
+            config['AC_BASE_URL'] = server.base_url
+            with ActiveCampaignAPI(transport=RecordingAdapter(path)) as api:
+                ids = self.run_flow(api)
+
+        return path, ids
+
+    @staticmethod
+    def run_flow(api):
+        mailing_list_id = api.create_mailing_list('List', SENDER)
+        contact_ids = [
+            api.create_contact('person{}@example.com'.format(number), [mailing_list_id]) for number in range(3)
+        ]
+        message_id = api.create_html_message(
+            [mailing_list_id], 'Subject', '<p>' + 'Hello ' * 500 + '</p>', SENDER.email, SENDER.name, SENDER.email
+        )
+        return [mailing_list_id] + contact_ids + [message_id]
+
+
+class RecordingAdapterTestCase(TransportTestCase):
+    def test_exchanges_recorded(self):
+        path, _ = self.record('session.jsonl')
+
+        with open(path) as f:
+            exchanges = [transport.Exchange(*json.loads(line)) for line in f]
+
+        self.assertEqual(len(exchanges), 5)
+        self.assertEqual(exchanges[0].method, 'POST')
+        self.assertTrue(exchanges[0].target.startswith('/admin/api.php?api_action=list_add'))
+        self.assertEqual(exchanges[0].status, 200)
+        self.assertEqual(json.loads(exchanges[0].content)['result_code'], 1)
+
+    def test_api_key_scrubbed(self):
+        path, _ = self.record('session.jsonl')
+
+        with open(path) as f:
+            content = f.read()
+
+        self.assertNotIn('secretkey', content)
+        self.assertIn('api_key=scrubbed', content)
+
+    def test_compressed_recording(self):
+        path, _ = self.record('session.jsonl.gz')
+
+        with gzip.open(path, 'rt') as f:
+            self.assertEqual(len(f.readlines()), 5)
+
+
+class ReplayAdapterTestCase(TransportTestCase):
+    def test_responses_replayed_without_server(self):
+        path, ids = self.record('session.jsonl.gz')
+
+        # Another server address and API key, with nothing listening at it
+        config['AC_BASE_URL'] = 'http://127.0.0.1:9'
+        config['AC_API_KEY'] = 'otherkey'
+        adapter = ReplayAdapter(path)
+        with ActiveCampaignAPI(transport=adapter) as api:
+            self.assertEqual(self.run_flow(api), ids)
+
+        self.assertEqual(adapter.count, 5)
+        self.assertEqual(len(adapter), 0)
+
+    def test_compressed_request_bodies_matched(self):
+        config['REQUEST_COMPRESSION_THRESHOLD'] = 1000
+        path, ids = self.record('session.jsonl')
+
+        with ActiveCampaignAPI(transport=ReplayAdapter(path)) as api:
+            self.assertEqual(self.run_flow(api), ids)
+
+    def test_unrecorded_request(self):
+        path, _ = self.record('session.jsonl')
+
+        with ActiveCampaignAPI(transport=ReplayAdapter(path)) as api:
+            with self.assertRaisesRegex(ActiveCampaignReplayError, 'No recorded response left for POST'):
+                api.create_mailing_list('Another list', SENDER)
+
+    def test_repeated_requests_replayed_in_order(self):
+        path = os.path.join(self.directory, 'session.jsonl')
+        with FakeActiveCampaign(api_key='secretkey') as server:
+            config['AC_BASE_URL'] = server.base_url
+            with ActiveCampaignAPI(transport=RecordingAdapter(path)) as api:
+                mailing_list_id = api.create_mailing_list('List', SENDER)
+                first = api.create_contact('person@example.com', [mailing_list_id])
+                with self.assertRaises(ActiveCampaignDuplicateError):
+                    api.create_contact('person@example.com', [mailing_list_id])
+
+        with ActiveCampaignAPI(transport=ReplayAdapter(path)) as api:
+            api.create_mailing_list('List', SENDER)
+            self.assertEqual(api.create_contact('person@example.com', [mailing_list_id]), first)
+            with self.assertRaises(ActiveCampaignDuplicateError):
+                api.create_contact('person@example.com', [mailing_list_id])
+
+    def test_original_timing(self):
+        path, _ = self.record('session.jsonl', latency='constant:0.01')
+
+        with patch.object(transport.time, 'sleep') as mock_sleep:
+            with ActiveCampaignAPI(transport=ReplayAdapter(path)) as api:
+                api.create_mailing_list('List', SENDER)
+            mock_sleep.assert_not_called()
+
+            with ActiveCampaignAPI(transport=ReplayAdapter(path, timing=True)) as api:
+                api.create_mailing_list('List', SENDER)
+            self.assertGreaterEqual(mock_sleep.call_args[0][0], 0.01)
+
+
+class CreateTransportTestCase(TransportTestCase):
+    def test_pooled_adapter_by_default(self):
+        adapter = create_transport()
+
+        self.assertNotIsInstance(adapter, (RecordingAdapter, ReplayAdapter))
+        self.assertEqual(adapter._pool_maxsize, config['POOL_MAXSIZE'])
+
+    def test_recording(self):
+        config['TRANSPORT_RECORD'] = os.path.join(self.directory, 'session.jsonl')
+
+        adapter = create_transport()
+        self.assertIsInstance(adapter, RecordingAdapter)
+        adapter.close()
+
+    def test_replay(self):
+        path, _ = self.record('session.jsonl')
+        config['TRANSPORT_REPLAY'] = path
+        config['TRANSPORT_REPLAY_TIMING'] = True
+
+        with ActiveCampaignAPI() as api:
+            adapter = api.session.get_adapter(api.request_url)
+
+        self.assertIsInstance(adapter, ReplayAdapter)
+        self.assertTrue(adapter.timing)
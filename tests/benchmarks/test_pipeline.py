@@ -0,0 +1,68 @@
+import os
+import tempfile
+
+from unittest import TestCase
+
+from activecampaign.fakeserver import FakeActiveCampaign
+from benchmarks.pipeline import compare, generate_contacts, percentile, run_case
+
+from config import config
+
+
+class PercentileTestCase(TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile(values, 0.99), 99)
+
+    def test_small_samples(self):
+        self.assertEqual(percentile([3], 0.99), 3)
+        self.assertEqual(percentile([1, 2], 0.0), 1)
+        self.assertIsNone(percentile([], 0.5))
+
+
+class CompareTestCase(TestCase):
+    def test_regression_beyond_tolerance(self):
+        baseline = [
+            {'contacts': 10, 'workers': 1, 'bulk': False, 'requests_per_second': 100.0},
+            {'contacts': 10, 'workers': 8, 'bulk': False, 'requests_per_second': 100.0},
+        ]
+        results = [
+            {'contacts': 10, 'workers': 1, 'bulk': False, 'requests_per_second': 95.0},
+            {'contacts': 10, 'workers': 8, 'bulk': False, 'requests_per_second': 80.0},
+            {'contacts': 10, 'workers': 1, 'bulk': True, 'requests_per_second': 10.0},
+        ]
+
+        comparisons = list(compare(results, baseline, 0.1))
+
+        self.assertEqual([(round(change, 2), slower) for _, _, change, slower in comparisons], [
+            (-0.05, False),
+            (-0.2, True),
+        ])
+
+
+class RunCaseTestCase(TestCase):
+    def setUp(self):
+        self.saved_config = dict(config)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'contacts.csv')
+        generate_contacts(self.path, 20)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        config.clear()
+        config.update(self.saved_config)
+
+    def test_measures_full_flow(self):
+        config['RETRY_MAX_ATTEMPTS'] = 1
+
+        with FakeActiveCampaign() as server:
+            result = run_case(server.base_url, server.api_key, self.path, 20, 4, False)
+            self.assertEqual(len(server.contacts), 20)
+
+        # List, address, one request per contact, message and campaign
+        self.assertEqual(result['requests'], 24)
+        self.assertEqual(result['failures'], 0)
+        self.assertLessEqual(result['latency_p50'], result['latency_p99'])
+        self.assertGreater(result['peak_rss'], 0)
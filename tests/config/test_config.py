@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import time
+
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from config import LazyConfig, apply_environment_updates, compile_config, init_config
+
+
+class InitConfigTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.yaml_path = os.path.join(self.directory.name, 'config.yaml')
+        self.json_path = os.path.join(self.directory.name, 'config.json')
+
+        with open(self.yaml_path, 'w') as f:
+            f.write('# Comment\nAC_BASE_URL: https://example.com\nRATE_LIMIT: 5.0\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reads_package_config_from_any_directory(self):
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            self.assertIn('AC_BASE_URL', init_config())
+        finally:
+            os.chdir(cwd)
+
+    def test_reads_yaml(self):
+        self.assertEqual(init_config(self.yaml_path), {'AC_BASE_URL': 'https://example.com', 'RATE_LIMIT': 5.0})
+
+    def test_path_from_environment(self):
+        with patch.dict(os.environ, {'AC_CONFIG_FILE': self.yaml_path}):
+            self.assertEqual(init_config()['AC_BASE_URL'], 'https://example.com')
+
+    def test_compiled_copy_preferred(self):
+        self.assertEqual(compile_config(self.yaml_path), self.json_path)
+
+        with open(self.json_path, 'w') as f:
+            json.dump({'AC_BASE_URL': 'https://compiled.example.com'}, f)
+
+        self.assertEqual(init_config(self.yaml_path), {'AC_BASE_URL': 'https://compiled.example.com'})
+
+    def test_stale_compiled_copy_ignored(self):
+        compile_config(self.yaml_path)
+        stale = time.time() - 60
+        os.utime(self.json_path, (stale, stale))
+
+        with open(self.yaml_path, 'a') as f:
+            f.write('RATE_BURST: 10\n')
+
+        self.assertEqual(init_config(self.yaml_path)['RATE_BURST'], 10)
+
+    def test_reads_json(self):
+        with open(self.json_path, 'w') as f:
+            json.dump({'RATE_LIMIT': 1.0}, f)
+
+        self.assertEqual(init_config(self.json_path), {'RATE_LIMIT': 1.0})
+
+
+class ApplyEnvironmentUpdatesTestCase(TestCase):
+    def test_overrides_coerced_to_configured_type(self):
+        config_data = {'RATE_LIMIT': 5.0, 'RATE_BURST': 5, 'POOL_BLOCK': False, 'AC_API_KEY': 'key'}
+
+        with patch.dict(os.environ, {'RATE_LIMIT': '2.5', 'RATE_BURST': '3', 'POOL_BLOCK': 'true', 'AC_API_KEY': 'k2'}):
+            apply_environment_updates(config_data)
+
+        self.assertEqual(config_data, {'RATE_LIMIT': 2.5, 'RATE_BURST': 3, 'POOL_BLOCK': True, 'AC_API_KEY': 'k2'})
+
+
+class LazyConfigTestCase(TestCase):
+    def setUp(self):
+        self.loader = MagicMock(side_effect=lambda: {'RATE_LIMIT': 5.0})
+        self.config = LazyConfig(self.loader)
+
+    def test_not_loaded_until_accessed(self):
+        self.assertFalse(self.config.loaded)
+        self.loader.assert_not_called()
+
+        self.assertEqual(self.config['RATE_LIMIT'], 5.0)
+        self.assertTrue(self.config.loaded)
+
+    def test_loaded_once(self):
+        self.config['RATE_LIMIT']
+        self.config['RATE_BURST'] = 10
+        dict(self.config)
+
+        self.loader.assert_called_once_with()
+        self.assertEqual(dict(self.config), {'RATE_LIMIT': 5.0, 'RATE_BURST': 10})
+
+    def test_reload(self):
+        self.config['RATE_LIMIT'] = 1.0
+        self.config.reload()
+
+        self.assertEqual(self.config['RATE_LIMIT'], 5.0)
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_mapping_methods(self):
+        self.config.update(RATE_BURST=3)
+        self.assertEqual(len(self.config), 2)
+        self.assertEqual(self.config.get('MISSING', 'default'), 'default')
+
+        del self.config['RATE_BURST']
+        self.assertNotIn('RATE_BURST', self.config)